@@ -0,0 +1,795 @@
+"""In-memory DynamoDB for the replay benchmark.
+
+Implements the subset of the low-level client and the boto3 resource API the
+Lambdas use (item reads and writes, queries on tables and GSIs, scans, batch
+reads and writes, paginators, batch_writer) with DynamoDB's expression
+syntax, including condition failures. Tables with a stream keep
+NEW_AND_OLD_IMAGES records in the format Lambda receives them, for the
+benchmark's stream poller. Every API call can be given a fixed latency to
+stand in for the network round trip.
+"""
+import copy
+import re
+import threading
+import time
+from collections import Counter
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional, Tuple
+
+from boto3.dynamodb.conditions import ConditionBase, ConditionExpressionBuilder
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from botocore.exceptions import ClientError
+
+# Key schemas of the tables in template.yaml: primary key, then GSIs
+TABLES = {
+    'FinancialNewsArticles': {
+        'key': ['articleId'],
+        'indexes': {
+            'TimestampIndex': ['timestamp'],
+            'StatusDayIndex': ['statusDay', 'timestamp'],
+            'SentimentDayIndex': ['sentimentDay', 'timestamp']
+        },
+        'stream': True
+    },
+    'FinancialNewsDedupIndex': {'key': ['bucket']},
+    'FinancialNewsSourceState': {'key': ['source']},
+    'FinancialNewsAnalysisCache': {'key': ['contentHash']},
+    'FinancialNewsTickerSignals': {
+        'key': ['ticker', 'signalKey'],
+        'indexes': {'TickerSentimentIndex': ['tickerSentiment', 'signalKey']}
+    },
+    'FinancialNewsLatest': {'key': ['viewId']},
+    'WebSocketConnections': {
+        'key': ['connectionId'],
+        'indexes': {'UpdatedAtIndex': ['listKey', 'updatedAt']}
+    }
+}
+
+# BatchWriteItem and BatchGetItem request limits
+BATCH_WRITE_LIMIT = 25
+BATCH_GET_LIMIT = 100
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+_MISSING = object()
+
+
+def serialize(values: Dict) -> Dict:
+    """Python values to DynamoDB attribute values"""
+    return {name: _serializer.serialize(value) for name, value in values.items()}
+
+
+def deserialize(item: Dict) -> Dict:
+    """DynamoDB attribute values to Python values"""
+    return {name: _deserializer.deserialize(value) for name, value in item.items()}
+
+
+def client_error(code: str, message: str, operation: str) -> ClientError:
+    """A ClientError as botocore raises it for a failed call"""
+    return ClientError({'Error': {'Code': code, 'Message': message}}, operation)
+
+
+# --- Expressions -------------------------------------------------------------
+
+TOKEN_RE = re.compile(r"\s*(?:(<>|<=|>=|[=<>(),.\[\]+-])|(#\w+)|(:\w+)|(\d+)|([A-Za-z_]\w*))")
+UPDATE_CLAUSES = {'SET', 'REMOVE', 'ADD', 'DELETE'}
+
+
+class ExpressionParser:
+    """Recursive-descent parser for condition, key-condition, update and projection expressions"""
+
+    def __init__(self, expression: str, names: Optional[Dict] = None, values: Optional[Dict] = None):
+        self.names = names or {}
+        self.values = values or {}
+        self.tokens = []
+        position = 0
+        expression = expression.strip()
+        while position < len(expression):
+            match = TOKEN_RE.match(expression, position)
+            if not match or match.end() == position:
+                raise client_error('ValidationException', f"Invalid expression near: {expression[position:]}", 'Parse')
+            self.tokens.append(next(group for group in match.groups() if group is not None))
+            position = match.end()
+        self.position = 0
+
+    def peek(self, offset: int = 0) -> Optional[str]:
+        index = self.position + offset
+        return self.tokens[index] if index < len(self.tokens) else None
+
+    def take(self, expected: Optional[str] = None) -> str:
+        token = self.peek()
+        if token is None or (expected and token.upper() != expected):
+            raise client_error('ValidationException', f"Expected {expected or 'a token'}, got {token}", 'Parse')
+        self.position += 1
+        return token
+
+    def at_keyword(self, *keywords: str) -> bool:
+        token = self.peek()
+        return token is not None and token.upper() in keywords
+
+    def done(self) -> bool:
+        return self.position >= len(self.tokens)
+
+    # Operands
+
+    def path(self) -> List:
+        """An attribute path: name or #alias, then .member and [index] parts"""
+        path = [self._name(self.take())]
+        while self.peek() in ('.', '['):
+            if self.take() == '.':
+                path.append(self._name(self.take()))
+            else:
+                path.append(int(self.take()))
+                self.take(']')
+        return path
+
+    def _name(self, token: str) -> str:
+        if token.startswith('#'):
+            if token not in self.names:
+                raise client_error('ValidationException', f"Undefined attribute name {token}", 'Parse')
+            return self.names[token]
+        return token
+
+    def operand(self) -> Callable[[Dict], object]:
+        """A value placeholder, a path, or a function of them"""
+        token = self.peek()
+        if token.startswith(':'):
+            self.take()
+            if token not in self.values:
+                raise client_error('ValidationException', f"Undefined attribute value {token}", 'Parse')
+            value = self.values[token]
+            return lambda item: value
+        if self.peek(1) == '(' and token.lower() in ('if_not_exists', 'list_append', 'size'):
+            function = self.take().lower()
+            self.take('(')
+            if function == 'size':
+                target = self.operand()
+                self.take(')')
+                return lambda item: Decimal(len(target(item)))
+            first = self.path() if function == 'if_not_exists' else self.operand()
+            self.take(',')
+            second = self.operand()
+            self.take(')')
+            if function == 'if_not_exists':
+                return lambda item: second(item) if resolve(item, first) is _MISSING else resolve(item, first)
+            return lambda item: list(first(item)) + list(second(item))
+        path = self.path()
+        return lambda item: resolve(item, path)
+
+    def value(self) -> Callable[[Dict], object]:
+        """SET value: an operand, optionally plus or minus another"""
+        left = self.operand()
+        if self.peek() in ('+', '-'):
+            sign = 1 if self.take() == '+' else -1
+            right = self.operand()
+            return lambda item: left(item) + sign * right(item)
+        return left
+
+    # Conditions
+
+    def condition(self) -> Callable[[Dict], bool]:
+        terms = [self._conjunction()]
+        while self.at_keyword('OR'):
+            self.take()
+            terms.append(self._conjunction())
+        return terms[0] if len(terms) == 1 else (lambda item: any(term(item) for term in terms))
+
+    def _conjunction(self) -> Callable[[Dict], bool]:
+        terms = [self._negation()]
+        while self.at_keyword('AND'):
+            self.take()
+            terms.append(self._negation())
+        return terms[0] if len(terms) == 1 else (lambda item: all(term(item) for term in terms))
+
+    def _negation(self) -> Callable[[Dict], bool]:
+        if self.at_keyword('NOT'):
+            self.take()
+            inner = self._negation()
+            return lambda item: not inner(item)
+        return self._comparison()
+
+    def _comparison(self) -> Callable[[Dict], bool]:
+        if self.peek() == '(':
+            self.take()
+            inner = self.condition()
+            self.take(')')
+            return inner
+
+        token = (self.peek() or '').lower()
+        if self.peek(1) == '(' and token in ('attribute_exists', 'attribute_not_exists', 'begins_with', 'contains'):
+            self.take()
+            self.take('(')
+            if token in ('attribute_exists', 'attribute_not_exists'):
+                path = self.path()
+                self.take(')')
+                exists = token == 'attribute_exists'
+                return lambda item: (resolve(item, path) is not _MISSING) == exists
+            target = self.operand()
+            self.take(',')
+            argument = self.operand()
+            self.take(')')
+            if token == 'begins_with':
+                return lambda item: _begins_with(target(item), argument(item))
+            return lambda item: _contains(target(item), argument(item))
+
+        left = self.operand()
+        if self.at_keyword('BETWEEN'):
+            self.take()
+            low = self.operand()
+            self.take('AND')
+            high = self.operand()
+            return lambda item: _compare(left(item), '>=', low(item)) and _compare(left(item), '<=', high(item))
+        if self.at_keyword('IN'):
+            self.take()
+            self.take('(')
+            options = [self.operand()]
+            while self.peek() == ',':
+                self.take()
+                options.append(self.operand())
+            self.take(')')
+            return lambda item: any(_compare(left(item), '=', option(item)) for option in options)
+
+        operator = self.take()
+        right = self.operand()
+        return lambda item: _compare(left(item), operator, right(item))
+
+    # Updates and projections
+
+    def update_actions(self) -> List[Tuple]:
+        """(clause, path, value function) actions of an update expression"""
+        actions = []
+        while not self.done():
+            clause = self.take().upper()
+            if clause not in UPDATE_CLAUSES:
+                raise client_error('ValidationException', f"Unknown update clause {clause}", 'Parse')
+            while True:
+                path = self.path()
+                if clause == 'SET':
+                    self.take('=')
+                    actions.append((clause, path, self.value()))
+                elif clause == 'REMOVE':
+                    actions.append((clause, path, None))
+                else:
+                    actions.append((clause, path, self.operand()))
+                if self.peek() != ',':
+                    break
+                self.take()
+        return actions
+
+    def projection(self) -> List[List]:
+        paths = [self.path()]
+        while self.peek() == ',':
+            self.take()
+            paths.append(self.path())
+        return paths
+
+
+def resolve(item: Dict, path: List):
+    """Value at an attribute path, or _MISSING"""
+    value = item
+    for part in path:
+        try:
+            value = value[part]
+        except (KeyError, IndexError, TypeError):
+            return _MISSING
+    return value
+
+
+def _assign(item: Dict, path: List, value) -> None:
+    target = item
+    for part in path[:-1]:
+        target = target[part]
+    if isinstance(path[-1], int) and path[-1] >= len(target):
+        target.append(value)
+    else:
+        target[path[-1]] = value
+
+
+def _remove(item: Dict, path: List) -> None:
+    target = resolve(item, path[:-1]) if len(path) > 1 else item
+    if target is _MISSING:
+        return
+    if isinstance(target, dict):
+        target.pop(path[-1], None)
+    elif isinstance(path[-1], int) and path[-1] < len(target):
+        del target[path[-1]]
+
+
+def _compare(left, operator: str, right) -> bool:
+    if left is _MISSING or right is _MISSING:
+        return operator == '<>'
+    if operator == '=':
+        return left == right
+    if operator == '<>':
+        return left != right
+    try:
+        if operator == '<':
+            return left < right
+        if operator == '<=':
+            return left <= right
+        if operator == '>':
+            return left > right
+        if operator == '>=':
+            return left >= right
+    except TypeError:
+        return False
+    raise client_error('ValidationException', f"Unknown comparator {operator}", 'Parse')
+
+
+def _begins_with(value, prefix) -> bool:
+    return isinstance(value, (str, bytes)) and isinstance(prefix, type(value)) and value.startswith(prefix)
+
+
+def _contains(value, member) -> bool:
+    if value is _MISSING:
+        return False
+    try:
+        return member in value
+    except TypeError:
+        return False
+
+
+def _as_expression(condition, names: Dict, values: Dict, is_key_condition: bool = False) -> str:
+    """Render a boto3 condition object as an expression, adding its names and values"""
+    if not isinstance(condition, ConditionBase):
+        return condition
+    built = ConditionExpressionBuilder().build_expression(condition, is_key_condition=is_key_condition)
+    names.update(built.attribute_name_placeholders)
+    values.update(built.attribute_value_placeholders)
+    return built.condition_expression
+
+
+# --- Tables ------------------------------------------------------------------
+
+class LocalDynamoDB:
+    """Thread-safe in-memory tables holding Python values (as the resource API returns them)"""
+
+    def __init__(self, tables: Optional[Dict] = None, latency_ms: float = 0.0):
+        self.schemas = tables or TABLES
+        self.items: Dict[str, Dict[Tuple, Dict]] = {name: {} for name in self.schemas}
+        self.latency_ms = latency_ms
+        self.calls = Counter()
+        self.stream: Dict[str, List[Dict]] = {name: [] for name, schema in self.schemas.items() if schema.get('stream')}
+        self._sequence = 0
+        self._lock = threading.RLock()
+        self._stream_ready = threading.Condition(self._lock)
+        self.client = LocalDynamoDBClient(self)
+        self.resource = LocalDynamoDBResource(self)
+
+    def call(self, operation: str) -> None:
+        """Count an API call and wait out its simulated round trip"""
+        self.calls[operation] += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+    def _schema(self, table: str) -> Dict:
+        if table not in self.schemas:
+            raise client_error('ResourceNotFoundException', f"Requested resource not found: {table}", 'Table')
+        return self.schemas[table]
+
+    def _key(self, table: str, values: Dict) -> Tuple:
+        key_names = self._schema(table)['key']
+        missing = [name for name in key_names if name not in values]
+        if missing:
+            raise client_error('ValidationException', f"Missing key attributes {missing} for {table}", 'Key')
+        return tuple(values[name] for name in key_names)
+
+    def _key_dict(self, table: str, item: Dict, index: Optional[str] = None) -> Dict:
+        names = list(self._schema(table)['key'])
+        if index:
+            names += [name for name in self._schema(table)['indexes'][index] if name not in names]
+        return {name: item[name] for name in names if name in item}
+
+    def _record(self, table: str, event_name: str, key: Dict, old: Optional[Dict], new: Optional[Dict]) -> None:
+        """Append a stream record (low-level images, as Lambda receives them)"""
+        if table not in self.stream:
+            return
+        self._sequence += 1
+        change = {
+            'Keys': serialize(key),
+            'SequenceNumber': f"{self._sequence:021d}",
+            'StreamViewType': 'NEW_AND_OLD_IMAGES',
+            'ApproximateCreationDateTime': time.time()
+        }
+        if new is not None:
+            change['NewImage'] = serialize(new)
+        if old is not None:
+            change['OldImage'] = serialize(old)
+        self.stream[table].append({'eventName': event_name, 'eventSource': 'aws:dynamodb', 'dynamodb': change})
+        self._stream_ready.notify_all()
+
+    def _check(self, table: str, current: Optional[Dict], condition: Optional[str], names: Dict, values: Dict, operation: str) -> None:
+        if not condition:
+            return
+        if not ExpressionParser(condition, names, values).condition()(current or {}):
+            raise client_error('ConditionalCheckFailedException', 'The conditional request failed', operation)
+
+    @staticmethod
+    def _project(item: Dict, projection: Optional[str], names: Dict) -> Dict:
+        if not projection:
+            return copy.deepcopy(item)
+        projected = {}
+        for path in ExpressionParser(projection, names).projection():
+            value = resolve(item, path[:1])
+            if value is not _MISSING:
+                projected[path[0]] = copy.deepcopy(value)
+        return projected
+
+    # Single-item operations
+
+    def get_item(self, TableName: str, Key: Dict, ProjectionExpression: Optional[str] = None,
+                 ExpressionAttributeNames: Optional[Dict] = None, ConsistentRead: bool = False) -> Dict:
+        key = self._key(TableName, Key)
+        with self._lock:
+            item = self.items[TableName].get(key)
+            if item is None:
+                return {}
+            return {'Item': self._project(item, ProjectionExpression, ExpressionAttributeNames or {})}
+
+    def put_item(self, TableName: str, Item: Dict, ConditionExpression: Optional[str] = None,
+                 ExpressionAttributeNames: Optional[Dict] = None, ExpressionAttributeValues: Optional[Dict] = None,
+                 ReturnValues: str = 'NONE') -> Dict:
+        with self._lock:
+            key = self._key(TableName, Item)
+            current = self.items[TableName].get(key)
+            self._check(TableName, current, ConditionExpression, ExpressionAttributeNames or {},
+                        ExpressionAttributeValues or {}, 'PutItem')
+            self.items[TableName][key] = copy.deepcopy(Item)
+            self._record(TableName, 'MODIFY' if current else 'INSERT', self._key_dict(TableName, Item), current, Item)
+            return {'Attributes': copy.deepcopy(current)} if ReturnValues == 'ALL_OLD' and current else {}
+
+    def update_item(self, TableName: str, Key: Dict, UpdateExpression: Optional[str] = None,
+                    ConditionExpression: Optional[str] = None, ExpressionAttributeNames: Optional[Dict] = None,
+                    ExpressionAttributeValues: Optional[Dict] = None, ReturnValues: str = 'NONE') -> Dict:
+        names, values = ExpressionAttributeNames or {}, ExpressionAttributeValues or {}
+        with self._lock:
+            key = self._key(TableName, Key)
+            current = self.items[TableName].get(key)
+            self._check(TableName, current, ConditionExpression, names, values, 'UpdateItem')
+
+            item = copy.deepcopy(current) if current else copy.deepcopy(Key)
+            touched = []
+            actions = ExpressionParser(UpdateExpression, names, values).update_actions() if UpdateExpression else []
+            # Values are computed against the item as it was before the update
+            before = copy.deepcopy(item)
+            for clause, path, operand in actions:
+                if path[0] in Key:
+                    raise client_error('ValidationException', f"Cannot update key attribute {path[0]}", 'UpdateItem')
+                touched.append(path[0])
+                if clause == 'SET':
+                    _assign(item, path, operand(before))
+                elif clause == 'REMOVE':
+                    _remove(item, path)
+                elif clause == 'ADD':
+                    existing, addition = resolve(item, path), operand(before)
+                    if existing is _MISSING:
+                        _assign(item, path, copy.deepcopy(addition))
+                    elif isinstance(existing, set):
+                        existing |= addition
+                    else:
+                        _assign(item, path, existing + addition)
+                else:
+                    existing = resolve(item, path)
+                    if isinstance(existing, set):
+                        existing -= operand(before)
+                        if not existing:
+                            _remove(item, path)
+
+            self.items[TableName][key] = item
+            self._record(TableName, 'MODIFY' if current else 'INSERT', self._key_dict(TableName, item), current, item)
+
+            if ReturnValues == 'ALL_NEW':
+                return {'Attributes': copy.deepcopy(item)}
+            if ReturnValues == 'ALL_OLD':
+                return {'Attributes': copy.deepcopy(current)} if current else {}
+            if ReturnValues in ('UPDATED_NEW', 'UPDATED_OLD'):
+                source = item if ReturnValues == 'UPDATED_NEW' else (current or {})
+                return {'Attributes': {name: copy.deepcopy(source[name]) for name in touched if name in source}}
+            return {}
+
+    def delete_item(self, TableName: str, Key: Dict, ConditionExpression: Optional[str] = None,
+                    ExpressionAttributeNames: Optional[Dict] = None, ExpressionAttributeValues: Optional[Dict] = None,
+                    ReturnValues: str = 'NONE') -> Dict:
+        with self._lock:
+            key = self._key(TableName, Key)
+            current = self.items[TableName].get(key)
+            self._check(TableName, current, ConditionExpression, ExpressionAttributeNames or {},
+                        ExpressionAttributeValues or {}, 'DeleteItem')
+            if current is None:
+                return {}
+            del self.items[TableName][key]
+            self._record(TableName, 'REMOVE', self._key_dict(TableName, current), current, None)
+            return {'Attributes': copy.deepcopy(current)} if ReturnValues == 'ALL_OLD' else {}
+
+    # Reads of many items
+
+    def query(self, TableName: str, KeyConditionExpression: str, IndexName: Optional[str] = None, **kwargs) -> Dict:
+        schema = self._schema(TableName)
+        key_names = schema['indexes'][IndexName] if IndexName else schema['key']
+        parser = ExpressionParser(KeyConditionExpression, kwargs.get('ExpressionAttributeNames'),
+                                  kwargs.get('ExpressionAttributeValues'))
+        matches = parser.condition()
+        with self._lock:
+            # Items without the index's key attributes are not in the index
+            rows = [item for item in self.items[TableName].values()
+                    if all(name in item for name in key_names) and matches(item)]
+        rows.sort(key=lambda item: tuple(item[name] for name in key_names[1:]) + self._key(TableName, item),
+                  reverse=not kwargs.get('ScanIndexForward', True))
+        return self._page(TableName, IndexName, rows, **kwargs)
+
+    def scan(self, TableName: str, IndexName: Optional[str] = None, **kwargs) -> Dict:
+        schema = self._schema(TableName)
+        with self._lock:
+            rows = list(self.items[TableName].values())
+        if IndexName:
+            key_names = schema['indexes'][IndexName]
+            rows = [item for item in rows if all(name in item for name in key_names)]
+        return self._page(TableName, IndexName, rows, **kwargs)
+
+    def _page(self, table: str, index: Optional[str], rows: List[Dict], Limit: Optional[int] = None,
+              ExclusiveStartKey: Optional[Dict] = None, FilterExpression: Optional[str] = None,
+              ProjectionExpression: Optional[str] = None, ExpressionAttributeNames: Optional[Dict] = None,
+              ExpressionAttributeValues: Optional[Dict] = None, Select: Optional[str] = None, **_) -> Dict:
+        """One page of a query or scan: resume after the start key, Limit, then filter"""
+        if ExclusiveStartKey:
+            start = next((position for position, item in enumerate(rows)
+                          if all(item.get(name) == value for name, value in ExclusiveStartKey.items())), None)
+            rows = rows[start + 1:] if start is not None else []
+        page = rows[:Limit] if Limit else rows
+        evaluated = len(page)
+        if FilterExpression:
+            keep = ExpressionParser(FilterExpression, ExpressionAttributeNames, ExpressionAttributeValues).condition()
+            page = [item for item in page if keep(item)]
+
+        response = {'Count': len(page), 'ScannedCount': evaluated}
+        if Select != 'COUNT':
+            response['Items'] = [self._project(item, ProjectionExpression, ExpressionAttributeNames or {}) for item in page]
+        if Limit and len(rows) > Limit:
+            response['LastEvaluatedKey'] = copy.deepcopy(self._key_dict(table, rows[Limit - 1], index))
+        return response
+
+    # Batches
+
+    def batch_get_item(self, RequestItems: Dict) -> Dict:
+        if sum(len(request['Keys']) for request in RequestItems.values()) > BATCH_GET_LIMIT:
+            raise client_error('ValidationException', f"Too many items requested (over {BATCH_GET_LIMIT})", 'BatchGetItem')
+        responses = {}
+        for table, request in RequestItems.items():
+            found = []
+            for key in request['Keys']:
+                item = self.get_item(table, key, request.get('ProjectionExpression'), request.get('ExpressionAttributeNames'))
+                if 'Item' in item:
+                    found.append(item['Item'])
+            responses[table] = found
+        return {'Responses': responses, 'UnprocessedKeys': {}}
+
+    def batch_write_item(self, RequestItems: Dict) -> Dict:
+        if sum(len(requests) for requests in RequestItems.values()) > BATCH_WRITE_LIMIT:
+            raise client_error('ValidationException', f"Too many items in batch (over {BATCH_WRITE_LIMIT})", 'BatchWriteItem')
+        for table, requests in RequestItems.items():
+            for request in requests:
+                if 'PutRequest' in request:
+                    self.put_item(table, request['PutRequest']['Item'])
+                else:
+                    self.delete_item(table, request['DeleteRequest']['Key'])
+        return {'UnprocessedItems': {}}
+
+    # Streams
+
+    def take_stream_records(self, table: str, limit: int, window_seconds: float, timeout: float) -> List[Dict]:
+        """Wait for a stream batch the way Lambda's poller forms one
+
+        Returns once limit records are pending or window_seconds have passed
+        since the oldest pending record arrived; an empty list after timeout
+        seconds without any record.
+        """
+        deadline = time.time() + timeout
+        with self._stream_ready:
+            while True:
+                pending = self.stream[table]
+                now = time.time()
+                if pending:
+                    oldest = pending[0]['dynamodb']['ApproximateCreationDateTime']
+                    if len(pending) >= limit or now - oldest >= window_seconds:
+                        batch, self.stream[table] = pending[:limit], pending[limit:]
+                        return batch
+                    wait = oldest + window_seconds - now
+                elif now >= deadline:
+                    return []
+                else:
+                    wait = deadline - now
+                self._stream_ready.wait(max(0.001, min(wait, 0.25)))
+
+    def requeue_stream_records(self, table: str, records: List[Dict]) -> None:
+        """Put records back at the head of the stream (a retried batch failure)"""
+        with self._stream_ready:
+            self.stream[table][:0] = records
+            self._stream_ready.notify_all()
+
+
+# --- API facades -------------------------------------------------------------
+
+class _Paginator:
+    def __init__(self, method: Callable[..., Dict]):
+        self.method = method
+
+    def paginate(self, **kwargs):
+        while True:
+            page = self.method(**kwargs)
+            yield page
+            if 'LastEvaluatedKey' not in page:
+                return
+            kwargs['ExclusiveStartKey'] = page['LastEvaluatedKey']
+
+
+class LocalDynamoDBClient:
+    """Low-level client: attribute-value format in and out"""
+
+    _VALUE_ARGUMENTS = ('Key', 'Item', 'ExclusiveStartKey', 'ExpressionAttributeValues')
+
+    def __init__(self, db: LocalDynamoDB):
+        self.db = db
+
+    def _call(self, operation: str, **kwargs) -> Dict:
+        self.db.call(operation)
+        for argument in self._VALUE_ARGUMENTS:
+            if argument in kwargs:
+                kwargs[argument] = deserialize(kwargs[argument])
+        response = getattr(self.db, operation)(**kwargs)
+        for field in ('Item', 'Attributes', 'LastEvaluatedKey'):
+            if field in response:
+                response[field] = serialize(response[field])
+        if 'Items' in response:
+            response['Items'] = [serialize(item) for item in response['Items']]
+        return response
+
+    def get_item(self, **kwargs) -> Dict:
+        return self._call('get_item', **kwargs)
+
+    def put_item(self, **kwargs) -> Dict:
+        return self._call('put_item', **kwargs)
+
+    def update_item(self, **kwargs) -> Dict:
+        return self._call('update_item', **kwargs)
+
+    def delete_item(self, **kwargs) -> Dict:
+        return self._call('delete_item', **kwargs)
+
+    def query(self, **kwargs) -> Dict:
+        return self._call('query', **kwargs)
+
+    def scan(self, **kwargs) -> Dict:
+        return self._call('scan', **kwargs)
+
+    def batch_get_item(self, RequestItems: Dict) -> Dict:
+        self.db.call('batch_get_item')
+        request_items = {table: {**request, 'Keys': [deserialize(key) for key in request['Keys']]}
+                         for table, request in RequestItems.items()}
+        response = self.db.batch_get_item(request_items)
+        return {
+            'Responses': {table: [serialize(item) for item in items] for table, items in response['Responses'].items()},
+            'UnprocessedKeys': {}
+        }
+
+    def batch_write_item(self, RequestItems: Dict) -> Dict:
+        self.db.call('batch_write_item')
+        request_items = {}
+        for table, requests in RequestItems.items():
+            request_items[table] = [
+                {'PutRequest': {'Item': deserialize(request['PutRequest']['Item'])}} if 'PutRequest' in request
+                else {'DeleteRequest': {'Key': deserialize(request['DeleteRequest']['Key'])}}
+                for request in requests
+            ]
+        return self.db.batch_write_item(request_items)
+
+    def get_paginator(self, operation: str) -> _Paginator:
+        return _Paginator(getattr(self, operation))
+
+
+class _BatchWriter:
+    """resource Table.batch_writer(): buffered puts and deletes sent 25 at a time"""
+
+    def __init__(self, table: 'LocalTable', overwrite_by_pkeys: Optional[List[str]] = None):
+        self.table = table
+        self.overwrite_by_pkeys = overwrite_by_pkeys
+        self.requests: List[Dict] = []
+
+    def _add(self, request: Dict, values: Dict) -> None:
+        if self.overwrite_by_pkeys:
+            key = [values.get(name) for name in self.overwrite_by_pkeys]
+            self.requests = [existing for existing in self.requests
+                             if [existing['_values'].get(name) for name in self.overwrite_by_pkeys] != key]
+        self.requests.append({**request, '_values': values})
+        if len(self.requests) >= BATCH_WRITE_LIMIT:
+            self.flush()
+
+    def put_item(self, Item: Dict) -> None:
+        item = _normalize(Item)
+        self._add({'PutRequest': {'Item': item}}, item)
+
+    def delete_item(self, Key: Dict) -> None:
+        key = _normalize(Key)
+        self._add({'DeleteRequest': {'Key': key}}, key)
+
+    def flush(self) -> None:
+        while self.requests:
+            chunk, self.requests = self.requests[:BATCH_WRITE_LIMIT], self.requests[BATCH_WRITE_LIMIT:]
+            self.table.db.call('batch_write_item')
+            self.table.db.batch_write_item({self.table.name: [
+                {name: value for name, value in request.items() if name != '_values'} for request in chunk
+            ]})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+
+
+def _normalize(values: Optional[Dict]) -> Optional[Dict]:
+    """Round-trip values through the serializer, as boto3 does (ints become Decimals, floats are rejected)"""
+    return deserialize(serialize(values)) if values is not None else None
+
+
+class LocalTable:
+    """resource Table: Python values in and out"""
+
+    def __init__(self, db: LocalDynamoDB, name: str):
+        db._schema(name)
+        self.db = db
+        self.name = name
+        self.meta = type('meta', (), {'client': db.client})()
+
+    def _call(self, operation: str, **kwargs) -> Dict:
+        self.db.call(operation)
+        names = dict(kwargs.pop('ExpressionAttributeNames', None) or {})
+        values = dict(kwargs.pop('ExpressionAttributeValues', None) or {})
+        for argument, is_key in (('KeyConditionExpression', True), ('FilterExpression', False), ('ConditionExpression', False)):
+            if argument in kwargs:
+                kwargs[argument] = _as_expression(kwargs[argument], names, values, is_key)
+        for argument in ('Key', 'Item', 'ExclusiveStartKey'):
+            if argument in kwargs:
+                kwargs[argument] = _normalize(kwargs[argument])
+        if names:
+            kwargs['ExpressionAttributeNames'] = names
+        if values:
+            kwargs['ExpressionAttributeValues'] = _normalize(values)
+        return getattr(self.db, operation)(TableName=self.name, **kwargs)
+
+    def get_item(self, **kwargs) -> Dict:
+        return self._call('get_item', **kwargs)
+
+    def put_item(self, **kwargs) -> Dict:
+        return self._call('put_item', **kwargs)
+
+    def update_item(self, **kwargs) -> Dict:
+        return self._call('update_item', **kwargs)
+
+    def delete_item(self, **kwargs) -> Dict:
+        return self._call('delete_item', **kwargs)
+
+    def query(self, **kwargs) -> Dict:
+        return self._call('query', **kwargs)
+
+    def scan(self, **kwargs) -> Dict:
+        return self._call('scan', **kwargs)
+
+    def batch_writer(self, overwrite_by_pkeys: Optional[List[str]] = None) -> _BatchWriter:
+        return _BatchWriter(self, overwrite_by_pkeys)
+
+
+class LocalDynamoDBResource:
+    """resource('dynamodb'): Table() and batch_get_item with Python values"""
+
+    def __init__(self, db: LocalDynamoDB):
+        self.db = db
+        self.meta = type('meta', (), {'client': db.client})()
+
+    def Table(self, name: str) -> LocalTable:
+        return LocalTable(self.db, name)
+
+    def batch_get_item(self, RequestItems: Dict) -> Dict:
+        self.db.call('batch_get_item')
+        request_items = {table: {**request, 'Keys': [_normalize(key) for key in request['Keys']]}
+                         for table, request in RequestItems.items()}
+        return self.db.batch_get_item(request_items)
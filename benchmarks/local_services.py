@@ -0,0 +1,356 @@
+"""Local stand-ins for Bedrock, the WebSocket management API and the news providers.
+
+- LocalBedrock answers analysis prompts (single and batched, buffered and
+  streamed) with well-formed JSON for the candidate tickers in the prompt.
+  Latency follows time-to-first-token plus a per-output-token cost with
+  lognormal jitter, and a token bucket throttles calls beyond a request rate
+  with ThrottlingException, like an account quota. Small models (Haiku)
+  answer fast_factor times faster than the others. A malformed_ratio share
+  of responses is mangled the way real ones go wrong (prose around the JSON,
+  cut off mid-object, or no JSON at all).
+- LocalApiGateway records every post_to_connection with a fixed latency and
+  answers GoneException for connections marked as closed.
+- ReplaySession replays recorded provider responses (benchmarks/fixtures),
+  publishing fresh articles at a fixed rate: each article is built from a
+  recorded item, with a new URL, publish time and generated headline.
+"""
+import hashlib
+import io
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from botocore.exceptions import ClientError
+
+FIXTURES_DIR = Path(__file__).resolve().parent / 'fixtures'
+
+ARTICLE_RE = re.compile(r'<article id="([^"]+)">(.*?)</article>', re.S)
+CANDIDATES_RE = re.compile(r'Candidate Tickers: ([A-Z., ]+)')
+SENTIMENTS = ['bullish', 'bearish', 'neutral']
+# Tickers the stub picks from when a prompt carries no candidate list
+FALLBACK_TICKERS = ['AAPL', 'MSFT', 'NVDA', 'AMZN', 'JPM']
+# Characters streamed per content_block_delta event
+STREAM_CHUNK_CHARS = 24
+# Model IDs containing one of these get the fast latency profile
+FAST_MODEL_MARKERS = ('haiku',)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token), as bedrock_analysis uses"""
+    return len(text) // 4 + 1
+
+
+class LocalBedrock:
+    """bedrock-runtime stand-in with a latency model and a request-rate quota"""
+
+    def __init__(self, first_token_ms: float = 600.0, ms_per_token: float = 12.0,
+                 requests_per_second: float = 0.0, jitter: float = 0.25, seed: int = 0, fast_factor: float = 0.35,
+                 malformed_ratio: float = 0.0):
+        self.first_token_ms = first_token_ms
+        self.ms_per_token = ms_per_token
+        self.requests_per_second = requests_per_second
+        self.jitter = jitter
+        self.fast_factor = fast_factor
+        self.malformed_ratio = malformed_ratio
+        self.malformed = 0
+        self.rng = random.Random(seed)
+        self.calls: List[Dict] = []
+        self.throttled = 0
+        self._tokens = requests_per_second
+        self._refilled = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _admit(self, operation: str) -> None:
+        """Take a request from the token bucket or throttle"""
+        if not self.requests_per_second:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.requests_per_second,
+                               self._tokens + (now - self._refilled) * self.requests_per_second)
+            self._refilled = now
+            if self._tokens < 1:
+                self.throttled += 1
+                raise ClientError({'Error': {'Code': 'ThrottlingException', 'Message': 'Too many requests'}}, operation)
+            self._tokens -= 1
+
+    def _answer(self, prompt: str) -> str:
+        """answer(), occasionally mangled"""
+        text = answer(prompt)
+        with self._lock:
+            if not self.malformed_ratio or self.rng.random() >= self.malformed_ratio:
+                return text
+            self.malformed += 1
+            kind = self.rng.choice(['prose', 'truncated', 'garbage'])
+            cut = self.rng.randint(len(text) // 3, len(text) - 1)
+        if kind == 'prose':
+            return f"Here is my answer {{brief}}:\n{text}\nLet me know if you need anything else."
+        if kind == 'truncated':
+            return text[:cut]
+        return "I'm unable to determine the sentiment of this article."
+
+    def _durations(self, model_id: str, output_tokens: int):
+        """Seconds to the first token and for the rest of the output"""
+        with self._lock:
+            factor = self.rng.lognormvariate(0, self.jitter) if self.jitter else 1.0
+        if any(marker in model_id.lower() for marker in FAST_MODEL_MARKERS):
+            factor *= self.fast_factor
+        return self.first_token_ms * factor / 1000, output_tokens * self.ms_per_token * factor / 1000
+
+    def _record(self, model_id: str, started: float, prompt: str, text: str, streamed: bool) -> None:
+        with self._lock:
+            self.calls.append({
+                'model': model_id,
+                'started': started,
+                'seconds': time.time() - started,
+                'input_tokens': estimate_tokens(prompt),
+                'output_tokens': estimate_tokens(text),
+                'articles': max(1, len(ARTICLE_RE.findall(prompt))),
+                'streamed': streamed
+            })
+
+    def invoke_model(self, modelId: str, body: str, **_) -> Dict:
+        self._admit('InvokeModel')
+        started = time.time()
+        prompt = json.loads(body)['messages'][0]['content']
+        text = self._answer(prompt)
+        first_token, generation = self._durations(modelId, estimate_tokens(text))
+        time.sleep(first_token + generation)
+        self._record(modelId, started, prompt, text, False)
+        payload = {
+            'content': [{'type': 'text', 'text': text}],
+            'stop_reason': 'end_turn',
+            'usage': {'input_tokens': estimate_tokens(prompt), 'output_tokens': estimate_tokens(text)}
+        }
+        return {'body': io.BytesIO(json.dumps(payload).encode('utf-8'))}
+
+    def invoke_model_with_response_stream(self, modelId: str, body: str, **_) -> Dict:
+        self._admit('InvokeModelWithResponseStream')
+        started = time.time()
+        prompt = json.loads(body)['messages'][0]['content']
+        text = self._answer(prompt)
+        first_token, generation = self._durations(modelId, estimate_tokens(text))
+
+        def events():
+            time.sleep(first_token)
+            usage = {'input_tokens': estimate_tokens(prompt), 'output_tokens': 1}
+            yield {'chunk': {'bytes': json.dumps({'type': 'message_start', 'message': {'usage': usage}}).encode('utf-8')}}
+            chunks = [text[start:start + STREAM_CHUNK_CHARS] for start in range(0, len(text), STREAM_CHUNK_CHARS)]
+            for chunk in chunks:
+                time.sleep(generation / len(chunks))
+                event = {'type': 'content_block_delta', 'index': 0, 'delta': {'type': 'text_delta', 'text': chunk}}
+                yield {'chunk': {'bytes': json.dumps(event).encode('utf-8')}}
+            event = {'type': 'message_delta', 'delta': {'stop_reason': 'end_turn'}, 'usage': {'output_tokens': estimate_tokens(text)}}
+            yield {'chunk': {'bytes': json.dumps(event).encode('utf-8')}}
+            self._record(modelId, started, prompt, text, True)
+
+        return {'body': events()}
+
+
+def _stub_analysis(key: str, candidates: List[str]) -> Dict:
+    """Deterministic analysis of one article, keyed by its ID or text"""
+    digest = hashlib.sha1(key.encode('utf-8')).digest()
+    tickers = candidates or [FALLBACK_TICKERS[digest[0] % len(FALLBACK_TICKERS)]]
+    return {
+        'sentiment_overall': SENTIMENTS[digest[1] % len(SENTIMENTS)],
+        'affected_tickers': [
+            {
+                'ticker': ticker,
+                'sentiment': SENTIMENTS[digest[(2 + index) % len(digest)] % len(SENTIMENTS)],
+                'reasoning': f"Replay benchmark stub analysis for {ticker}"
+            }
+            for index, ticker in enumerate(tickers[:3])
+        ]
+    }
+
+
+def _candidates(text: str) -> List[str]:
+    match = CANDIDATES_RE.search(text)
+    return [ticker.strip() for ticker in match.group(1).split(',') if ticker.strip()] if match else []
+
+
+def answer(prompt: str) -> str:
+    """Model output for an analysis prompt, in the format the prompt asks for"""
+    articles = ARTICLE_RE.findall(prompt)
+    if articles:
+        results = [{'id': article_id, **_stub_analysis(article_id, _candidates(text))} for article_id, text in articles]
+        return json.dumps({'results': results}, indent=2)
+    return '```json\n' + json.dumps(_stub_analysis(prompt, _candidates(prompt)), indent=2) + '\n```'
+
+
+class GoneException(ClientError):
+    """Raised for posts to a closed connection"""
+
+    def __init__(self, connection_id: str):
+        super().__init__({'Error': {'Code': 'GoneException', 'Message': f"{connection_id} is gone"}}, 'PostToConnection')
+
+
+class LocalApiGateway:
+    """apigatewaymanagementapi stand-in recording deliveries"""
+
+    exceptions = type('exceptions', (), {'GoneException': GoneException})
+
+    def __init__(self, post_ms: float = 0.0, gone: Optional[set] = None):
+        self.post_ms = post_ms
+        self.gone = set(gone or ())
+        self.deliveries: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def post_to_connection(self, ConnectionId: str, Data) -> Dict:
+        started = time.time()
+        if self.post_ms:
+            time.sleep(self.post_ms / 1000)
+        if ConnectionId in self.gone:
+            raise GoneException(ConnectionId)
+        try:
+            message = json.loads(Data)
+        except ValueError:
+            message = {}
+        with self._lock:
+            self.deliveries.append({
+                'connectionId': ConnectionId,
+                'type': message.get('type'),
+                'articleId': message.get('articleId'),
+                'bytes': len(Data),
+                'started': started,
+                'delivered': time.time()
+            })
+        return {}
+
+
+class ReplayResponse:
+    """The parts of requests.Response the news sources use"""
+
+    def __init__(self, status_code: int, headers: Dict, content: bytes):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    def json(self) -> Dict:
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+def load_fixtures(sources: List[str]) -> Dict[str, Dict]:
+    """Recorded responses by source name"""
+    fixtures = {}
+    for source in sources:
+        path = FIXTURES_DIR / f"{source}.json"
+        if path.exists():
+            fixtures[source] = json.loads(path.read_text(encoding='utf-8'))
+    return fixtures
+
+
+class ReplaySession:
+    """requests.Session stand-in serving recorded payloads with freshly published articles"""
+
+    def __init__(self, news_sources: Dict[str, Dict], fixtures: Dict[str, Dict], rate: float,
+                 companies: List[str], match_ratio: float = 0.7, latency_ms: float = 0.0, seed: int = 0):
+        self.news_sources = news_sources
+        self.fixtures = fixtures
+        self.by_url = {config['url']: name for name, config in news_sources.items() if name in fixtures}
+        # Each replayed source publishes an equal share of the rate
+        self.rate = rate / max(1, len(self.by_url))
+        self.companies = companies
+        self.match_ratio = match_ratio
+        self.latency_ms = latency_ms
+        self.rng = random.Random(seed)
+        self.words = sorted({
+            word for fixture in fixtures.values()
+            for item in _items(fixture, news_sources)
+            for word in re.findall(r"[A-Za-z][A-Za-z'-]+", item.get('title', ''))
+        }) or ['markets']
+        self.published: Dict[str, float] = {}
+        self._started: Dict[str, float] = {}
+        self._owed: Dict[str, float] = {}
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    def get(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None, timeout=None) -> ReplayResponse:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        source = self.by_url.get(url)
+        if not source:
+            return ReplayResponse(404, {}, b'{}')
+
+        fixture = self.fixtures[source]
+        config = self.news_sources[source]
+        with self._lock:
+            now = time.time()
+            # Articles published since the previous poll of this source
+            owed = self._owed.get(source, 0.0) + (now - self._started.get(source, now)) * self.rate
+            if source not in self._started:
+                owed = 1.0
+            count = int(owed)
+            self._owed[source] = owed - count
+            self._started[source] = now
+            templates = _items(fixture, self.news_sources)
+            items = [self._new_item(source, config, self.rng.choice(templates), now) for _ in range(count)] if templates else []
+
+        body = {**fixture.get('body', {}), config['items_field']: items}
+        return ReplayResponse(fixture.get('status', 200), dict(fixture.get('headers', {})), json.dumps(body).encode('utf-8'))
+
+    def _new_item(self, source: str, config: Dict, template: Dict, now: float) -> Dict:
+        """A recorded item re-published as a new article"""
+        self._counter += 1
+        words = self.rng.sample(self.words, min(8, len(self.words)))
+        if self.companies and self.rng.random() < self.match_ratio:
+            words.insert(0, self.rng.choice(self.companies))
+        title = ' '.join(words)
+
+        item = json.loads(json.dumps(template))
+        item['title'] = title
+        item['url'] = f"https://replay.invalid/{source}/{self._counter}"
+        for field in ('description', 'summary'):
+            if field in item:
+                item[field] = f"{title}. {item[field]}"
+        published_field = config['cursor']['published_field']
+        published = datetime.fromtimestamp(now, timezone.utc)
+        if re.fullmatch(r'\d{8}T\d{6}', str(template.get(published_field, ''))):
+            item[published_field] = published.strftime('%Y%m%dT%H%M%S')
+        else:
+            item[published_field] = published.strftime('%Y-%m-%dT%H:%M:%SZ')
+        self.published[item['url']] = now
+        return item
+
+
+def _items(fixture: Dict, news_sources: Dict[str, Dict]) -> List[Dict]:
+    for name, config in news_sources.items():
+        if name == fixture.get('source'):
+            return fixture.get('body', {}).get(config['items_field'], [])
+    return []
+
+
+def record_fixture(source: str, config: Dict, api_key: str, limit: int = 10) -> Path:
+    """Fetch one live response from a provider and save it as the source's fixture"""
+    import requests
+
+    params = dict(config['params'])
+    if config['api_key_query']:
+        params[config['api_key_query']] = api_key
+    response = requests.get(config['url'], params=params, timeout=config['deadline'])
+    response.raise_for_status()
+
+    body = response.json()
+    body[config['items_field']] = body.get(config['items_field'], [])[:limit]
+    kept_headers = ('Content-Type', 'ETag', 'Last-Modified', 'X-RateLimit-Remaining', 'X-RateLimit-Reset')
+    fixture = {
+        'source': source,
+        'recordedAt': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'status': response.status_code,
+        'headers': {name: response.headers[name] for name in kept_headers if name in response.headers},
+        'body': body
+    }
+    path = FIXTURES_DIR / f"{source}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(fixture, indent=2) + '\n', encoding='utf-8')
+    return path
+
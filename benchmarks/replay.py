@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+"""Replay benchmark for the ingestion -> analysis -> broadcast pipeline, run locally.
+
+Drives news_ingestion.handler on a fixed tick against replayed provider
+responses, forms DynamoDB stream batches the way Lambda's poller does
+(batch size / batching window), invokes bedrock_analysis.handler on them and
+lets it broadcast to simulated WebSocket clients. DynamoDB, Bedrock and the
+API Gateway management API are in-process stand-ins (see local_dynamodb.py
+and local_services.py); nothing talks to AWS. Reports per-stage throughput
+and latency percentiles, plus the stages the handlers time themselves
+(their Embedded Metric Format records, captured instead of logged):
+
+    python benchmarks/replay.py --rate 2 --duration 60 --clients 200
+    python benchmarks/replay.py --output before.json
+    python benchmarks/replay.py --baseline before.json   # exits 1 on a p95 regression
+
+Handler settings are read from the environment as in Lambda, so variants run
+the same way, e.g. BATCH_ANALYSIS_ENABLED=false python benchmarks/replay.py.
+Re-record provider fixtures (needs the providers' API keys in the environment):
+
+    python benchmarks/replay.py --record
+"""
+import argparse
+import importlib
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import boto3
+
+from local_dynamodb import LocalDynamoDB
+from local_services import LocalApiGateway, LocalBedrock, ReplaySession, load_fixtures, record_fixture
+
+SRC_DIR = Path(__file__).resolve().parent.parent / 'src'
+ARTICLES_TABLE = 'FinancialNewsArticles'
+CONNECTIONS_TABLE = 'WebSocketConnections'
+
+# Configuration the handlers read at import time, with every optional table enabled
+ENVIRONMENT = {
+    'AWS_DEFAULT_REGION': 'us-east-1',
+    'TABLE_NAME': ARTICLES_TABLE,
+    'DEDUP_TABLE_NAME': 'FinancialNewsDedupIndex',
+    'SOURCE_STATE_TABLE_NAME': 'FinancialNewsSourceState',
+    'ANALYSIS_CACHE_TABLE_NAME': 'FinancialNewsAnalysisCache',
+    'TICKER_SIGNALS_TABLE_NAME': 'FinancialNewsTickerSignals',
+    'LATEST_NEWS_TABLE_NAME': 'FinancialNewsLatest',
+    'CONNECTIONS_TABLE_NAME': CONNECTIONS_TABLE,
+    'WS_API_ENDPOINT': 'wss://replay.invalid',
+    'WS_API_ID': 'replay'
+}
+REPLAY_API_KEYS = {'NEWS_API_KEY': 'replay', 'ALPHAVANTAGE_API_KEY': 'replay'}
+
+STAGES = [
+    ('fetch', 'provider fetches per ingestion run'),
+    ('ingest', 'news_ingestion invocation'),
+    ('stream_lag', 'article write to analysis invocation'),
+    ('model_call', 'Bedrock call'),
+    ('fanout', 'news_update broadcast'),
+    ('post', 'single post_to_connection'),
+    ('analyze', 'bedrock_analysis invocation'),
+    ('first_push', 'article write to first client push'),
+    ('end_to_end', 'article write to news_update at every client'),
+    ('publish_to_push', 'provider publish to news_update at every client')
+]
+# Lambda's retries of a batch whose records keep failing
+STREAM_MAX_RETRIES = 3
+
+
+def load_function(name: str) -> Dict[str, object]:
+    """Import a Lambda in isolation and return its modules by name
+
+    Lambdas import their helper modules flat (clients, latest_view,
+    wire_format, ...), so each function's modules are dropped from
+    sys.modules after loading and the next function imports its own copies.
+    """
+    directory = SRC_DIR / name
+    local = {path.stem for path in directory.glob('*.py')}
+    for module in local:
+        sys.modules.pop(module, None)
+    sys.path.insert(0, str(directory))
+    try:
+        importlib.import_module('lambda_function')
+        return {module: sys.modules[module] for module in local if module in sys.modules}
+    finally:
+        sys.path.remove(str(directory))
+        for module in local:
+            sys.modules.pop(module, None)
+
+
+def install_stand_ins(db: LocalDynamoDB, bedrock: LocalBedrock, apigw: LocalApiGateway) -> None:
+    """Route boto3 clients and resources to the local stand-ins"""
+    clients = {'dynamodb': db.client, 'bedrock-runtime': bedrock, 'apigatewaymanagementapi': apigw}
+
+    def client(service: str, *args, **kwargs):
+        if service not in clients:
+            raise ValueError(f"No local stand-in for {service}")
+        return clients[service]
+
+    def resource(service: str, *args, **kwargs):
+        if service != 'dynamodb':
+            raise ValueError(f"No local stand-in for {service}")
+        return db.resource
+
+    boto3.client = client
+    boto3.resource = resource
+
+
+def seed_connections(db: LocalDynamoDB, count: int, tickers: List[str], subscribed_ratio: float,
+                     gone_ratio: float, rng: random.Random) -> set:
+    """Store WebSocket connections (some with ticker filters) and return the closed ones"""
+    now = int(time.time())
+    gone = set()
+    for index in range(count):
+        item = {
+            'connectionId': f"replay-{index:06d}",
+            'listKey': 'all',
+            'connectedAt': now,
+            'updatedAt': now,
+            'ttl': now + 86400
+        }
+        if tickers and rng.random() < subscribed_ratio:
+            item['tickers'] = set(rng.sample(tickers, rng.randint(1, 3)))
+        if rng.random() < gone_ratio:
+            gone.add(item['connectionId'])
+        db.put_item(TableName=CONNECTIONS_TABLE, Item=item)
+    return gone
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile (fraction in 0-1)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class Timings:
+    """Latency samples (seconds) per stage, safe to add to from several threads"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {stage: [] for stage, _ in STAGES}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.samples[stage].append(seconds)
+
+
+def handler_stages(records: List[Dict]) -> Dict[str, Dict]:
+    """Count and latency percentiles (ms) per function/stage of the handlers' EMF records"""
+    samples: Dict[str, List[float]] = {}
+    for function, record in records:
+        if 'Latency' not in record:
+            continue
+        latency = record['Latency']
+        samples.setdefault(f"{function}/{record['Stage']}", []).extend(latency if isinstance(latency, list) else [latency])
+    return {
+        name: {
+            'count': len(values),
+            'p50': percentile(values, 0.50),
+            'p95': percentile(values, 0.95),
+            'p99': percentile(values, 0.99),
+            'max': max(values)
+        }
+        for name, values in sorted(samples.items())
+    }
+
+
+def model_usage(records: List[Dict]) -> Dict[str, Dict]:
+    """Calls, tokens and cost per model from the handlers' usage records"""
+    usage: Dict[str, Dict] = {}
+    for _, record in records:
+        if 'Model' not in record:
+            continue
+        totals = usage.setdefault(record['Model'], {'calls': 0, 'input_tokens': 0, 'output_tokens': 0, 'cost_usd': 0.0})
+        totals['calls'] += 1
+        totals['input_tokens'] += record['InputTokens']
+        totals['output_tokens'] += record['OutputTokens']
+        totals['cost_usd'] = round(totals['cost_usd'] + record['CostUsd'], 6)
+    return usage
+
+
+def consume_stream(db: LocalDynamoDB, handler, args, timings: Timings, counts: Dict, inserted: Dict,
+                   stop: threading.Event) -> None:
+    """Deliver article stream batches to the analysis handler until stopped and drained"""
+    retries: Dict[str, int] = {}
+    while True:
+        records = db.take_stream_records(ARTICLES_TABLE, args.batch_size, args.batch_window, timeout=0.5)
+        if not records:
+            if stop.is_set():
+                return
+            continue
+
+        started = time.time()
+        for record in records:
+            if record['eventName'] == 'INSERT':
+                written = record['dynamodb']['ApproximateCreationDateTime']
+                inserted.setdefault(record['dynamodb']['Keys']['articleId']['S'], written)
+                timings.add('stream_lag', started - written)
+        try:
+            response = handler({'Records': records}, None)
+        except Exception as e:
+            # A failed invocation retries the whole batch
+            print(f"Analysis handler failed: {str(e)}", file=sys.stderr)
+            response = {'batchItemFailures': [{'itemIdentifier': record['dynamodb']['SequenceNumber']} for record in records]}
+        timings.add('analyze', time.time() - started)
+        counts['analysis_invocations'] += 1
+
+        # Lambda retries from the first failed record of the batch onwards
+        failed = {failure['itemIdentifier'] for failure in response.get('batchItemFailures', [])}
+        if failed:
+            first = next(index for index, record in enumerate(records) if record['dynamodb']['SequenceNumber'] in failed)
+            sequence = records[first]['dynamodb']['SequenceNumber']
+            retries[sequence] = retries.get(sequence, 0) + 1
+            if retries[sequence] <= STREAM_MAX_RETRIES:
+                counts['stream_retries'] += 1
+                db.requeue_stream_records(ARTICLES_TABLE, records[first:])
+            else:
+                counts['stream_dropped'] += len(records) - first
+
+
+def summarize(timings: Timings, elapsed: float) -> Dict[str, Dict]:
+    """Count, throughput and latency percentiles (ms) per stage"""
+    summary = {}
+    for stage, _ in STAGES:
+        samples = timings.samples[stage]
+        summary[stage] = {
+            'count': len(samples),
+            'per_second': round(len(samples) / elapsed, 3) if elapsed else 0.0,
+            **{
+                name: round(value * 1000, 1) if value is not None else None
+                for name, value in (('p50', percentile(samples, 0.50)), ('p95', percentile(samples, 0.95)),
+                                    ('p99', percentile(samples, 0.99)), ('max', max(samples) if samples else None))
+            }
+        }
+    return summary
+
+
+def print_report(out, summary: Dict[str, Dict], handler: Dict[str, Dict], usage: Dict[str, Dict], counts: Dict,
+                 bedrock: LocalBedrock, db: LocalDynamoDB) -> None:
+    def ms(value: Optional[float]) -> str:
+        return f"{value:10.1f}" if value is not None else f"{'-':>10}"
+
+    print(f"\n{'stage':<16}{'count':>7}{'per sec':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}  description", file=out)
+    for stage, description in STAGES:
+        row = summary[stage]
+        print(f"{stage:<16}{row['count']:>7}{row['per_second']:>9.2f}{ms(row['p50'])}{ms(row['p95'])}{ms(row['p99'])}{ms(row['max'])}  {description}", file=out)
+
+    if handler:
+        print(f"\n{'handler stage':<32}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}", file=out)
+        for name, row in handler.items():
+            print(f"{name:<32}{row['count']:>7}{ms(row['p50'])}{ms(row['p95'])}{ms(row['p99'])}{ms(row['max'])}", file=out)
+
+    print('\n' + ', '.join(f"{name}: {value}" for name, value in counts.items()), file=out)
+    if bedrock.calls:
+        articles = sum(call['articles'] for call in bedrock.calls)
+        input_tokens = sum(call['input_tokens'] for call in bedrock.calls)
+        output_tokens = sum(call['output_tokens'] for call in bedrock.calls)
+        print(f"bedrock: {len(bedrock.calls)} calls, {articles / len(bedrock.calls):.1f} articles/call, "
+              f"~{input_tokens} input / ~{output_tokens} output tokens, {bedrock.throttled} throttled", file=out)
+    for model, totals in usage.items():
+        print(f"usage recorded by bedrock_analysis: {model} {totals['calls']} calls, {totals['input_tokens']} input / "
+              f"{totals['output_tokens']} output tokens, ${totals['cost_usd']:.4f}", file=out)
+    print('dynamodb calls: ' + ', '.join(f"{operation} {count}" for operation, count in sorted(db.calls.items())), file=out)
+
+
+def regressions(summary: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float, floor_ms: float) -> List[str]:
+    """Stages whose p95 grew past the baseline by more than tolerance (and floor_ms)"""
+    found = []
+    for stage, row in summary.items():
+        before = baseline.get(stage, {}).get('p95')
+        if before is None or row['p95'] is None:
+            continue
+        if row['p95'] > before * (1 + tolerance) and row['p95'] - before > floor_ms:
+            found.append(f"{stage}: p95 {before} ms -> {row['p95']} ms")
+    return found
+
+
+def run(args) -> int:
+    for name, value in {**ENVIRONMENT, **REPLAY_API_KEYS}.items():
+        os.environ.setdefault(name, value)
+    rng = random.Random(args.seed)
+
+    db = LocalDynamoDB(latency_ms=args.dynamodb_ms)
+    bedrock = LocalBedrock(args.bedrock_first_token_ms, args.bedrock_ms_per_token, args.bedrock_rps, seed=args.seed,
+                           fast_factor=args.bedrock_fast_factor, malformed_ratio=args.bedrock_malformed_ratio)
+    apigw = LocalApiGateway(args.post_ms)
+    install_stand_ins(db, bedrock, apigw)
+
+    ingestion = load_function('news_ingestion')
+    analysis = load_function('bedrock_analysis')
+
+    # The handlers' own stage timings (metrics.py), kept instead of written to stdout
+    emf: List = []
+    for name, function in (('news_ingestion', ingestion), ('bedrock_analysis', analysis)):
+        function['metrics'].set_sink(lambda line, name=name: emf.append((name, json.loads(line))))
+
+    companies = analysis['sp500'].SP500_COMPANIES
+    apigw.gone = seed_connections(db, args.clients, sorted(companies), args.subscribed_ratio, args.gone_ratio, rng)
+
+    sources = ingestion['sources']
+    fixtures = load_fixtures(list(sources.NEWS_SOURCES))
+    if not fixtures:
+        print(f"No fixtures found in {Path(__file__).resolve().parent / 'fixtures'}")
+        return 1
+    session = ReplaySession(
+        sources.NEWS_SOURCES, fixtures, args.rate,
+        companies=[aliases[0] for aliases in companies.values() if aliases],
+        match_ratio=args.match_ratio, latency_ms=args.provider_ms, seed=args.seed
+    )
+    sources._http_session = session
+
+    timings = Timings()
+    counts = {'ingestion_runs': 0, 'fetched': 0, 'saved': 0, 'analysis_invocations': 0,
+              'stream_retries': 0, 'stream_dropped': 0}
+    inserted: Dict[str, float] = {}
+
+    # The fan-out stage is the analysis handler's broadcast of each final update
+    module = analysis['lambda_function']
+    broadcast = module.broadcast
+
+    def timed_broadcast(message: Dict) -> None:
+        started = time.time()
+        try:
+            broadcast(message)
+        finally:
+            if message.get('type') == 'news_update':
+                timings.add('fanout', time.time() - started)
+
+    module.broadcast = timed_broadcast
+
+    out = sys.stdout
+    if not args.verbose:
+        # Handler logging would swamp the report
+        sys.stdout = open(os.devnull, 'w')
+    stop = threading.Event()
+    consumer = threading.Thread(
+        target=consume_stream,
+        args=(db, module.handler, args, timings, counts, inserted, stop),
+        daemon=True
+    )
+    started = time.time()
+    try:
+        consumer.start()
+        next_tick = started
+        while time.time() < started + args.duration:
+            run_started = time.time()
+            response = ingestion['lambda_function'].handler({'httpMethod': 'POST', 'path': '/ingest'}, None)
+            timings.add('ingest', time.time() - run_started)
+            body = json.loads(response['body'])
+            timings.add('fetch', body.get('fetch_ms', 0) / 1000)
+            counts['ingestion_runs'] += 1
+            counts['fetched'] += body.get('articles_fetched', 0)
+            counts['saved'] += body.get('articles_saved', 0)
+            next_tick += args.tick
+            time.sleep(max(0.0, next_tick - time.time()))
+
+        stop.set()
+        consumer.join(args.drain_timeout)
+    finally:
+        if sys.stdout is not out:
+            sys.stdout.close()
+            sys.stdout = out
+    elapsed = time.time() - started
+
+    for call in bedrock.calls:
+        timings.add('model_call', call['seconds'])
+    first_push: Dict[str, float] = {}
+    last_update: Dict[str, float] = {}
+    for delivery in apigw.deliveries:
+        timings.add('post', delivery['delivered'] - delivery['started'])
+        article_id = delivery['articleId']
+        if article_id:
+            first_push[article_id] = min(first_push.get(article_id, delivery['delivered']), delivery['delivered'])
+            if delivery['type'] == 'news_update':
+                last_update[article_id] = max(last_update.get(article_id, 0), delivery['delivered'])
+    urls = {key[0]: item.get('url') for key, item in db.items[ARTICLES_TABLE].items()}
+    for article_id, written in inserted.items():
+        if article_id in first_push:
+            timings.add('first_push', first_push[article_id] - written)
+        if article_id in last_update:
+            timings.add('end_to_end', last_update[article_id] - written)
+            published = session.published.get(urls.get(article_id))
+            if published:
+                timings.add('publish_to_push', last_update[article_id] - published)
+
+    counts['analyzed'] = sum(1 for item in db.items[ARTICLES_TABLE].values() if item.get('status') == 'analyzed')
+    # Which model tier (local, fast or full) produced each analysis
+    for item in db.items[ARTICLES_TABLE].values():
+        analysis = item.get('analysis') if isinstance(item.get('analysis'), dict) else {}
+        if analysis.get('tier'):
+            counts[f"tier_{analysis['tier']}"] = counts.get(f"tier_{analysis['tier']}", 0) + 1
+    counts['malformed_responses'] = bedrock.malformed
+    counts['parse_failures'] = sum(record.get('ParseFailures', 0) for _, record in emf)
+    counts['posts'] = len(apigw.deliveries)
+    counts['pending_at_exit'] = len(db.stream[ARTICLES_TABLE])
+    summary = summarize(timings, elapsed)
+    handler = handler_stages(emf)
+    usage = model_usage(emf)
+    print(f"Replayed {args.duration:.0f}s at {args.rate} articles/s to {args.clients} clients "
+          f"(tick {args.tick}s, stream batch {args.batch_size}/{args.batch_window}s), {elapsed:.1f}s wall")
+    print_report(sys.stdout, summary, handler, usage, counts, bedrock, db)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({
+            'config': {name: value for name, value in vars(args).items() if name not in ('output', 'baseline')},
+            'counts': counts,
+            'stages': summary,
+            'handler_stages': handler,
+            'model_usage': usage
+        }, indent=2) + '\n', encoding='utf-8')
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))['stages']
+        found = regressions(summary, baseline, args.tolerance, args.floor_ms)
+        if found:
+            print('\nRegressions against baseline:\n  ' + '\n  '.join(found))
+            return 1
+        print('\nNo p95 regressions against baseline')
+    return 0
+
+
+def record(args) -> int:
+    """Capture one live response per source as its fixture"""
+    os.environ.setdefault('TABLE_NAME', ARTICLES_TABLE)
+    sources = load_function('news_ingestion')['sources']
+    for name, config in sources.NEWS_SOURCES.items():
+        api_key = os.environ.get(config['api_key_env'], '') if config['api_key_query'] else ''
+        if config['api_key_query'] and not api_key:
+            print(f"{name}: skipped ({config['api_key_env']} not set)")
+            continue
+        try:
+            print(f"{name}: recorded {record_fixture(name, config, api_key)}")
+        except Exception as e:
+            print(f"{name}: failed: {str(e)}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--record', action='store_true', help='Re-record provider fixtures from the live APIs and exit')
+    parser.add_argument('--rate', type=float, default=2.0, help='Articles published per second across all sources')
+    parser.add_argument('--duration', type=float, default=60.0, help='Seconds of ingestion to replay')
+    parser.add_argument('--tick', type=float, default=5.0, help='Seconds between ingestion runs')
+    parser.add_argument('--clients', type=int, default=100, help='Connected WebSocket clients')
+    parser.add_argument('--subscribed-ratio', type=float, default=0.3, help='Share of clients with ticker filters')
+    parser.add_argument('--gone-ratio', type=float, default=0.02, help='Share of clients whose connection has closed')
+    parser.add_argument('--match-ratio', type=float, default=0.7, help='Share of headlines naming an S&P 500 company')
+    parser.add_argument('--batch-size', type=int, default=20, help='Stream batch size (template.yaml BatchSize)')
+    parser.add_argument('--batch-window', type=float, default=10.0, help='Stream batching window seconds (MaximumBatchingWindowInSeconds)')
+    parser.add_argument('--bedrock-first-token-ms', type=float, default=600.0, help='Bedrock time to first token')
+    parser.add_argument('--bedrock-ms-per-token', type=float, default=12.0, help='Bedrock generation time per output token')
+    parser.add_argument('--bedrock-fast-factor', type=float, default=0.35, help='Latency of the fast (Haiku) model relative to the full one')
+    parser.add_argument('--bedrock-malformed-ratio', type=float, default=0.0, help='Share of Bedrock responses to mangle (prose, truncated, no JSON)')
+    parser.add_argument('--bedrock-rps', type=float, default=0.0, help='Bedrock requests per second before throttling (0 = unlimited)')
+    parser.add_argument('--dynamodb-ms', type=float, default=4.0, help='Latency of each DynamoDB call')
+    parser.add_argument('--post-ms', type=float, default=8.0, help='Latency of each post_to_connection')
+    parser.add_argument('--provider-ms', type=float, default=150.0, help='Latency of each provider fetch')
+    parser.add_argument('--drain-timeout', type=float, default=120.0, help='Seconds to wait for the stream to drain after ingestion stops')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed for articles, clients and latency jitter')
+    parser.add_argument('--output', help='Write the summary as JSON to this file')
+    parser.add_argument('--baseline', help='Compare p95 latencies with a summary written by --output')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed relative p95 growth over the baseline')
+    parser.add_argument('--floor-ms', type=float, default=5.0, help='Ignore p95 growth smaller than this')
+    parser.add_argument('--verbose', action='store_true', help='Show handler logs')
+    args = parser.parse_args()
+
+    sys.exit(record(args) if args.record else run(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,7 @@ import React, { useState, useEffect, useRef } from 'react';
 import './App.css';
 import NewsCard from './components/NewsCard';
 import ConnectionStatus from './components/ConnectionStatus';
+import { expandMessage, supportsCompression, unwrapMessage } from './wireFormat';
 
 // Configure these after deployment
 const WS_ENDPOINT = process.env.REACT_APP_WS_ENDPOINT || 'wss://your-api-id.execute-api.us-east-1.amazonaws.com/prod';
@@ -13,6 +14,13 @@ function App() {
   const [error, setError] = useState(null);
   const wsRef = useRef(null);
   const reconnectTimeoutRef = useRef(null);
+  // ETag of the last latest_news list, so reconnects skip an unchanged list
+  const latestEtagRef = useRef(null);
+  // Strategy dictionary of the compact wire format, sent once per connection
+  const dictionaryRef = useRef(null);
+  // Highest analysis sequence number received, so reconnects fetch only what was missed
+  const lastSeqRef = useRef(null);
+  const compression = supportsCompression ? ['gzip', 'deflate'] : [];
 
   useEffect(() => {
     connectWebSocket();
@@ -40,31 +48,74 @@ function App() {
         setConnectionStatus('connected');
         setError(null);
         
-        // Request latest news
-        ws.send(JSON.stringify({ action: 'get_latest' }));
+        // Switch to the compact format; latest news is requested once it is confirmed
+        ws.send(JSON.stringify({ action: 'set_format', format: 'compact', compression }));
       };
 
-      ws.onmessage = (event) => {
+      // Decompression is async, so messages are handled one at a time in
+      // arrival order; otherwise a later update could land before an earlier one
+      let messageQueue = Promise.resolve();
+      const handleMessage = async (event) => {
         try {
-          const data = JSON.parse(event.data);
+          const data = expandMessage(await unwrapMessage(JSON.parse(event.data)), dictionaryRef.current);
           
-          if (data.type === 'news_update') {
+          if (data.type === 'format') {
+            dictionaryRef.current = data.dictionary || null;
+            // Request latest news
+            ws.send(JSON.stringify({
+              action: 'get_latest',
+              etag: latestEtagRef.current,
+              since: lastSeqRef.current,
+              format: data.format,
+              compression
+            }));
+          } else if (data.type === 'news_update') {
             // New article received
+            if (data.seq) lastSeqRef.current = Math.max(lastSeqRef.current || 0, data.seq);
+            setArticles(prev => {
+              // Avoid duplicates, but let the final analysis replace streamed partials
+              const exists = prev.find(a => a.articleId === data.articleId);
+              if (exists && !exists.partial) return prev;
+              return [data, ...prev.filter(a => a.articleId !== data.articleId)].slice(0, 100); // Keep last 100
+            });
+          } else if (data.type === 'analysis_partial') {
+            // Early sentiment/ticker signal while the analysis is still streaming
             setArticles(prev => {
-              // Avoid duplicates
               const exists = prev.find(a => a.articleId === data.articleId);
-              if (exists) return prev;
-              return [data, ...prev].slice(0, 100); // Keep last 100
+              if (exists && !exists.partial) return prev;
+              const merged = {
+                ...(exists || data),
+                sentiment: data.sentiment || exists?.sentiment,
+                affectedTickers: { ...(exists?.affectedTickers || {}), ...(data.affectedTickers || {}) },
+                partial: true
+              };
+              return [merged, ...prev.filter(a => a.articleId !== data.articleId)].slice(0, 100);
             });
           } else if (data.type === 'latest_news') {
-            // Initial news load
-            setArticles(data.articles || []);
+            // Initial news load; unchanged means the list we hold is current
+            // and delta carries only the articles analyzed since our last seq
+            if (data.sequence) lastSeqRef.current = Math.max(lastSeqRef.current || 0, data.sequence);
+            if (data.delta) {
+              latestEtagRef.current = data.etag || null;
+              const updated = data.articles || [];
+              setArticles(prev => [
+                ...updated,
+                ...prev.filter(a => !updated.some(u => u.articleId === a.articleId))
+              ].slice(0, 100));
+            } else if (!data.unchanged) {
+              latestEtagRef.current = data.etag || null;
+              setArticles(data.articles || []);
+            }
           }
         } catch (err) {
           console.error('Error parsing WebSocket message:', err);
         }
       };
 
+      ws.onmessage = (event) => {
+        messageQueue = messageQueue.then(() => handleMessage(event));
+      };
+
       ws.onerror = (error) => {
         console.error('WebSocket error:', error);
         setConnectionStatus('error');
@@ -0,0 +1,44 @@
+// Decoding for the compact WebSocket wire format (see README "Compact wire format")
+
+export const supportsCompression = typeof DecompressionStream !== 'undefined';
+
+// Unwrap a {type, encoding, data} envelope of a compressed message
+export const unwrapMessage = async (data) => {
+  if (!data.encoding) return data;
+  const bytes = Uint8Array.from(atob(data.data), c => c.charCodeAt(0));
+  const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream(data.encoding));
+  return JSON.parse(await new Response(stream).text());
+};
+
+// Restore strategy names from dictionary IDs, or from the sentiment's defaults
+const expandTickers = (affectedTickers, dictionary) => {
+  if (!affectedTickers || !dictionary) return affectedTickers;
+  const expanded = {};
+  Object.entries(affectedTickers).forEach(([ticker, info]) => {
+    const ids = info.strategies || dictionary.defaults[(info.sentiment || '').toLowerCase()] || [];
+    expanded[ticker] = {
+      ...info,
+      strategies: ids.map(id => (typeof id === 'number' ? dictionary.strategies[id] : id))
+    };
+  });
+  return expanded;
+};
+
+// Expand a compact news_update / analysis_partial / latest_news message
+export const expandMessage = (data, dictionary) => {
+  if (data.rows) {
+    let timestamp = 0;
+    const articles = data.rows.map((row, index) => {
+      const article = {};
+      data.fields.forEach((field, i) => { article[field] = row[i]; });
+      timestamp = index === 0 ? article.timestamp : timestamp - article.timestamp;
+      return { ...article, timestamp, affectedTickers: expandTickers(article.affectedTickers, dictionary) };
+    });
+    const { fields, rows, ...rest } = data;
+    return { ...rest, articles };
+  }
+  if (data.affectedTickers) {
+    return { ...data, affectedTickers: expandTickers(data.affectedTickers, dictionary) };
+  }
+  return data;
+};
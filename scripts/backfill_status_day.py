@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Backfill the day-bucket index keys and ticker signals of articles stored before they existed.
+
+Articles without statusDay are invisible to the newest-first reads in
+get_news and the WebSocket get_latest action. Analyzed articles without
+sentimentDay are missing from ?sentiment= listings, and those analyzed
+before the ticker-signal table existed have no rows in it, so ticker
+queries don't find them. Run once after deploying:
+
+    python scripts/backfill_status_day.py --table FinancialNewsArticles \\
+        --signals-table FinancialNewsTickerSignals
+
+Without --signals-table only the index keys are backfilled.
+"""
+import argparse
+import json
+import boto3
+from datetime import datetime
+
+SENTIMENTS = {'bullish', 'bearish', 'neutral'}
+
+
+def day_bucket(prefix: str, timestamp: int) -> str:
+    """Day-bucketed index partition key: a status or sentiment plus the UTC day of the timestamp"""
+    return f"{prefix}#{datetime.utcfromtimestamp(timestamp).strftime('%Y-%m-%d')}"
+
+
+def trading_strategies(item: dict) -> dict:
+    """An article's tradingStrategies map (schema version 1 stored it as a JSON string)"""
+    value = item.get('tradingStrategies')
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return {}
+    return value if isinstance(value, dict) else {}
+
+
+def write_ticker_signals(signals_table, item: dict, timestamp: int) -> int:
+    """Write the ticker-signal rows of an analyzed article, as bedrock_analysis does; returns the row count"""
+    strategies = trading_strategies(item)
+    with signals_table.batch_writer(overwrite_by_pkeys=['ticker', 'signalKey']) as batch:
+        for ticker, info in strategies.items():
+            info = info if isinstance(info, dict) else {}
+            sentiment = str(info.get('sentiment', 'neutral')).lower()
+            if sentiment not in SENTIMENTS:
+                sentiment = 'neutral'
+            batch.put_item(Item={
+                'ticker': ticker,
+                'signalKey': f"{timestamp:010d}#{item['articleId']}",
+                'articleId': item['articleId'],
+                'timestamp': timestamp,
+                'sentiment': sentiment,
+                'tickerSentiment': f"{ticker}#{sentiment}",
+                'reasoning': info.get('reasoning', ''),
+                # Denormalized so /tickers/{ticker}/signals needs no article reads
+                'title': item.get('title', ''),
+                'url': item.get('url', ''),
+                'publishedAt': item.get('publishedAt', '')
+            })
+    return len(strategies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--table', default='FinancialNewsArticles', help='News articles table name')
+    parser.add_argument('--signals-table', default=None, help='Ticker-signal table name (skip signal rows when omitted)')
+    parser.add_argument('--region', default=None, help='AWS region (defaults to the configured one)')
+    args = parser.parse_args()
+
+    dynamodb = boto3.resource('dynamodb', region_name=args.region)
+    table = dynamodb.Table(args.table)
+    signals_table = dynamodb.Table(args.signals_table) if args.signals_table else None
+    kwargs = {
+        'FilterExpression': 'attribute_not_exists(statusDay) OR (#status = :analyzed AND attribute_not_exists(sentimentDay))',
+        'ProjectionExpression': 'articleId, #status, #timestamp, statusDay, sentiment, tradingStrategies, title, #url, publishedAt',
+        'ExpressionAttributeNames': {'#status': 'status', '#timestamp': 'timestamp', '#url': 'url'},
+        'ExpressionAttributeValues': {':analyzed': 'analyzed'}
+    }
+    updated = 0
+    signals = 0
+
+    while True:
+        response = table.scan(**kwargs)
+        for item in response.get('Items', []):
+            if not item.get('status') or not item.get('timestamp'):
+                continue
+            timestamp = int(item['timestamp'])
+            update = 'SET statusDay = :statusDay'
+            values = {':statusDay': day_bucket(item['status'], timestamp)}
+            if item['status'] == 'analyzed':
+                # Signal rows first, so an interrupted run redoes this article
+                if signals_table:
+                    signals += write_ticker_signals(signals_table, item, timestamp)
+                update += ', sentimentDay = :sentimentDay'
+                values[':sentimentDay'] = day_bucket(str(item.get('sentiment') or 'neutral').lower(), timestamp)
+            table.update_item(Key={'articleId': item['articleId']}, UpdateExpression=update, ExpressionAttributeValues=values)
+            updated += 1
+        if 'LastEvaluatedKey' not in response:
+            break
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    print(f"Backfilled statusDay/sentimentDay on {updated} articles" +
+          (f" and wrote {signals} ticker signals" if signals_table else ''))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Check each Lambda's module import time against its cold-start budget.
+
+Imports every src/<function>/lambda_function.py in a fresh interpreter with
+python -X importtime, reports the total and the heaviest modules, and exits
+non-zero when a function is over budget. Run from the repository root after
+changing imports or module-level setup:
+
+    python scripts/import_budget.py
+    python scripts/import_budget.py --function get_news --top 15
+
+Times vary between machines; budgets leave headroom over a local run and are
+meant to catch regressions such as a new eager client or a heavy import.
+"""
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / 'src'
+
+# Import budget in milliseconds per function
+BUDGETS_MS = {
+    'bedrock_analysis': 260,
+    'get_news': 250,
+    'news_ingestion': 250,
+    # Create their one DynamoDB client at init: every invocation uses it
+    'websocket_connect': 380,
+    'websocket_disconnect': 380,
+    'websocket_message': 260
+}
+DEFAULT_BUDGET_MS = 350
+
+# Placeholder configuration so module-level os.environ lookups succeed
+DUMMY_ENV = {
+    'AWS_DEFAULT_REGION': 'us-east-1',
+    'TABLE_NAME': 'FinancialNewsArticles'
+}
+
+
+def measure(function_dir: Path):
+    """Total import time (ms) and per-module (name, self ms, cumulative ms) rows"""
+    env = {**os.environ, **DUMMY_ENV, 'PYTHONPATH': str(function_dir)}
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import lambda_function'],
+        cwd=function_dir, env=env, capture_output=True, text=True
+    )
+    modules = []
+    total = None
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        fields = [field.strip() for field in line[len('import time:'):].split('|')]
+        if not fields[0].isdigit():
+            continue
+        name = fields[2].strip()
+        self_ms, cumulative_ms = int(fields[0]) / 1000, int(fields[1]) / 1000
+        modules.append((name, self_ms, cumulative_ms))
+        if name == 'lambda_function':
+            total = cumulative_ms
+    if result.returncode != 0 or total is None:
+        error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'no output'
+        raise RuntimeError(f"import failed: {error}")
+    return total, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--function', action='append', help='Function directory under src/ (repeatable; default all)')
+    parser.add_argument('--top', type=int, default=8, help='Number of heaviest modules to list per function')
+    args = parser.parse_args()
+
+    functions = args.function or sorted(
+        path.name for path in SRC_DIR.iterdir() if (path / 'lambda_function.py').exists()
+    )
+    over_budget = []
+
+    for function in functions:
+        budget = BUDGETS_MS.get(function, DEFAULT_BUDGET_MS)
+        try:
+            total, modules = measure(SRC_DIR / function)
+        except (OSError, RuntimeError) as e:
+            print(f"{function}: {str(e)}")
+            over_budget.append(function)
+            continue
+
+        status = 'ok' if total <= budget else 'OVER BUDGET'
+        print(f"{function}: {total:.1f} ms (budget {budget} ms) {status}")
+        for name, self_ms, cumulative_ms in sorted(modules, key=lambda row: row[1], reverse=True)[:args.top]:
+            print(f"    {self_ms:8.1f} ms self {cumulative_ms:8.1f} ms cumulative  {name}")
+        if total > budget:
+            over_budget.append(function)
+
+    if over_budget:
+        print(f"Over budget or failed: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""Summarize per-stage latency and model cost from the Lambdas' Embedded Metric Format log lines.
+
+Every handler writes one EMF record per timed stage (fetch, dedupe, write,
+poll_lag, stream_lag, model_call, parse, update, fanout, end_to_end, ...),
+and Bedrock Analysis one record per model call with its tokens and cost.
+Feed it CloudWatch log output, saved or piped:
+
+    aws logs tail /aws/lambda/FinancialNewsBedrockAnalysis --since 1h \\
+        | python scripts/latency_summary.py
+    python scripts/latency_summary.py ingestion.log analysis.log --trace 3f2a...
+"""
+import argparse
+import json
+import math
+import sys
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def read_records(lines: Iterable[str]) -> Iterable[Dict]:
+    """EMF records in log lines, skipping any prefix (timestamps, stream names) and other output"""
+    for line in lines:
+        start = line.find('{')
+        if start < 0 or '"_aws"' not in line:
+            continue
+        try:
+            record = json.loads(line[start:])
+        except json.JSONDecodeError:
+            continue
+        if isinstance(record, dict) and ('Latency' in record or 'CostUsd' in record):
+            yield record
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+
+def summarize(records: Iterable[Dict]) -> List[Dict]:
+    """count/p50/p95/p99/max per (function, stage)"""
+    samples: Dict[Tuple[str, str], List[float]] = defaultdict(list)
+    for record in records:
+        if 'Latency' not in record:
+            continue
+        latency = record['Latency']
+        values = latency if isinstance(latency, list) else [latency]
+        samples[(record.get('Function', ''), record['Stage'])].extend(float(value) for value in values)
+
+    rows = []
+    for (function, stage), values in sorted(samples.items()):
+        values.sort()
+        rows.append({
+            'function': function,
+            'stage': stage,
+            'count': len(values),
+            'p50': percentile(values, 0.50),
+            'p95': percentile(values, 0.95),
+            'p99': percentile(values, 0.99),
+            'max': values[-1]
+        })
+    return rows
+
+
+def summarize_usage(records: Iterable[Dict]) -> List[Dict]:
+    """Calls, tokens and cost per model"""
+    totals: Dict[str, Dict] = {}
+    for record in records:
+        if 'CostUsd' not in record:
+            continue
+        row = totals.setdefault(record.get('Model', ''), {
+            'model': record.get('Model', ''), 'calls': 0, 'articles': 0,
+            'input_tokens': 0, 'output_tokens': 0, 'cost_usd': 0.0
+        })
+        row['calls'] += 1
+        row['articles'] += int(record.get('articles', 1))
+        row['input_tokens'] += int(record.get('InputTokens', 0))
+        row['output_tokens'] += int(record.get('OutputTokens', 0))
+        row['cost_usd'] += float(record['CostUsd'])
+    for row in totals.values():
+        row['cost_per_article'] = row['cost_usd'] / row['articles'] if row['articles'] else 0.0
+    return sorted(totals.values(), key=lambda row: row['model'])
+
+
+def trace_stages(records: Iterable[Dict], trace_id: str) -> List[Dict]:
+    """Stages recorded for one article, in emission order"""
+    stages = []
+    for record in records:
+        trace_ids = record.get('traceIds') or []
+        if 'Latency' not in record or (record.get('traceId') != trace_id and trace_id not in trace_ids):
+            continue
+        latency = record['Latency']
+        # Batched records carry one sample per trace ID, in the same order
+        if isinstance(latency, list) and trace_id in trace_ids and len(latency) == len(trace_ids):
+            latency = latency[trace_ids.index(trace_id)]
+        stages.append({
+            'timestamp': record.get('_aws', {}).get('Timestamp'),
+            'function': record.get('Function', ''),
+            'stage': record['Stage'],
+            'latency': latency
+        })
+    return sorted(stages, key=lambda stage: stage['timestamp'] or 0)
+
+
+def print_table(rows: List[Dict], columns: List[str]) -> None:
+    """Plain aligned text table"""
+    cells = [columns] + [[format_cell(row[column]) for column in columns] for row in rows]
+    widths = [max(len(line[index]) for line in cells) for index in range(len(columns))]
+    for line in cells:
+        print('  '.join(cell.ljust(width) if index < 2 else cell.rjust(width)
+                        for index, (cell, width) in enumerate(zip(line, widths))))
+
+
+def format_cell(value) -> str:
+    if isinstance(value, float):
+        return f"{value:.1f}"
+    if isinstance(value, list):
+        return ','.join(f"{item:.1f}" for item in value)
+    return str(value)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('files', nargs='*', help='Log files to read (stdin when omitted)')
+    parser.add_argument('--trace', default=None, help='Show the stages of one article trace ID instead')
+    parser.add_argument('--function', default=None, help='Only records from function names containing this')
+    parser.add_argument('--json', action='store_true', help='Print JSON instead of a table')
+    args = parser.parse_args(argv)
+
+    records = []
+    for path in args.files or ['-']:
+        handle = sys.stdin if path == '-' else open(path, encoding='utf-8', errors='replace')
+        with handle:
+            records.extend(read_records(handle))
+    if args.function:
+        records = [record for record in records if args.function in record.get('Function', '')]
+
+    if args.trace:
+        rows, columns = trace_stages(records, args.trace), ['function', 'stage', 'latency']
+        usage = []
+    else:
+        rows, columns = summarize(records), ['function', 'stage', 'count', 'p50', 'p95', 'p99', 'max']
+        usage = summarize_usage(records)
+
+    if args.json:
+        print(json.dumps({'stages': rows, 'usage': usage} if usage else rows, indent=2))
+        return
+    if not rows:
+        print('No latency records found', file=sys.stderr)
+    else:
+        print_table(rows, columns)
+    if usage:
+        print()
+        columns = ['model', 'calls', 'articles', 'input_tokens', 'output_tokens', 'cost_usd', 'cost_per_article']
+        print_table([dict(row, cost_usd=f"{row['cost_usd']:.4f}", cost_per_article=f"{row['cost_per_article']:.6f}")
+                     for row in usage], columns)
+
+
+if __name__ == '__main__':
+    main()
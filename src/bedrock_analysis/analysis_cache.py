@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from clients import LazyTable
+
+# Content-addressed cache of Bedrock analyses. Syndicated wire stories show up
+# from several providers (and again after re-ingestion), so identical text is
+# analyzed once and later copies are served from here without a model call.
+# Lookups go to an in-process LRU first, then to a DynamoDB table with TTL.
+ANALYSIS_CACHE_TABLE_NAME = os.environ.get('ANALYSIS_CACHE_TABLE_NAME', '')
+ANALYSIS_CACHE_TTL_SECONDS = int(float(os.environ.get('ANALYSIS_CACHE_TTL_HOURS', '72')) * 3600)
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.environ.get('ANALYSIS_CACHE_MAX_ENTRIES', '1000'))
+
+# BatchGetItem accepts at most 100 keys per request
+BATCH_GET_CHUNK_SIZE = 100
+BATCH_MAX_ATTEMPTS = 5
+
+# Publisher suffixes ("... - Reuters") and NewsAPI's truncation marker
+# ("... [+1234 chars]") differ between copies of the same story
+SOURCE_SUFFIX_RE = re.compile(r'\s+[-|–—]\s+[^-|–—]{1,40}$')
+TRUNCATION_MARKER_RE = re.compile(r'\[\+\d+ chars\]\s*$')
+NON_WORD_RE = re.compile(r'[^a-z0-9]+')
+
+cache_table = LazyTable(ANALYSIS_CACHE_TABLE_NAME) if ANALYSIS_CACHE_TABLE_NAME else None
+
+# contentHash -> (expires_at, analysis), most recently used last
+_local_cache: 'OrderedDict[str, tuple]' = OrderedDict()
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, strip accents and collapse punctuation/whitespace"""
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode('ascii').lower()
+    return NON_WORD_RE.sub(' ', text).strip()
+
+
+def content_hash(article: Dict, model_id: str, prompt_version: str) -> str:
+    """Cache key for an article's analysis under a given model, prompt and candidate tickers"""
+    title = SOURCE_SUFFIX_RE.sub('', (article.get('title') or '').strip())
+    content = TRUNCATION_MARKER_RE.sub('', article.get('content') or article.get('description') or '')
+    # Candidates shape the prompt and filter the result, so a copy screened
+    # with a different ticker set must not be served this one's analysis
+    candidates = ','.join(sorted(article.get('candidateTickers') or []))
+    key = '\n'.join([model_id, prompt_version, candidates, normalize_text(title), normalize_text(content)])
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def _remember(key: str, analysis: Dict, expires_at: int) -> None:
+    """Insert into the in-process LRU, evicting the least recently used entries"""
+    _local_cache[key] = (expires_at, analysis)
+    _local_cache.move_to_end(key)
+    while len(_local_cache) > ANALYSIS_CACHE_MAX_ENTRIES:
+        _local_cache.popitem(last=False)
+
+
+def get_cached_analyses(keys: List[str]) -> Dict[str, Dict]:
+    """Look up analyses by content hash (in-process first, then DynamoDB)"""
+    now = int(time.time())
+    found = {}
+    misses = []
+
+    for key in dict.fromkeys(keys):
+        entry = _local_cache.get(key)
+        if entry and entry[0] > now:
+            _local_cache.move_to_end(key)
+            found[key] = entry[1]
+        else:
+            _local_cache.pop(key, None)
+            misses.append(key)
+
+    if not cache_table or not misses:
+        return found
+
+    try:
+        dynamodb = cache_table.meta.client
+        for start in range(0, len(misses), BATCH_GET_CHUNK_SIZE):
+            request_items = {
+                cache_table.name: {
+                    'Keys': [{'contentHash': {'S': key}} for key in misses[start:start + BATCH_GET_CHUNK_SIZE]],
+                    'ProjectionExpression': 'contentHash, analysis, #ttl',
+                    'ExpressionAttributeNames': {'#ttl': 'ttl'}
+                }
+            }
+            for attempt in range(BATCH_MAX_ATTEMPTS):
+                response = dynamodb.batch_get_item(RequestItems=request_items)
+                for item in response.get('Responses', {}).get(cache_table.name, []):
+                    expires_at = int(item.get('ttl', {}).get('N', '0'))
+                    # TTL deletion is lazy, so expired items can still be returned
+                    if expires_at <= now:
+                        continue
+                    key = item['contentHash']['S']
+                    found[key] = json.loads(item['analysis']['S'])
+                    _remember(key, found[key], expires_at)
+                request_items = response.get('UnprocessedKeys') or {}
+                if not request_items:
+                    break
+                # Back off before retrying throttled keys
+                time.sleep(min(0.05 * (2 ** attempt), 1.0))
+            else:
+                print(f"Warning: {len(request_items[cache_table.name]['Keys'])} analysis cache keys unread after retries")
+    except Exception as e:
+        # A cache failure only costs a model call
+        print(f"Warning: Could not read analysis cache: {str(e)}")
+
+    return found
+
+
+def put_cached_analyses(entries: Dict[str, Dict]) -> None:
+    """Store analyses by content hash in both cache layers"""
+    if not entries:
+        return
+
+    expires_at = int(time.time()) + ANALYSIS_CACHE_TTL_SECONDS
+    for key, analysis in entries.items():
+        _remember(key, analysis, expires_at)
+
+    if not cache_table:
+        return
+
+    try:
+        with cache_table.batch_writer(overwrite_by_pkeys=['contentHash']) as batch:
+            for key, analysis in entries.items():
+                batch.put_item(Item={
+                    'contentHash': key,
+                    'analysis': json.dumps(analysis),
+                    'ttl': expires_at
+                })
+    except Exception as e:
+        print(f"Warning: Could not write analysis cache: {str(e)}")
+
+
+def is_cacheable(analysis: Optional[Dict]) -> bool:
+    """Only complete model results are cached, never error fallbacks
+
+    A repaired analysis came from a response cut off (usually by max_tokens)
+    and lacks whatever was cut; later copies get a fresh call instead.
+    """
+    return bool(analysis) and not analysis.get('fallback') and not analysis.get('repaired')
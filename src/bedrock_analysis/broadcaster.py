@@ -0,0 +1,232 @@
+import os
+import time
+import boto3
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set
+
+from clients import LazyClient
+from wire_format import compact_message, encode
+
+# WebSocket fan-out. The connection list is cached per warm Lambda instead of
+# being scanned for every article: a full paginated scan runs every
+# CONNECTION_FULL_REFRESH_SECONDS, and in between only connections written
+# since the last refresh are read from the UpdatedAtIndex GSI. Connections
+# that have gone away are dropped when a post to them returns GoneException.
+#
+# Connections may subscribe to tickers and/or sentiments (websocket_message
+# stores them as string sets on the connection item). An inverted index from
+# ticker to connection IDs is kept alongside the cache so an update is only
+# sent to the connections that asked for one of its tickers, plus those with
+# no ticker filter.
+#
+# Each connection also carries the wire format and compression it negotiated
+# (see wire_format); a message is encoded once per distinct combination.
+CONNECTIONS_TABLE_NAME = os.environ.get('CONNECTIONS_TABLE_NAME', 'WebSocketConnections')
+CONNECTIONS_INDEX_NAME = 'UpdatedAtIndex'
+# Every connection item carries this partition value for the GSI
+CONNECTIONS_LIST_KEY = 'all'
+CONNECTION_FULL_REFRESH_SECONDS = int(os.environ.get('CONNECTION_FULL_REFRESH_SECONDS', '300'))
+CONNECTION_REFRESH_SECONDS = int(os.environ.get('CONNECTION_REFRESH_SECONDS', '5'))
+# Overlap between incremental reads so writes landing mid-refresh aren't missed
+REFRESH_OVERLAP_SECONDS = 5
+BROADCAST_MAX_CONCURRENCY = int(os.environ.get('BROADCAST_MAX_CONCURRENCY', '16'))
+
+# BatchWriteItem accepts at most 25 requests per call
+BATCH_WRITE_CHUNK_SIZE = 25
+BATCH_MAX_ATTEMPTS = 5
+
+dynamodb = LazyClient('dynamodb')
+post_executor = ThreadPoolExecutor(max_workers=BROADCAST_MAX_CONCURRENCY)
+
+# connectionId -> connection item, refreshed incrementally
+_connections: Dict[str, Dict] = {}
+# ticker -> connectionIds subscribed to it, and connections without a ticker filter
+_ticker_index: Dict[str, Set[str]] = {}
+_unfiltered: Set[str] = set()
+_last_full_refresh = 0
+_last_refresh = 0
+_apigw_client = None
+
+
+def get_apigw_client():
+    """Get the API Gateway Management API client, created once per warm Lambda"""
+    global _apigw_client
+    if _apigw_client is None:
+        ws_endpoint = os.environ.get('WS_API_ENDPOINT', '')
+        ws_api_id = os.environ.get('WS_API_ID', '')
+
+        if ws_endpoint and ws_api_id:
+            # Convert wss:// to https://
+            endpoint_url = ws_endpoint.replace('wss://', 'https://').replace('ws://', 'http://')
+            if not endpoint_url.endswith('/prod'):
+                endpoint_url = f"{endpoint_url}/{ws_api_id}/prod"
+            _apigw_client = boto3.client(
+                'apigatewaymanagementapi',
+                endpoint_url=endpoint_url,
+                config=Config(max_pool_connections=BROADCAST_MAX_CONCURRENCY)
+            )
+    return _apigw_client
+
+
+def _plain(item: Dict) -> Dict:
+    """Flatten a low-level DynamoDB item's string and string-set attributes"""
+    plain = {}
+    for key, value in item.items():
+        if 'S' in value:
+            plain[key] = value['S']
+        elif 'SS' in value:
+            plain[key] = set(value['SS'])
+    return plain
+
+
+def _drop_connection(connection_id: str) -> None:
+    """Remove a connection from the cache and the ticker index"""
+    connection = _connections.pop(connection_id, None)
+    _unfiltered.discard(connection_id)
+    for ticker in (connection or {}).get('tickers', ()):
+        subscribers = _ticker_index.get(ticker)
+        if subscribers is not None:
+            subscribers.discard(connection_id)
+            if not subscribers:
+                del _ticker_index[ticker]
+
+
+def _set_connection(item: Dict) -> None:
+    """Add or replace a connection in the cache and the ticker index"""
+    connection = _plain(item)
+    connection_id = connection['connectionId']
+    _drop_connection(connection_id)
+    _connections[connection_id] = connection
+    if connection.get('tickers'):
+        for ticker in connection['tickers']:
+            _ticker_index.setdefault(ticker, set()).add(connection_id)
+    else:
+        _unfiltered.add(connection_id)
+
+
+def refresh_connections(now: Optional[float] = None) -> Dict[str, Dict]:
+    """Bring the cached connection list up to date and return it"""
+    global _last_full_refresh, _last_refresh
+    now = now or time.time()
+
+    if now - _last_full_refresh >= CONNECTION_FULL_REFRESH_SECONDS:
+        items = []
+        paginator = dynamodb.get_paginator('scan')
+        for page in paginator.paginate(TableName=CONNECTIONS_TABLE_NAME):
+            items.extend(page.get('Items', []))
+        _connections.clear()
+        _ticker_index.clear()
+        _unfiltered.clear()
+        for item in items:
+            _set_connection(item)
+        _last_full_refresh = _last_refresh = now
+    elif now - _last_refresh >= CONNECTION_REFRESH_SECONDS:
+        paginator = dynamodb.get_paginator('query')
+        pages = paginator.paginate(
+            TableName=CONNECTIONS_TABLE_NAME,
+            IndexName=CONNECTIONS_INDEX_NAME,
+            KeyConditionExpression='listKey = :list AND updatedAt >= :since',
+            ExpressionAttributeValues={
+                ':list': {'S': CONNECTIONS_LIST_KEY},
+                ':since': {'N': str(int(_last_refresh) - REFRESH_OVERLAP_SECONDS)}
+            }
+        )
+        for page in pages:
+            for item in page.get('Items', []):
+                _set_connection(item)
+        _last_refresh = now
+
+    return _connections
+
+
+def prune_connections(connection_ids: List[str]) -> None:
+    """Delete closed connections from the cache and the table in batches"""
+    for connection_id in connection_ids:
+        _drop_connection(connection_id)
+
+    for start in range(0, len(connection_ids), BATCH_WRITE_CHUNK_SIZE):
+        request_items = {CONNECTIONS_TABLE_NAME: [
+            {'DeleteRequest': {'Key': {'connectionId': {'S': connection_id}}}}
+            for connection_id in connection_ids[start:start + BATCH_WRITE_CHUNK_SIZE]
+        ]}
+        for attempt in range(BATCH_MAX_ATTEMPTS):
+            response = dynamodb.batch_write_item(RequestItems=request_items)
+            request_items = response.get('UnprocessedItems') or {}
+            if not request_items:
+                break
+            time.sleep(0.05 * 2 ** attempt)
+
+
+def _post(apigw, connection_id: str, data: bytes) -> Optional[str]:
+    """Post to one connection; returns the ID if the connection is gone"""
+    try:
+        apigw.post_to_connection(ConnectionId=connection_id, Data=data)
+    except apigw.exceptions.GoneException:
+        return connection_id
+    except Exception as e:
+        print(f"Error sending to connection {connection_id}: {str(e)}")
+    return None
+
+
+def _wants(connection: Dict, message: Dict) -> bool:
+    """Whether a message passes a connection's sentiment filter"""
+    wanted = connection.get('sentiments')
+    if not wanted:
+        return True
+    tickers = message.get('affectedTickers') or {}
+    subscribed = connection.get('tickers')
+    sentiments = {
+        str(info.get('sentiment', '')).lower()
+        for ticker, info in tickers.items()
+        if not subscribed or ticker in subscribed
+    }
+    if not tickers and message.get('sentiment'):
+        sentiments.add(str(message['sentiment']).lower())
+    return bool(sentiments & wanted)
+
+
+def recipients(message: Dict) -> List[str]:
+    """Connection IDs whose subscription filters match an update"""
+    connections = refresh_connections()
+    # Messages that aren't about an article (or carry no signal yet) go to everyone
+    if 'affectedTickers' not in message and 'sentiment' not in message:
+        return list(connections)
+
+    candidates = set(_unfiltered)
+    for ticker in message.get('affectedTickers') or {}:
+        candidates |= _ticker_index.get(ticker, set())
+    return [
+        connection_id for connection_id in candidates
+        if connection_id in connections and _wants(connections[connection_id], message)
+    ]
+
+
+def broadcast(message: Dict) -> int:
+    """Send a message to every subscribed client; returns the number of posts"""
+    apigw = get_apigw_client()
+    if not apigw:
+        print("WebSocket API Gateway not configured")
+        return 0
+
+    connection_ids = recipients(message)
+    if not connection_ids:
+        return 0
+
+    payloads = {}
+    posts = []
+    for connection_id in connection_ids:
+        connection = _connections.get(connection_id, {})
+        key = (connection.get('wireFormat', 'json'), connection.get('compression'))
+        if key not in payloads:
+            payloads[key] = encode(compact_message(message) if key[0] == 'compact' else message, key[1])
+        posts.append((connection_id, payloads[key]))
+
+    gone = [
+        connection_id
+        for connection_id in post_executor.map(lambda post: _post(apigw, *post), posts)
+        if connection_id
+    ]
+    if gone:
+        prune_connections(gone)
+    return len(connection_ids)
@@ -1,37 +1,107 @@
 import json
-import boto3
 import os
-from typing import Dict, List
+import queue
+import random
+import time
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
+from decimal import Decimal
+
+from analysis_cache import content_hash, get_cached_analyses, is_cacheable, put_cached_analyses
+from broadcaster import broadcast
+from clients import LazyClient, LazyTable
+from latest_view import update_latest_view
+from limiter import AdaptiveConcurrencyLimiter
+from metrics import emit_count, emit_timing, emit_usage, now_ms, published_ms, timed
+from prefilter import keep_candidate_tickers, local_analysis, screen_article
+from response_parser import ResponseParseError, extract_json, validate_analysis, validate_batch
+from router import BEDROCK_FAST_MODEL_ID, MODEL_ROUTING_ENABLED, escalation_reason, route_article
+from stream_parser import IncrementalJsonParser
+from token_budget import ARTICLE_TOKEN_CAP, add_usage, estimate_tokens, model_cost, output_token_budget, split_usage, trim_text
+from wire_format import STRATEGIES_BY_SENTIMENT
 
-dynamodb = boto3.resource('dynamodb')
 # Use environment variable for region or default to us-east-1
 bedrock_region = os.environ.get('BEDROCK_REGION', 'us-east-1')
-bedrock = boto3.client('bedrock-runtime', region_name=bedrock_region)
-table = dynamodb.Table(os.environ['TABLE_NAME'])
-connections_table_name = os.environ.get('CONNECTIONS_TABLE_NAME', 'WebSocketConnections')
-connections_table = dynamodb.Table(connections_table_name)
+# Retries are handled in invoke_bedrock so throttling feeds the concurrency limiter.
+# Clients and tables are created on first use (see clients.py).
+bedrock = LazyClient(
+    'bedrock-runtime',
+    region_name=bedrock_region,
+    config=Config(retries={'mode': 'standard', 'max_attempts': 1}, max_pool_connections=32)
+)
+table = LazyTable(os.environ['TABLE_NAME'])
+# Denormalized per-ticker rows (ticker + "<timestamp>#<articleId>") for ticker queries
+ticker_signals_table_name = os.environ.get('TICKER_SIGNALS_TABLE_NAME', '')
+ticker_signals_table = LazyTable(ticker_signals_table_name) if ticker_signals_table_name else None
+SENTIMENTS = {'bullish', 'bearish', 'neutral'}
+# Article items store analysis and tradingStrategies as native maps since
+# version 2 (version 1 stored JSON strings; readers accept both)
+SCHEMA_VERSION = 2
+
+# Full model; with routing enabled most articles go to BEDROCK_FAST_MODEL_ID first (see router.py)
+BEDROCK_MODEL_ID = os.environ.get('BEDROCK_MODEL_ID', 'anthropic.claude-3-sonnet-20240229-v1:0')
+# Bump when the prompt or output schema changes so cached analyses are not reused
+PROMPT_VERSION = 'v2'
+
+# Local pre-filter: articles are screened for S&P 500 names/symbols before any
+# model call. Articles with no candidates get a lexicon-only analysis ('skip')
+# or are still sent to the model ('analyze'); the model is only asked about
+# the candidates it is given.
+PREFILTER_ENABLED = os.environ.get('PREFILTER_ENABLED', 'true').lower() == 'true'
+PREFILTER_NO_MATCH = os.environ.get('PREFILTER_NO_MATCH', 'skip').lower()
+
+# Batched analysis packs several articles into one prompt so the instruction
+# block is sent once per batch instead of once per article
+BATCH_ANALYSIS_ENABLED = os.environ.get('BATCH_ANALYSIS_ENABLED', 'true').lower() == 'true'
+BATCH_INPUT_TOKEN_BUDGET = int(os.environ.get('BATCH_INPUT_TOKEN_BUDGET', '6000'))
+BATCH_MAX_ARTICLES = int(os.environ.get('BATCH_MAX_ARTICLES', '10'))
+# max_tokens is sized to the candidate tickers of each call (see token_budget.py), up to this
+MAX_OUTPUT_TOKENS = int(os.environ.get('BEDROCK_MAX_OUTPUT_TOKENS', '4000'))
+# Article text in the shorter prompt used to retry a response that couldn't be parsed
+RETRY_ARTICLE_TOKEN_CAP = 200
+
+# Bedrock calls within a stream batch run concurrently, bounded by an AIMD
+# limiter that backs off on throttling and ramps up again on success
+ANALYSIS_MAX_CONCURRENCY = int(os.environ.get('ANALYSIS_MAX_CONCURRENCY', '8'))
+BEDROCK_MAX_ATTEMPTS = 4
+THROTTLE_ERROR_CODES = {'ThrottlingException', 'TooManyRequestsException', 'ServiceQuotaExceededException'}
+RETRYABLE_ERROR_CODES = THROTTLE_ERROR_CODES | {
+    'ServiceUnavailableException', 'InternalServerException', 'ModelNotReadyException', 'ModelStreamErrorException'
+}
+
+# Streaming analysis decodes the model output as it is generated and pushes
+# the overall sentiment and each affected ticker to clients as soon as they
+# are complete, ahead of the final news_update message
+STREAMING_ANALYSIS_ENABLED = os.environ.get('STREAMING_ANALYSIS_ENABLED', 'true').lower() == 'true'
+# How often the handler thread checks for early signals while calls are in flight
+SIGNAL_POLL_SECONDS = 0.05
+
+bedrock_limiter = AdaptiveConcurrencyLimiter(ANALYSIS_MAX_CONCURRENCY)
+
+
+class BedrockThrottledError(Exception):
+    """Bedrock kept throttling or failing transiently after all retries"""
 
-def get_apigw_client():
-    """Get API Gateway Management API client"""
-    ws_endpoint = os.environ.get('WS_API_ENDPOINT', '')
-    ws_api_id = os.environ.get('WS_API_ID', '')
-    
-    if ws_endpoint and ws_api_id:
-        # Convert wss:// to https://
-        endpoint_url = ws_endpoint.replace('wss://', 'https://').replace('ws://', 'http://')
-        if not endpoint_url.endswith('/prod'):
-            endpoint_url = f"{endpoint_url}/{ws_api_id}/prod"
-        return boto3.client('apigatewaymanagementapi', endpoint_url=endpoint_url)
-    return None
 
-BEDROCK_MODEL_ID = 'anthropic.claude-3-sonnet-20240229-v1:0'  # Claude Sonnet 3.5
+def prompt_content(article: Dict) -> str:
+    """Article text for a prompt, trimmed to the per-article token cap"""
+    text = article.get('content') or article.get('description') or ''
+    return trim_text(text, ARTICLE_TOKEN_CAP, article.get('candidateTickers'))
 
 
 def generate_prompt(article: Dict) -> str:
     """Generate prompt for Bedrock analysis"""
     title = article.get('title', '')
-    content = article.get('content', article.get('description', ''))
+    content = prompt_content(article)
+    candidates = article.get('candidateTickers')
+    candidates_text = f"\nCandidate Tickers: {', '.join(candidates)}" if candidates else ''
+    if candidates:
+        scope = "Only include tickers from the candidate list that are clearly affected by the news."
+    else:
+        scope = "Only include tickers that are actually in the S&P 500 and clearly mentioned or affected by the news."
     
     prompt = f"""Analyze the following financial news article and provide:
 
@@ -42,7 +112,7 @@ def generate_prompt(article: Dict) -> str:
    - Brief reasoning
 
 Article Title: {title}
-Article Content: {content}
+Article Content: {content}{candidates_text}
 
 Respond ONLY with valid JSON in this exact format:
 {{
@@ -56,137 +126,491 @@ Respond ONLY with valid JSON in this exact format:
   ]
 }}
 
-Only include tickers that are actually in the S&P 500 and clearly mentioned or affected by the news. Be specific and accurate."""
+{scope} Be specific and accurate."""
 
     return prompt
 
 
-def analyze_with_bedrock(article: Dict) -> Dict:
-    """Analyze article using Amazon Bedrock"""
-    try:
-        prompt = generate_prompt(article)
+def generate_batch_prompt(articles: List[Dict]) -> str:
+    """Generate a single prompt analyzing several articles, keyed by article ID"""
+    article_blocks = []
+    for article in articles:
+        candidates = article.get('candidateTickers')
+        candidates_text = f"\nCandidate Tickers: {', '.join(candidates)}" if candidates else ''
+        article_blocks.append(
+            f"""<article id="{article['articleId']}">
+Title: {article.get('title', '')}
+Content: {prompt_content(article)}{candidates_text}
+</article>"""
+        )
+    articles_text = '\n\n'.join(article_blocks)
+    
+    prompt = f"""Analyze each of the following financial news articles independently and, for each one, provide:
+
+1. Sentiment Analysis: Determine if the news is bullish, bearish, or neutral for the affected companies
+2. Affected S&P 500 Tickers: Identify which S&P 500 companies are mentioned or affected (provide ticker symbols only)
+3. For each affected ticker, provide:
+   - Sentiment (bullish/bearish/neutral)
+   - Brief reasoning
+
+{articles_text}
+
+Respond ONLY with valid JSON in this exact format, with one entry per article using its id:
+{{
+  "results": [
+    {{
+      "id": "article id",
+      "sentiment_overall": "bullish|bearish|neutral",
+      "affected_tickers": [
+        {{
+          "ticker": "AAPL",
+          "sentiment": "bullish",
+          "reasoning": "Brief explanation"
+        }}
+      ]
+    }}
+  ]
+}}
+
+Only include tickers that are actually in the S&P 500 and clearly mentioned or affected by the news. When an article lists candidate tickers, only choose from that list. Be specific and accurate."""
+
+    return prompt
+
+
+def generate_strict_prompt(article: Dict) -> str:
+    """Shorter, stricter prompt for retrying an article whose response could not be parsed"""
+    candidates = article.get('candidateTickers')
+    content = trim_text(article.get('content') or article.get('description') or '', RETRY_ARTICLE_TOKEN_CAP, candidates)
+    candidates_text = f"\nCandidate Tickers: {', '.join(candidates)}" if candidates else ''
+    scope = "Use only candidate tickers." if candidates else "Use only S&P 500 tickers the news clearly affects."
+    
+    return f"""Classify the sentiment of this financial news for each company it affects.
+
+Title: {article.get('title', '')}
+Text: {content}{candidates_text}
+
+{scope} Reply with exactly one JSON object and nothing else (no prose, no code fence), keeping each reasoning under 15 words:
+{{"sentiment_overall": "bullish|bearish|neutral", "affected_tickers": [{{"ticker": "AAPL", "sentiment": "bullish|bearish|neutral", "reasoning": "..."}}]}}"""
+
+
+def plan_batches(articles: List[Dict]) -> List[List[Dict]]:
+    """Group articles into batches that fit the input token budget"""
+    batches = []
+    current = []
+    current_tokens = 0
+    
+    for article in articles:
+        tokens = estimate_tokens(article.get('title', '') + prompt_content(article))
+        if current and (current_tokens + tokens > BATCH_INPUT_TOKEN_BUDGET or len(current) >= BATCH_MAX_ARTICLES):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(article)
+        current_tokens += tokens
+    
+    if current:
+        batches.append(current)
+    return batches
+
+
+def read_response_stream(response: Dict, on_text: Callable[[str], None]) -> Tuple[str, Dict]:
+    """Collect the text and token usage of a streamed model response, passing each delta to on_text
+
+    on_text is best-effort: if it raises (e.g. the incremental parser meets
+    braces in prose before the JSON), early signals stop for this response
+    and the full text is still collected for extract_json.
+    """
+    parts = []
+    usage = {}
+    for event in response['body']:
+        chunk = event.get('chunk')
+        if not chunk:
+            continue
+        data = json.loads(chunk['bytes'])
+        if data.get('type') == 'content_block_delta' and data.get('delta', {}).get('type') == 'text_delta':
+            parts.append(data['delta']['text'])
+            if on_text:
+                try:
+                    on_text(data['delta']['text'])
+                except Exception as e:
+                    print(f"Error handling streamed text, early signals stopped for this response: {str(e)}")
+                    on_text = None
+        elif data.get('type') == 'message_start':
+            usage.update(data.get('message', {}).get('usage', {}))
+        elif data.get('type') == 'message_delta':
+            usage.update(data.get('usage', {}))
+            usage['stop_reason'] = data.get('delta', {}).get('stop_reason')
+    return ''.join(parts), usage
+
+
+def call_usage(model_id: str, prompt: str, text: str, usage: Dict) -> Dict:
+    """Token usage and cost of a call, estimated from the text if the response lacks it"""
+    estimated = 'input_tokens' not in usage or 'output_tokens' not in usage
+    input_tokens = int(usage.get('input_tokens') or estimate_tokens(prompt))
+    output_tokens = int(usage.get('output_tokens') or estimate_tokens(text))
+    return {
+        'model': model_id,
+        'inputTokens': input_tokens,
+        'outputTokens': output_tokens,
+        'costUsd': model_cost(model_id, input_tokens, output_tokens),
+        'stopReason': usage.get('stop_reason'),
+        'estimated': estimated
+    }
+
+
+def record_usage(usage: Dict, articles: List[Dict], max_tokens: int) -> Dict[str, Dict]:
+    """Emit a call's usage and split it across its articles"""
+    emit_usage(
+        usage['model'], usage['inputTokens'], usage['outputTokens'], usage['costUsd'],
+        articles=len(articles), maxTokens=max_tokens, stopReason=usage['stopReason'],
+        traceIds=[article.get('traceId') for article in articles]
+    )
+    if usage['stopReason'] == 'max_tokens':
+        print(f"Bedrock response hit max_tokens ({max_tokens}) for {len(articles)} articles")
+    return split_usage(usage, articles, [estimate_tokens(prompt_content(article)) for article in articles])
+
+
+def without_usage(analysis: Dict) -> Dict:
+    """An analysis without the model usage, for copies that did not cost a call"""
+    return {name: value for name, value in analysis.items() if name not in ('usage', 'fastUsage')}
+
+
+def invoke_bedrock(prompt: str, max_tokens: int, stream_listener: Optional[Callable[[], Callable[[str], None]]] = None,
+                   model_id: str = BEDROCK_MODEL_ID) -> Tuple[str, Dict]:
+    """Invoke the Bedrock model and return the response text and its token usage (see call_usage)
+
+    With a stream_listener the response is streamed; the listener is called at
+    the start of each attempt and returns the callback for that attempt's text.
+    """
+    body = json.dumps({
+        "anthropic_version": "bedrock-2023-05-31",
+        "max_tokens": max_tokens,
+        "messages": [
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+    })
+    
+    for attempt in range(BEDROCK_MAX_ATTEMPTS):
+        throttled = False
+        bedrock_limiter.acquire()
+        try:
+            if stream_listener and STREAMING_ANALYSIS_ENABLED:
+                response = bedrock.invoke_model_with_response_stream(
+                    modelId=model_id,
+                    body=body
+                )
+                text, usage = read_response_stream(response, stream_listener())
+                return text, call_usage(model_id, prompt, text, usage)
+            
+            response = bedrock.invoke_model(
+                modelId=model_id,
+                body=body
+            )
+            
+            response_body = json.loads(response['body'].read())
+            text = response_body['content'][0]['text']
+            usage = dict(response_body.get('usage', {}), stop_reason=response_body.get('stop_reason'))
+            return text, call_usage(model_id, prompt, text, usage)
+        except ClientError as e:
+            code = e.response.get('Error', {}).get('Code', '')
+            # Errors raised mid-stream use camelCase codes (throttlingException)
+            code = code[:1].upper() + code[1:]
+            if code not in RETRYABLE_ERROR_CODES:
+                raise
+            throttled = code in THROTTLE_ERROR_CODES
+            print(f"Bedrock {code} (attempt {attempt + 1}/{BEDROCK_MAX_ATTEMPTS}), concurrency limit {bedrock_limiter.limit:.1f}")
+        finally:
+            bedrock_limiter.release(throttled)
         
-        body = json.dumps({
-            "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 2000,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ]
+        # Exponential backoff with full jitter
+        time.sleep(random.uniform(0, min(0.5 * 2 ** attempt, 8)))
+    
+    raise BedrockThrottledError(f"Bedrock unavailable after {BEDROCK_MAX_ATTEMPTS} attempts")
+
+
+def make_signal_listener(articles: List[Dict], on_signal: Callable[[Dict], None]) -> Callable[[], Callable[[str], None]]:
+    """Build a stream listener that emits early sentiment and ticker signals"""
+    by_id = {article['articleId']: article for article in articles}
+    # Shared across attempts so a retried call doesn't repeat signals
+    emitted = set()
+    
+    def emit(article_id: Optional[str], field: str, value) -> None:
+        article = by_id.get(article_id)
+        if not article:
+            return
+        if field == 'sentiment':
+            key = (article_id, 'sentiment')
+            signal = {'sentiment': str(value)}
+        else:
+            ticker = value.get('ticker') if isinstance(value, dict) else None
+            candidates = article.get('candidateTickers')
+            if not ticker or (candidates and str(ticker).upper() not in candidates):
+                return
+            key = (article_id, ticker)
+            sentiment = value.get('sentiment', 'neutral')
+            signal = {'affectedTickers': {ticker: {
+                'sentiment': sentiment,
+                'reasoning': value.get('reasoning', ''),
+                'strategies': generate_trading_strategies(ticker, sentiment)
+            }}}
+        if key in emitted:
+            return
+        emitted.add(key)
+        on_signal({
+            'type': 'analysis_partial',
+            'articleId': article_id,
+            'title': article.get('title', ''),
+            'description': article.get('description', ''),
+            'url': article.get('url', ''),
+            'publishedAt': article.get('publishedAt', ''),
+            **signal,
+            'timestamp': datetime.utcnow().isoformat()
         })
+    
+    def new_attempt() -> Callable[[str], None]:
+        parser = IncrementalJsonParser()
+        # Batched responses key each result by id, which the prompt asks for first
+        result_ids = {}
+        single_id = articles[0]['articleId'] if len(articles) == 1 else None
         
-        response = bedrock.invoke_model(
-            modelId=BEDROCK_MODEL_ID,
-            body=body
-        )
+        def on_text(text: str) -> None:
+            for path, value in parser.feed(text):
+                article_id = single_id
+                if len(path) >= 2 and path[0] == 'results':
+                    if path[2:] == ('id',):
+                        result_ids[path[1]] = value
+                    article_id = result_ids.get(path[1])
+                    path = path[2:]
+                if path == ('sentiment_overall',):
+                    emit(article_id, 'sentiment', value)
+                elif len(path) == 2 and path[0] == 'affected_tickers':
+                    emit(article_id, 'ticker', value)
+        
+        return on_text
+    
+    return new_attempt
+
+
+def analyze_batch_with_bedrock(articles: List[Dict], on_signal: Optional[Callable[[Dict], None]] = None,
+                               model_id: str = BEDROCK_MODEL_ID) -> Dict[str, Dict]:
+    """Analyze several articles in one Bedrock call, falling back to single calls"""
+    if len(articles) == 1:
+        return {articles[0]['articleId']: analyze_with_bedrock(articles[0], on_signal, model_id)}
+    
+    analyses = {}
+    answered = False
+    try:
+        max_tokens = output_token_budget(articles, MAX_OUTPUT_TOKENS)
+        listener = make_signal_listener(articles, on_signal) if on_signal else None
+        trace_ids = [article.get('traceId') for article in articles]
+        with timed('model_call', articles=len(articles), model=model_id, traceIds=trace_ids):
+            content, usage = invoke_bedrock(generate_batch_prompt(articles), max_tokens, listener, model_id)
+        answered = True
+        shares = record_usage(usage, articles, max_tokens)
+        
+        with timed('parse', articles=len(articles), traceIds=trace_ids) as stage:
+            try:
+                value, stage['repaired'] = extract_json(content)
+                parsed = validate_batch(value)
+            except ResponseParseError as e:
+                print(f"Error parsing batched Bedrock response: {e}")
+                parsed = {}
+                stage['error'] = True
         
-        response_body = json.loads(response['body'].read())
-        content = response_body['content'][0]['text']
+        for article in articles:
+            analysis = parsed.get(article['articleId'])
+            if analysis:
+                analysis['usage'] = shares[article['articleId']]
+                if stage.get('repaired'):
+                    analysis['repaired'] = True
+                analyses[article['articleId']] = keep_candidate_tickers(analysis, article.get('candidateTickers'))
+        
+        failed = [article.get('traceId') for article in articles if article['articleId'] not in analyses]
+        if failed:
+            emit_count('ParseFailures', len(failed), model=model_id, prompt='batch', traceIds=failed)
+    except BedrockThrottledError:
+        # Retrying each article alone would only add load; let the stream retry them
+        raise
+    except Exception as e:
+        print(f"Error calling Bedrock for batch: {str(e)}")
+    
+    # Anything the batch response didn't cover is retried on its own, with the
+    # strict prompt if the batch was answered but its entry was missing or malformed
+    for article in articles:
+        if article['articleId'] not in analyses:
+            print(f"Falling back to single analysis for article: {article['articleId']}")
+            analyses[article['articleId']] = analyze_with_bedrock(article, on_signal, model_id, strict=answered)
+    
+    return analyses
+
+
+def analyze_with_bedrock(article: Dict, on_signal: Optional[Callable[[Dict], None]] = None,
+                         model_id: str = BEDROCK_MODEL_ID, strict: bool = False) -> Dict:
+    """Analyze article using Amazon Bedrock, streaming early signals to on_signal if given
+
+    A response that can't be parsed is retried once with the strict prompt.
+    Strict calls don't stream: an earlier attempt may already have sent signals.
+    """
+    try:
+        prompt = generate_strict_prompt(article) if strict else generate_prompt(article)
+        listener = make_signal_listener([article], on_signal) if on_signal and not strict else None
+        max_tokens = output_token_budget([article], MAX_OUTPUT_TOKENS)
+        with timed('model_call', articles=1, model=model_id, traceIds=[article.get('traceId')]):
+            content, usage = invoke_bedrock(prompt, max_tokens, listener, model_id)
+        article_usage = record_usage(usage, [article], max_tokens)[article['articleId']]
         
         # Parse JSON from response
         try:
-            # Extract JSON from markdown code blocks if present
-            if '```json' in content:
-                content = content.split('```json')[1].split('```')[0].strip()
-            elif '```' in content:
-                content = content.split('```')[1].split('```')[0].strip()
-            
-            analysis = json.loads(content)
-            return analysis
-        except json.JSONDecodeError as e:
-            print(f"Error parsing Bedrock response: {e}")
-            print(f"Response content: {content}")
+            with timed('parse', articles=1, traceIds=[article.get('traceId')]) as stage:
+                value, stage['repaired'] = extract_json(content)
+                analysis = validate_analysis(value)
+        except ResponseParseError as e:
+            emit_count('ParseFailures', model=model_id, prompt='strict' if strict else 'single',
+                       traceIds=[article.get('traceId')])
+            print(f"Error parsing Bedrock response for article {article['articleId']}: {e}")
+            if not strict:
+                retried = analyze_with_bedrock(article, on_signal, model_id, strict=True)
+                retried['usage'] = add_usage(article_usage, retried.get('usage'))
+                return retried
+            # Article text can end up in the response; log only the start
+            print(f"Response content ({len(content)} chars): {content[:200]}")
             return {
                 "sentiment_overall": "neutral",
-                "affected_tickers": []
+                "affected_tickers": [],
+                "fallback": True,
+                "usage": article_usage
             }
+        
+        analysis['usage'] = article_usage
+        if stage['repaired']:
+            analysis['repaired'] = True
+        return keep_candidate_tickers(analysis, article.get('candidateTickers'))
             
+    except BedrockThrottledError:
+        # Transient capacity problem: report the article as failed so it is retried
+        raise
     except Exception as e:
         print(f"Error calling Bedrock: {str(e)}")
         return {
             "sentiment_overall": "neutral",
-            "affected_tickers": []
+            "affected_tickers": [],
+            "fallback": True
         }
 
 
+def analyze_routed_batch(articles: List[Dict], tier: str, on_signal: Optional[Callable[[Dict], None]] = None) -> Dict[str, Dict]:
+    """Analyze a batch on its tier, redoing fast-tier results that need the full model"""
+    if tier == 'full':
+        analyses = analyze_batch_with_bedrock(articles, on_signal)
+        for article in articles:
+            analyses[article['articleId']]['tier'] = 'full'
+            if article.get('routingReason'):
+                analyses[article['articleId']]['tierReason'] = article['routingReason']
+        return analyses
+    
+    # Fast answers may still be replaced, so only the full model's are streamed
+    analyses = analyze_batch_with_bedrock(articles, model_id=BEDROCK_FAST_MODEL_ID)
+    reasons = {}
+    for article in articles:
+        reason = escalation_reason(article, analyses[article['articleId']])
+        if reason:
+            reasons[article['articleId']] = reason
+        else:
+            analyses[article['articleId']]['tier'] = 'fast'
+    if not reasons:
+        return analyses
+    
+    print(f"Escalating {len(reasons)} of {len(articles)} fast-tier articles to the full model")
+    escalated = [article for article in articles if article['articleId'] in reasons]
+    for article_id, analysis in analyze_batch_with_bedrock(escalated, on_signal).items():
+        analysis.update(tier='full', tierReason=f"escalated:{reasons[article_id]}")
+        if analyses[article_id].get('usage'):
+            analysis['fastUsage'] = analyses[article_id]['usage']
+        analyses[article_id] = analysis
+    return analyses
+
+
 def generate_trading_strategies(ticker: str, sentiment: str) -> List[str]:
     """Generate options trading strategies based on sentiment"""
-    sentiment_lower = sentiment.lower()
-    strategies = []
-    
-    if sentiment_lower == 'bullish':
-        strategies = [
-            'long call',
-            'short put',
-            'short put credit spread',
-            'long call debit spread',
-            'bull call spread',
-            'covered call (if holding stock)'
-        ]
-    elif sentiment_lower == 'bearish':
-        strategies = [
-            'long put',
-            'short call',
-            'short call credit spread',
-            'long put debit spread',
-            'bear put spread',
-            'protective put (if holding stock)'
-        ]
-    else:  # neutral
-        strategies = [
-            'iron condor',
-            'butterfly spread',
-            'calendar spread',
-            'straddle/strangle (if expecting volatility)'
-        ]
-    
-    return strategies
+    # The lists live in wire_format so compact pushes can refer to them by ID
+    return list(STRATEGIES_BY_SENTIMENT.get(sentiment.lower(), STRATEGIES_BY_SENTIMENT['neutral']))
 
 
 def broadcast_to_websocket(message: Dict):
     """Broadcast message to all connected WebSocket clients"""
     try:
-        apigw = get_apigw_client()
-        if not apigw:
-            print("WebSocket API Gateway not configured")
-            return
-        
-        # Get all connections
-        response = connections_table.scan()
-        connections = response.get('Items', [])
-        
-        message_json = json.dumps(message)
-        
-        for connection in connections:
-            connection_id = connection.get('connectionId')
-            if not connection_id:
-                continue
-            try:
-                apigw.post_to_connection(
-                    ConnectionId=connection_id,
-                    Data=message_json.encode('utf-8')
-                )
-            except apigw.exceptions.GoneException:
-                # Connection closed, remove it
-                connections_table.delete_item(Key={'connectionId': connection_id})
-            except Exception as e:
-                print(f"Error sending to connection {connection_id}: {str(e)}")
-                
+        broadcast(message)
     except Exception as e:
         print(f"Error broadcasting to WebSocket: {str(e)}")
 
 
-def process_article(article: Dict):
-    """Process a single article"""
+def latest_entry(article: Dict, message: Dict) -> Dict:
+    """Latest-view entry of a processed article, in the GET /news listing format"""
+    return {
+        'articleId': message['articleId'],
+        'title': message['title'],
+        'description': message['description'],
+        'url': message['url'],
+        'source': article.get('source', ''),
+        'publishedAt': message['publishedAt'],
+        'sentiment': message['sentiment'],
+        'affectedTickers': message['affectedTickers'],
+        'timestamp': int(article.get('timestamp') or time.time())
+    }
+
+
+def to_dynamodb_value(value):
+    """Convert a JSON-compatible value for a DynamoDB map (floats become Decimals)"""
+    return json.loads(json.dumps(value), parse_float=Decimal)
+
+
+def day_bucket(prefix: str, timestamp: int) -> str:
+    """Day-bucketed index partition key: a status or sentiment plus the UTC day of the timestamp"""
+    return f"{prefix}#{datetime.utcfromtimestamp(timestamp).strftime('%Y-%m-%d')}"
+
+
+def write_ticker_signals(article: Dict, timestamp: int, trading_strategies: Dict) -> None:
+    """Write one ticker-signal row per affected ticker of an analyzed article"""
+    if not ticker_signals_table or not trading_strategies:
+        return
+    
+    article_id = article['articleId']
+    with ticker_signals_table.batch_writer(overwrite_by_pkeys=['ticker', 'signalKey']) as batch:
+        for ticker, info in trading_strategies.items():
+            sentiment = str(info.get('sentiment', 'neutral')).lower()
+            if sentiment not in SENTIMENTS:
+                sentiment = 'neutral'
+            batch.put_item(Item={
+                'ticker': ticker,
+                'signalKey': f"{timestamp:010d}#{article_id}",
+                'articleId': article_id,
+                'timestamp': timestamp,
+                'sentiment': sentiment,
+                'tickerSentiment': f"{ticker}#{sentiment}",
+                'reasoning': info.get('reasoning', ''),
+                # Denormalized so /tickers/{ticker}/signals needs no article reads
+                'title': article.get('title', ''),
+                'url': article.get('url', ''),
+                'publishedAt': article.get('publishedAt', '')
+            })
+
+
+def process_article(article: Dict, analysis: Optional[Dict] = None):
+    """Store a single article's analysis, using a precomputed analysis if given
+
+    Returns the news_update message; the caller sends it with publish_update
+    once the latest view has given the article its sequence number.
+    """
     article_id = article.get('articleId')
     if not article_id:
         raise ValueError("Article missing articleId")
     
     # Analyze with Bedrock
-    print(f"Analyzing article: {article_id}")
-    analysis = analyze_with_bedrock(article)
+    if analysis is None:
+        print(f"Analyzing article: {article_id}")
+        analysis = analyze_with_bedrock(article)
     
     # Generate trading strategies for each ticker
     trading_strategies = {}
@@ -205,20 +629,30 @@ def process_article(article: Dict):
             'strategies': strategies
         }
     
-    # Update article in DynamoDB
+    # Update article in DynamoDB; statusDay/sentimentDay place it in the
+    # StatusDayIndex and SentimentDayIndex buckets of its ingestion day
+    timestamp = int(article.get('timestamp') or time.time())
+    sentiment = analysis.get('sentiment_overall', 'neutral')
+    trace_id = article.get('traceId') or ''
+    update_started = time.monotonic()
     table.update_item(
         Key={'articleId': article_id},
-        UpdateExpression='SET #status = :status, sentiment = :sentiment, analysis = :analysis, tradingStrategies = :strategies',
+        UpdateExpression='SET #status = :status, statusDay = :statusDay, sentiment = :sentiment, sentimentDay = :sentimentDay, analysis = :analysis, tradingStrategies = :strategies, schemaVersion = :schemaVersion',
         ExpressionAttributeNames={
             '#status': 'status'
         },
         ExpressionAttributeValues={
             ':status': 'analyzed',
-            ':sentiment': analysis.get('sentiment_overall', 'neutral'),
-            ':analysis': json.dumps(analysis),
-            ':strategies': json.dumps(trading_strategies)
+            ':statusDay': day_bucket('analyzed', timestamp),
+            ':sentiment': sentiment,
+            ':sentimentDay': day_bucket(str(sentiment).lower(), timestamp),
+            ':analysis': to_dynamodb_value(analysis),
+            ':strategies': to_dynamodb_value(trading_strategies),
+            ':schemaVersion': SCHEMA_VERSION
         }
     )
+    write_ticker_signals(article, timestamp, trading_strategies)
+    emit_timing('update', (time.monotonic() - update_started) * 1000, traceId=trace_id)
     
     # Prepare message for frontend
     message = {
@@ -230,13 +664,27 @@ def process_article(article: Dict):
         'publishedAt': article.get('publishedAt', ''),
         'sentiment': analysis.get('sentiment_overall', 'neutral'),
         'affectedTickers': trading_strategies,
+        'traceId': trace_id,
         'timestamp': datetime.utcnow().isoformat()
     }
     
-    # Broadcast to WebSocket clients
+    return message
+
+
+def publish_update(article: Dict, message: Dict) -> None:
+    """Broadcast an article's news_update and record its end-to-end latency"""
+    trace_id = message['traceId']
+    fanout_started = time.monotonic()
     broadcast_to_websocket(message)
+    emit_timing('fanout', (time.monotonic() - fanout_started) * 1000, traceId=trace_id)
     
-    return message
+    # Article stored (and first published) to its update reaching clients
+    pushed = now_ms()
+    if article.get('ingestedAtMs'):
+        emit_timing('end_to_end', pushed - int(article['ingestedAtMs']), traceId=trace_id)
+    published = published_ms(article.get('publishedAt'))
+    if published is not None:
+        emit_timing('publish_to_push', pushed - published, traceId=trace_id)
 
 
 def convert_dynamodb_item(item_dict):
@@ -285,12 +733,105 @@ def convert_dynamodb_item(item_dict):
     return result
 
 
+def analyze_articles(articles: List[Dict], on_signal: Optional[Callable[[Dict], None]] = None) -> Iterator[Tuple[List[Dict], Dict[str, Dict], Optional[Exception]]]:
+    """Yield (articles, analyses by articleId, error) groups as analyses become available
+
+    Early signals decoded from streamed responses are passed to on_signal on
+    the calling thread while model calls are still running.
+    """
+    if PREFILTER_ENABLED:
+        for article in articles:
+            screen_article(article)
+        
+        # Articles naming no S&P 500 company are analyzed locally, without a model call
+        if PREFILTER_NO_MATCH == 'skip':
+            unmatched = [article for article in articles if not article['candidateTickers']]
+            if unmatched:
+                print(f"Pre-filter: {len(unmatched)} articles without candidate tickers analyzed locally")
+                yield unmatched, {article['articleId']: local_analysis(article) for article in unmatched}, None
+            articles = [article for article in articles if article['candidateTickers']]
+    
+    # Routed analyses are keyed by both models, so toggling routing doesn't reuse the other's results
+    cache_model = f"{BEDROCK_FAST_MODEL_ID}>{BEDROCK_MODEL_ID}" if MODEL_ROUTING_ENABLED else BEDROCK_MODEL_ID
+    keys = {article['articleId']: content_hash(article, cache_model, PROMPT_VERSION) for article in articles}
+    
+    # Cache hits are served straight away without a model call
+    cached = get_cached_analyses(list(keys.values()))
+    hits = [article for article in articles if keys[article['articleId']] in cached]
+    if hits:
+        print(f"Analysis cache hits: {len(hits)}")
+        yield hits, {article['articleId']: cached[keys[article['articleId']]] for article in hits}, None
+    
+    # Identical copies within this event are analyzed once
+    copies = {}
+    for article in articles:
+        if keys[article['articleId']] not in cached:
+            copies.setdefault(keys[article['articleId']], []).append(article)
+    misses = [group[0] for group in copies.values()]
+    
+    # Each tier's articles go in token-budgeted batches (one Bedrock call per
+    # batch), all run concurrently
+    tiers = {'fast': [], 'full': []}
+    for article in misses:
+        tier, article['routingReason'] = route_article(article) if MODEL_ROUTING_ENABLED else ('full', None)
+        tiers[tier].append(article)
+    batches = []
+    for tier, tier_articles in tiers.items():
+        if BATCH_ANALYSIS_ENABLED:
+            batches.extend((batch, tier) for batch in plan_batches(tier_articles))
+        else:
+            batches.extend(([article], tier) for article in tier_articles)
+    if not batches:
+        return
+    if MODEL_ROUTING_ENABLED:
+        print(f"Model routing: {len(tiers['fast'])} articles to the fast tier, {len(tiers['full'])} to the full model")
+    
+    # Workers queue early signals; they are delivered from this thread
+    signals = queue.Queue()
+    worker_signal = signals.put if on_signal and STREAMING_ANALYSIS_ENABLED else None
+    
+    with ThreadPoolExecutor(max_workers=min(ANALYSIS_MAX_CONCURRENCY, len(batches))) as executor:
+        futures = {executor.submit(analyze_routed_batch, batch, tier, worker_signal): batch for batch, tier in batches}
+        pending = set(futures)
+        
+        while pending:
+            done, pending = wait(pending, timeout=SIGNAL_POLL_SECONDS, return_when=FIRST_COMPLETED)
+            while not signals.empty():
+                on_signal(signals.get_nowait())
+            for future in done:
+                batch = futures[future]
+                group = [copy for article in batch for copy in copies[keys[article['articleId']]]]
+                try:
+                    results = future.result()
+                except Exception as e:
+                    yield group, {}, e
+                    continue
+                
+                # Usage belongs to the call that produced an analysis, not to cache hits or copies
+                put_cached_analyses({
+                    keys[article_id]: without_usage(analysis) for article_id, analysis in results.items() if is_cacheable(analysis)
+                })
+                
+                analyses = {}
+                for article in batch:
+                    for copy in copies[keys[article['articleId']]]:
+                        result = results[article['articleId']]
+                        analyses[copy['articleId']] = result if copy is article else without_usage(result)
+                yield group, analyses, None
+
+
 def handler(event, context):
     """Handler for DynamoDB stream events"""
+    started_ms = now_ms()
     processed_count = 0
     error_count = 0
     
+    # Stream sequence numbers of articles to retry (ReportBatchItemFailures)
+    failed_sequence_numbers = []
+    
     try:
+        pending_articles = []
+        sequence_numbers = {}
         for record in event.get('Records', []):
             if record.get('eventName') == 'INSERT':
                 new_image = record.get('dynamodb', {}).get('NewImage', {})
@@ -308,21 +849,61 @@ def handler(event, context):
                 
                 # Only process if status is pending_analysis
                 if article.get('status') == 'pending_analysis':
-                    try:
-                        process_article(article)
-                        processed_count += 1
-                    except Exception as e:
+                    if not article.get('articleId'):
                         error_count += 1
-                        print(f"Error processing article {article.get('articleId', 'unknown')}: {str(e)}")
+                        print("Error processing article unknown: Article missing articleId")
+                        continue
+                    pending_articles.append(article)
+                    sequence_numbers[article['articleId']] = record.get('dynamodb', {}).get('SequenceNumber')
+        
+        # Time each article waited between being stored and reaching this batch
+        lags = [started_ms - int(article['ingestedAtMs']) for article in pending_articles if article.get('ingestedAtMs')]
+        if lags:
+            emit_timing('stream_lag', lags, traceIds=[article.get('traceId') for article in pending_articles if article.get('ingestedAtMs')])
+        
+        # Results are written and broadcast from this thread as each group of
+        # analyses becomes available, so early finishers reach clients first
+        # and boto3 resources are never shared across threads. Streamed
+        # sentiment/ticker signals are broadcast the same way, ahead of the
+        # final news_update for their article.
+        for group, analyses, error in analyze_articles(pending_articles, on_signal=broadcast_to_websocket):
+            if error:
+                print(f"Error analyzing batch of {len(group)} articles: {str(error)}")
+                error_count += len(group)
+                failed_sequence_numbers.extend(sequence_numbers[article['articleId']] for article in group)
+                continue
+            
+            updates = []
+            for article in group:
+                try:
+                    message = process_article(article, analyses[article['articleId']])
+                    updates.append((article, message))
+                    processed_count += 1
+                except Exception as e:
+                    error_count += 1
+                    failed_sequence_numbers.append(sequence_numbers[article['articleId']])
+                    print(f"Error processing article {article.get('articleId', 'unknown')}: {str(e)}")
+            
+            # One read-modify-write of the latest view per group, which also
+            # numbers the updates; they are broadcast with their seq after it
+            try:
+                sequences = update_latest_view([latest_entry(article, message) for article, message in updates])
+            except Exception as e:
+                print(f"Error updating latest view: {str(e)}")
+                sequences = {}
+            for article, message in updates:
+                if article['articleId'] in sequences:
+                    message['seq'] = sequences[article['articleId']]
+                publish_update(article, message)
+        
+        emit_timing('analyze', now_ms() - started_ms, processed=processed_count, errors=error_count)
     
     except Exception as e:
+        # With ReportBatchItemFailures a response without failures counts as
+        # success, so an unexpected error must fail the invocation for the
+        # stream to retry the batch
         print(f"Error in handler: {str(e)}")
-        return {
-            'statusCode': 500,
-            'body': json.dumps({
-                'message': f'Handler error: {str(e)}'
-            })
-        }
+        raise
     
     return {
         'statusCode': 200,
@@ -330,6 +911,11 @@ def handler(event, context):
             'message': f'Processed {processed_count} articles',
             'processed': processed_count,
             'errors': error_count
-        })
+        }),
+        # Only the failed records are replayed, not the whole stream batch
+        'batchItemFailures': [
+            {'itemIdentifier': sequence_number}
+            for sequence_number in failed_sequence_numbers if sequence_number
+        ]
     }
 
@@ -0,0 +1,87 @@
+import gzip
+import hashlib
+import json
+import os
+import time
+from botocore.exceptions import ClientError
+from typing import Dict, List
+
+from clients import LazyTable
+
+# Materialized view of the latest analyzed articles: a single item holding
+# the newest LATEST_VIEW_SIZE listing entries (newest first by ingestion
+# timestamp) as gzipped JSON, plus an ETag of its content. It is merged
+# here as analyses finish, so GET /news and the WebSocket get_latest action
+# serve a page load with one small GetItem instead of index queries.
+#
+# Entries get their sequence number (seq) in the same conditional write that
+# merges them, and the view item keeps the last one assigned. Numbers
+# therefore follow the order in which changes reach the view, whichever
+# shard wrote them, so a reconnecting client asking for the entries after
+# the last seq it saw can't miss one that landed late.
+LATEST_NEWS_TABLE_NAME = os.environ.get('LATEST_NEWS_TABLE_NAME', '')
+LATEST_VIEW_ID = 'latest'
+LATEST_VIEW_SIZE = 50
+# Concurrent writers (one per stream shard) retry on a version conflict
+VIEW_MAX_ATTEMPTS = 5
+
+latest_table = LazyTable(LATEST_NEWS_TABLE_NAME) if LATEST_NEWS_TABLE_NAME else None
+
+
+def encode_view(articles: List[Dict]) -> bytes:
+    """Compact JSON for the view's entries"""
+    return json.dumps(articles, separators=(',', ':')).encode('utf-8')
+
+
+def view_etag(raw: bytes) -> str:
+    """Strong ETag of the view content"""
+    return f'"{hashlib.sha256(raw).hexdigest()[:32]}"'
+
+
+def merge_entries(current: List[Dict], entries: List[Dict]) -> List[Dict]:
+    """Newest LATEST_VIEW_SIZE entries of the view with new or re-analyzed articles merged in"""
+    by_id = {entry['articleId']: entry for entry in current}
+    by_id.update({entry['articleId']: entry for entry in entries})
+    ordered = sorted(by_id.values(), key=lambda entry: (entry['timestamp'], entry['articleId']), reverse=True)
+    return ordered[:LATEST_VIEW_SIZE]
+
+
+def update_latest_view(entries: List[Dict]) -> Dict[str, int]:
+    """Merge listing entries of newly analyzed articles into the latest view; returns the seq given to each article"""
+    if not latest_table or not entries:
+        return {}
+
+    for _ in range(VIEW_MAX_ATTEMPTS):
+        item = latest_table.get_item(Key={'viewId': LATEST_VIEW_ID}, ConsistentRead=True).get('Item')
+        current = json.loads(gzip.decompress(item['body'].value)) if item else []
+        # Views written before the view kept its own sequence carry it in their entries
+        sequence = max([int(item.get('sequence', 0)) if item else 0] + [int(entry.get('seq') or 0) for entry in current])
+        numbered = [dict(entry, seq=sequence + index) for index, entry in enumerate(entries, 1)]
+        view = merge_entries(current, numbered)
+        raw = encode_view(view)
+
+        new_item = {
+            'viewId': LATEST_VIEW_ID,
+            'version': int(item['version']) + 1 if item else 1,
+            'etag': view_etag(raw),
+            'count': len(view),
+            'body': gzip.compress(raw, mtime=0),
+            'sequence': sequence + len(numbered),
+            'updatedAt': int(time.time())
+        }
+        # Optimistic concurrency: only replace the version that was read
+        if item:
+            condition = {'ConditionExpression': 'version = :version',
+                         'ExpressionAttributeValues': {':version': item['version']}}
+        else:
+            condition = {'ConditionExpression': 'attribute_not_exists(viewId)'}
+
+        try:
+            latest_table.put_item(Item=new_item, **condition)
+            return {entry['articleId']: entry['seq'] for entry in numbered}
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+                raise
+
+    print(f"Error updating latest view: version conflict after {VIEW_MAX_ATTEMPTS} attempts")
+    return {}
@@ -0,0 +1,35 @@
+import threading
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD limiter for in-flight model calls.
+
+    The allowed concurrency grows by roughly one slot per window of successful
+    calls (additive increase) and is halved whenever a call is throttled
+    (multiplicative decrease), so the Lambda settles just under the account's
+    Bedrock quota instead of hammering it. The instance lives at module scope
+    so the learned limit carries over between warm invocations.
+    """
+
+    def __init__(self, max_limit: int, initial_limit: int = 2):
+        self.max_limit = max(1, max_limit)
+        self.limit = float(min(max(1, initial_limit), self.max_limit))
+        self.in_flight = 0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> None:
+        """Block until a call slot is available"""
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self, throttled: bool = False) -> None:
+        """Free a call slot and adjust the limit from the call's outcome"""
+        with self._condition:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(1.0, self.limit / 2)
+            else:
+                self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+            self._condition.notify_all()
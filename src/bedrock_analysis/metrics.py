@@ -0,0 +1,150 @@
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Callable, List, Optional, Union
+
+# Per-stage timings as CloudWatch Embedded Metric Format (EMF) records: one
+# JSON log line each, which CloudWatch turns into a Latency metric with
+# Function and Stage dimensions while the line itself (with properties such
+# as the article traceId) stays searchable in Logs Insights. The records go
+# through _sink, stdout by default, so they can be captured locally.
+# scripts/latency_summary.py computes per-stage percentiles from the logs.
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+METRICS_NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'FinancialNews')
+FUNCTION_NAME = os.environ.get('AWS_LAMBDA_FUNCTION_NAME', 'local')
+# EMF accepts at most 100 values per metric in one record
+MAX_VALUES_PER_RECORD = 100
+
+
+def _write_line(line: str) -> None:
+    """Write a record to stdout in one call, so lines from worker threads don't interleave"""
+    sys.stdout.write(line + '\n')
+
+
+_sink: Callable[[str], None] = _write_line
+
+
+def set_sink(sink: Callable[[str], None]) -> None:
+    """Send EMF records somewhere other than stdout (tests, local benchmarks)"""
+    global _sink
+    _sink = sink
+
+
+def emit_timing(stage: str, milliseconds: Union[float, List[float]], **properties) -> None:
+    """Emit one EMF record with the latency of a stage (or several samples of it)"""
+    if not METRICS_ENABLED:
+        return
+    values = milliseconds if isinstance(milliseconds, list) else [milliseconds]
+    for start in range(0, len(values), MAX_VALUES_PER_RECORD):
+        chunk = [round(value, 3) for value in values[start:start + MAX_VALUES_PER_RECORD]]
+        record = {
+            '_aws': {
+                'Timestamp': int(time.time() * 1000),
+                'CloudWatchMetrics': [{
+                    'Namespace': METRICS_NAMESPACE,
+                    'Dimensions': [['Function', 'Stage']],
+                    'Metrics': [{'Name': 'Latency', 'Unit': 'Milliseconds'}]
+                }]
+            },
+            'Function': FUNCTION_NAME,
+            'Stage': stage,
+            'Latency': chunk if len(chunk) > 1 else chunk[0],
+            **properties
+        }
+        try:
+            _sink(json.dumps(record, default=str, separators=(',', ':')))
+        except Exception as e:
+            print(f"Error emitting metric {stage}: {str(e)}")
+
+
+def emit_usage(model: str, input_tokens: int, output_tokens: int, cost_usd: float, **properties) -> None:
+    """Emit one EMF record with the token usage and cost of a model call"""
+    if not METRICS_ENABLED:
+        return
+    record = {
+        '_aws': {
+            'Timestamp': int(time.time() * 1000),
+            'CloudWatchMetrics': [{
+                'Namespace': METRICS_NAMESPACE,
+                'Dimensions': [['Function', 'Model']],
+                'Metrics': [
+                    {'Name': 'InputTokens', 'Unit': 'Count'},
+                    {'Name': 'OutputTokens', 'Unit': 'Count'},
+                    {'Name': 'CostUsd', 'Unit': 'None'}
+                ]
+            }]
+        },
+        'Function': FUNCTION_NAME,
+        'Model': model,
+        'InputTokens': input_tokens,
+        'OutputTokens': output_tokens,
+        'CostUsd': cost_usd,
+        **properties
+    }
+    try:
+        _sink(json.dumps(record, default=str, separators=(',', ':')))
+    except Exception as e:
+        print(f"Error emitting usage of {model}: {str(e)}")
+
+
+def emit_count(name: str, value: int = 1, **properties) -> None:
+    """Emit one EMF record counting events of a kind (e.g. ParseFailures)"""
+    if not METRICS_ENABLED:
+        return
+    record = {
+        '_aws': {
+            'Timestamp': int(time.time() * 1000),
+            'CloudWatchMetrics': [{
+                'Namespace': METRICS_NAMESPACE,
+                'Dimensions': [['Function']],
+                'Metrics': [{'Name': name, 'Unit': 'Count'}]
+            }]
+        },
+        'Function': FUNCTION_NAME,
+        name: value,
+        **properties
+    }
+    try:
+        _sink(json.dumps(record, default=str, separators=(',', ':')))
+    except Exception as e:
+        print(f"Error emitting metric {name}: {str(e)}")
+
+
+@contextmanager
+def timed(stage: str, **properties):
+    """Time a block and emit it as a stage; the yielded dict adds properties"""
+    extra = dict(properties)
+    started = time.monotonic()
+    try:
+        yield extra
+    except Exception:
+        extra['error'] = True
+        raise
+    finally:
+        emit_timing(stage, (time.monotonic() - started) * 1000, **extra)
+
+
+def now_ms() -> int:
+    """Wall-clock milliseconds, comparable across functions"""
+    return int(time.time() * 1000)
+
+
+def published_ms(value: Optional[str]) -> Optional[int]:
+    """Epoch milliseconds of a provider publish time (ISO 8601 or YYYYMMDDTHHMMSS)"""
+    if not value:
+        return None
+    for parse in (
+        lambda text: datetime.fromisoformat(text.replace('Z', '+00:00')),
+        lambda text: datetime.strptime(text[:15], '%Y%m%dT%H%M%S')
+    ):
+        try:
+            published = parse(str(value))
+        except ValueError:
+            continue
+        if published.tzinfo is None:
+            published = published.replace(tzinfo=timezone.utc)
+        return int(published.timestamp() * 1000)
+    return None
@@ -0,0 +1,182 @@
+import re
+from typing import Dict, List, Tuple
+
+from sp500 import SP500_COMPANIES
+
+# Cheap local first stage run before any model call. Company names are found
+# with an Aho-Corasick automaton (one pass over the text for all ~600 aliases),
+# explicit symbols with a few regexes, and a finance lexicon gives a rough
+# sentiment. Only articles with candidate tickers need the model, and the
+# model is only asked about those candidates.
+
+# Explicit symbol mentions: "$AAPL", "NASDAQ: AAPL", "(AAPL)"
+CASHTAG_RE = re.compile(r'\$([A-Z]{1,5}(?:\.[AB])?)\b')
+EXCHANGE_SYMBOL_RE = re.compile(r'\b(?:NYSE|NASDAQ|Nasdaq)\s*:\s*([A-Z]{1,5}(?:\.[AB])?)\b')
+# Single letters in parentheses are usually list markers, not symbols
+PAREN_SYMBOL_RE = re.compile(r'\(([A-Z]{2,5}(?:\.[AB])?)\)')
+# Symbols that are also everyday words or acronyms, e.g. "information technology (IT)"
+AMBIGUOUS_SYMBOLS = frozenset(['IT', 'ON', 'ALL', 'ARE', 'NOW', 'KEY', 'LOW', 'CAT', 'WELL', 'COST', 'FAST', 'POOL', 'DAY', 'TECH', 'DOC', 'PM', 'ES'])
+
+TOKEN_RE = re.compile(r"[a-z]+(?:'[a-z]+)?")
+WHITESPACE_RE = re.compile(r'\s+')
+
+POSITIVE_WORDS = frozenset("""
+    beat beats exceeded exceeds surge surged surges soar soared soars jump jumped jumps rally rallied
+    rallies gain gained gains rise rose rises climb climbed record upgrade upgraded upgrades outperform
+    outperformed strong stronger growth grew boost boosted raise raised raises profit profitable
+    expand expanded expansion approval approved win wins won breakthrough bullish optimistic rebound
+    rebounded recover recovered buyback dividend accelerate accelerated robust upbeat tops topped
+""".split())
+
+NEGATIVE_WORDS = frozenset("""
+    miss missed misses plunge plunged plunges slump slumped tumble tumbled fall fell falls drop dropped
+    drops decline declined declines sink sank slide slid downgrade downgraded downgrades underperform
+    weak weaker loss losses lawsuit sued probe investigation recall recalled layoffs layoff cut cuts
+    warn warned warning warns bankruptcy default fraud fine fined delay delayed halt halted bearish
+    pessimistic slowdown shortfall crash crashed concern concerns risk risks lower lowered resign resigned
+""".split())
+
+NEGATIONS = frozenset(['not', 'no', 'never', "didn't", "doesn't", "don't", "isn't", "wasn't", 'without'])
+
+# Score magnitude needed before the lexicon calls a direction
+LEXICON_THRESHOLD = 0.2
+
+
+def normalize_for_matching(text: str) -> str:
+    """Lowercase and fold punctuation variants so names match however they are typed"""
+    text = (text or '').lower().replace('’', "'").replace('‘', "'").replace('-', ' ')
+    return WHITESPACE_RE.sub(' ', text)
+
+
+def build_automaton(patterns: List[str]) -> Tuple[List[Dict[str, int]], List[int], List[List[str]]]:
+    """Build an Aho-Corasick automaton (goto, fail, output) over the patterns"""
+    goto: List[Dict[str, int]] = [{}]
+    output: List[List[str]] = [[]]
+
+    for pattern in patterns:
+        state = 0
+        for char in pattern:
+            if char not in goto[state]:
+                goto.append({})
+                output.append([])
+                goto[state][char] = len(goto) - 1
+            state = goto[state][char]
+        output[state].append(pattern)
+
+    # Breadth-first pass to link each state to its longest proper suffix state
+    fail = [0] * len(goto)
+    queue = list(goto[0].values())
+    for state in queue:
+        for char, next_state in goto[state].items():
+            queue.append(next_state)
+            fallback = fail[state]
+            while fallback and char not in goto[fallback]:
+                fallback = fail[fallback]
+            fail[next_state] = goto[fallback].get(char, 0)
+            output[next_state] = output[next_state] + output[fail[next_state]]
+
+    return goto, fail, output
+
+
+def find_patterns(automaton: Tuple, text: str) -> List[Tuple[int, str]]:
+    """Return (start, pattern) for every whole-word pattern occurrence in text"""
+    goto, fail, output = automaton
+    matches = []
+    state = 0
+
+    for index, char in enumerate(text):
+        while state and char not in goto[state]:
+            state = fail[state]
+        state = goto[state].get(char, 0)
+        for pattern in output[state]:
+            start = index - len(pattern) + 1
+            before = text[start - 1] if start > 0 else ' '
+            after = text[index + 1] if index + 1 < len(text) else ' '
+            if not before.isalnum() and not after.isalnum():
+                matches.append((start, pattern))
+
+    return matches
+
+
+NAME_TO_TICKER = {
+    normalize_for_matching(name): ticker
+    for ticker, names in SP500_COMPANIES.items()
+    for name in names
+}
+NAME_AUTOMATON = build_automaton(list(NAME_TO_TICKER))
+
+
+def extract_candidate_tickers(article: Dict) -> List[str]:
+    """S&P 500 tickers an article mentions, by name, symbol or provider tagging"""
+    text = f"{article.get('title', '')}\n{article.get('content') or article.get('description') or ''}"
+    candidates = {}
+
+    for _, name in find_patterns(NAME_AUTOMATON, normalize_for_matching(text)):
+        candidates[NAME_TO_TICKER[name]] = True
+
+    for symbol in CASHTAG_RE.findall(text) + EXCHANGE_SYMBOL_RE.findall(text):
+        if symbol in SP500_COMPANIES:
+            candidates[symbol] = True
+    for symbol in PAREN_SYMBOL_RE.findall(text):
+        if symbol in SP500_COMPANIES and symbol not in AMBIGUOUS_SYMBOLS:
+            candidates[symbol] = True
+
+    # Alpha Vantage articles arrive tagged with ticker_sentiment entries
+    for tagged in article.get('tickers') or []:
+        symbol = tagged.get('ticker', '') if isinstance(tagged, dict) else str(tagged)
+        if symbol in SP500_COMPANIES:
+            candidates[symbol] = True
+
+    return list(candidates)
+
+
+def lexicon_sentiment(text: str) -> Tuple[str, float]:
+    """Rough (label, score in [-1, 1]) sentiment from finance word counts"""
+    positive = negative = 0
+    previous = []
+
+    for token in TOKEN_RE.findall((text or '').lower()):
+        polarity = 1 if token in POSITIVE_WORDS else -1 if token in NEGATIVE_WORDS else 0
+        if polarity and any(word in NEGATIONS for word in previous):
+            polarity = -polarity
+        if polarity > 0:
+            positive += 1
+        elif polarity < 0:
+            negative += 1
+        previous = (previous + [token])[-2:]
+
+    score = (positive - negative) / max(positive + negative, 1)
+    if score >= LEXICON_THRESHOLD:
+        return 'bullish', score
+    if score <= -LEXICON_THRESHOLD:
+        return 'bearish', score
+    return 'neutral', score
+
+
+def screen_article(article: Dict) -> None:
+    """Attach candidate tickers and lexicon sentiment to an article in place"""
+    article['candidateTickers'] = extract_candidate_tickers(article)
+    text = f"{article.get('title', '')} {article.get('content') or article.get('description') or ''}"
+    article['lexiconSentiment'], article['lexiconScore'] = lexicon_sentiment(text)
+
+
+def local_analysis(article: Dict) -> Dict:
+    """Analysis for an article with no candidate tickers, without a model call"""
+    return {
+        'sentiment_overall': article.get('lexiconSentiment', 'neutral'),
+        'affected_tickers': [],
+        'lexicon_score': round(article.get('lexiconScore', 0.0), 3),
+        'tier': 'local'
+    }
+
+
+def keep_candidate_tickers(analysis: Dict, candidates: List[str]) -> Dict:
+    """Drop model-reported tickers that were not among the article's candidates"""
+    if not candidates or not isinstance(analysis.get('affected_tickers'), list):
+        return analysis
+    allowed = set(candidates)
+    analysis['affected_tickers'] = [
+        entry for entry in analysis['affected_tickers']
+        if isinstance(entry, dict) and str(entry.get('ticker', '')).upper() in allowed
+    ]
+    return analysis
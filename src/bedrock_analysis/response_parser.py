@@ -0,0 +1,161 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+# Tolerant extraction of the JSON object in a model response. One pass over
+# the text finds the first '{' whose object balances, skipping prose, code
+# fences and braces inside strings, and only that slice is parsed. A response
+# cut off mid-object (max_tokens) is repaired: the value being written when
+# it stopped (a ticker cut to "AA" would be wrong, not just short) and any
+# dangling key, colon or comma are dropped, and the open containers are
+# closed. The result is then checked against the analysis
+# schema, so a malformed answer is reported instead of becoming a silent
+# neutral.
+SENTIMENTS = ('bullish', 'bearish', 'neutral')
+WHITESPACE = ' \t\r\n'
+MAX_REASONING_CHARS = 500
+
+
+class ResponseParseError(ValueError):
+    """No valid analysis could be recovered from a model response"""
+
+
+def _scan(content: str, start: int) -> Tuple[Optional[int], List[str], int]:
+    """Scan from an opening brace: (end of the balanced object or None, closers still open, start of an unfinished value or -1)"""
+    closers = []
+    in_string = escaped = False
+    value_start = -1
+    for index in range(start, len(content)):
+        char = content[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+                value_start = -1
+            continue
+        if char == '"':
+            in_string = True
+            value_start = index
+        elif char in '{[':
+            closers.append('}' if char == '{' else ']')
+            value_start = -1
+        elif char in '}]':
+            if not closers or closers.pop() != char or not closers:
+                # The object is complete (or has a mismatched bracket the parser will report)
+                return index + 1, [], -1
+            value_start = -1
+        elif char in WHITESPACE or char in ',:':
+            value_start = -1
+        elif value_start < 0:
+            # Start of a number or true/false/null
+            value_start = index
+    return None, closers, value_start
+
+
+def _string_start(text: str) -> int:
+    """Index of the opening quote of the string that ends text"""
+    index = len(text) - 1
+    while True:
+        index = text.rfind('"', 0, index)
+        backslashes = 0
+        while index - backslashes - 1 >= 0 and text[index - backslashes - 1] == '\\':
+            backslashes += 1
+        if index < 0:
+            return 0
+        if backslashes % 2 == 0:
+            return index
+
+
+def _repair(text: str, closers: List[str], value_start: int) -> str:
+    """Close a truncated object so whatever complete fields it has can be parsed"""
+    if value_start >= 0:
+        text = text[:value_start]
+
+    while True:
+        text = text.rstrip(WHITESPACE)
+        if text.endswith(','):
+            text = text[:-1]
+        elif text.endswith(':'):
+            # A key without its value
+            text = text[:-1].rstrip(WHITESPACE)
+            text = text[:_string_start(text)]
+        elif text.endswith('"') and closers and closers[-1] == '}':
+            start = _string_start(text)
+            if text[:start].rstrip(WHITESPACE)[-1:] in ('{', ','):
+                # A key with no colon yet
+                text = text[:start]
+            else:
+                break
+        else:
+            break
+    return text + ''.join(reversed(closers))
+
+
+def extract_json(content: str) -> Tuple[Any, bool]:
+    """The first JSON object in a model response, and whether it had to be repaired"""
+    start = content.find('{')
+    while start >= 0:
+        end, closers, value_start = _scan(content, start)
+        if end is None:
+            repaired = _repair(content[start:], closers, value_start - start if value_start >= 0 else -1)
+            try:
+                return json.loads(repaired), True
+            except json.JSONDecodeError as e:
+                raise ResponseParseError(f"Truncated JSON could not be repaired: {e}")
+        try:
+            return json.loads(content[start:end]), False
+        except json.JSONDecodeError:
+            # Braces in prose before the real object
+            start = content.find('{', end)
+    raise ResponseParseError('No JSON object in response')
+
+
+def _sentiment(value: Any) -> Optional[str]:
+    """A sentiment label in lower case, or None if it isn't one"""
+    label = str(value or '').strip().lower()
+    return label if label in SENTIMENTS else None
+
+
+def validate_analysis(value: Any) -> Dict:
+    """A single-article analysis in canonical form; raises ResponseParseError if it doesn't fit the schema"""
+    if not isinstance(value, dict):
+        raise ResponseParseError(f"Expected an object, got {type(value).__name__}")
+    overall = _sentiment(value.get('sentiment_overall'))
+    if not overall:
+        raise ResponseParseError(f"Invalid sentiment_overall: {value.get('sentiment_overall')!r}")
+    tickers = value.get('affected_tickers', [])
+    if not isinstance(tickers, list):
+        raise ResponseParseError('affected_tickers is not a list')
+
+    affected = []
+    for entry in tickers:
+        # Entries without a ticker and sentiment (usually cut off by truncation) are dropped
+        if not isinstance(entry, dict) or not isinstance(entry.get('ticker'), str) or not entry['ticker'].strip():
+            continue
+        sentiment = _sentiment(entry.get('sentiment'))
+        if not sentiment:
+            continue
+        affected.append({
+            'ticker': entry['ticker'].strip().upper(),
+            'sentiment': sentiment,
+            'reasoning': str(entry.get('reasoning') or '')[:MAX_REASONING_CHARS]
+        })
+    return {'sentiment_overall': overall, 'affected_tickers': affected}
+
+
+def validate_batch(value: Any) -> Dict[str, Dict]:
+    """Valid analyses of a batched response by article ID; invalid entries are left out"""
+    results = value.get('results') if isinstance(value, dict) else None
+    if not isinstance(results, list):
+        raise ResponseParseError('Batched response has no results list')
+    analyses = {}
+    for entry in results:
+        if not isinstance(entry, dict) or not isinstance(entry.get('id'), str):
+            continue
+        try:
+            analyses[entry['id']] = validate_analysis(entry)
+        except ResponseParseError:
+            continue
+    return analyses
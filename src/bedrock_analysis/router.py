@@ -0,0 +1,60 @@
+import os
+import re
+from typing import Dict, Optional, Tuple
+
+# Model routing: articles go to a fast, cheap model first and only reach the
+# full model when the local screen or the fast answer says they need it.
+# Articles naming several companies, or with high-impact news (deals,
+# bankruptcies, regulatory action, leadership changes, ...), go straight to
+# the full model. A fast result is escalated when it is ambiguous: a fallback,
+# mixed ticker sentiments, more tickers than the fast tier handles, or a
+# direction the lexicon strongly disagrees with.
+MODEL_ROUTING_ENABLED = os.environ.get('MODEL_ROUTING_ENABLED', 'true').lower() == 'true'
+BEDROCK_FAST_MODEL_ID = os.environ.get('BEDROCK_FAST_MODEL_ID', 'anthropic.claude-3-haiku-20240307-v1:0')
+# Most candidate tickers an article can have and stay on the fast tier
+ROUTING_FAST_MAX_TICKERS = int(os.environ.get('ROUTING_FAST_MAX_TICKERS', '1'))
+# Lexicon score magnitude at which a neutral fast answer counts as ambiguous
+ROUTING_LEXICON_CONFLICT = 0.6
+
+HIGH_IMPACT_RE = re.compile(
+    r'\b(?:merger|merge[sd]?|acquir(?:e|es|ed|ing)|acquisition|takeover|buyout|bankrupt\w*|chapter 11|'
+    r'fraud|antitrust|indict\w*|sec (?:probe|charges?|investigation)|doj|ftc|fda|'
+    r'(?:cuts?|raises?|lowers?|withdraws?|slashes) (?:its )?(?:[\w-]+ )?(?:guidance|outlook|forecast)|profit warning|'
+    r'restat\w*|delist\w*|halt(?:s|ed)?|recall(?:s|ed)?|layoffs?|'
+    r'dividend (?:cut|suspen\w*)|(?:ceo|cfo|chief executive) (?:resign\w*|steps? down|ousted|fired|departure)|'
+    r'spin-?off|activist|going private)\b',
+    re.IGNORECASE
+)
+
+
+def route_article(article: Dict) -> Tuple[str, Optional[str]]:
+    """Pick the tier for an article from the local screen: (tier, reason for the full model)"""
+    candidates = article.get('candidateTickers')
+    if candidates is None:
+        # Without the pre-filter there is no local screen to trust
+        return 'full', 'unscreened'
+    if len(candidates) > ROUTING_FAST_MAX_TICKERS:
+        return 'full', 'multi_ticker'
+    if HIGH_IMPACT_RE.search(f"{article.get('title', '')}\n{article.get('description') or ''}"):
+        return 'full', 'high_impact'
+    return 'fast', None
+
+
+def escalation_reason(article: Dict, analysis: Dict) -> Optional[str]:
+    """Why a fast-tier analysis should be redone by the full model, or None to keep it"""
+    if not analysis or analysis.get('fallback'):
+        return 'fallback'
+    tickers = [entry for entry in analysis.get('affected_tickers') or [] if isinstance(entry, dict)]
+    if len(tickers) > ROUTING_FAST_MAX_TICKERS:
+        return 'multi_ticker'
+    directions = {str(entry.get('sentiment', 'neutral')).lower() for entry in tickers} - {'neutral'}
+    if len(directions) > 1:
+        return 'mixed_sentiment'
+
+    overall = str(analysis.get('sentiment_overall', 'neutral')).lower()
+    lexicon = article.get('lexiconSentiment')
+    if {overall, lexicon} == {'bullish', 'bearish'}:
+        return 'lexicon_disagrees'
+    if overall == 'neutral' and abs(article.get('lexiconScore') or 0.0) >= ROUTING_LEXICON_CONFLICT:
+        return 'ambiguous'
+    return None
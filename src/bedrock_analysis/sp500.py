@@ -0,0 +1,509 @@
+# S&P 500 constituents and the names they are referred to by in headlines.
+# Share classes without their own aliases (GOOG, FOX, NWS) are matched by symbol only.
+# Aliases are matched case-insensitively on word boundaries, so common words
+# ("Target", "Ball", "Visa") are listed with a suffix to avoid false matches.
+SP500_COMPANIES = {
+    'MMM': ['3M'],
+    'AOS': ['A. O. Smith'],
+    'ABT': ['Abbott Laboratories', 'Abbott Labs'],
+    'ABBV': ['AbbVie'],
+    'ACN': ['Accenture'],
+    'ADBE': ['Adobe'],
+    'AMD': ['Advanced Micro Devices', 'AMD'],
+    'AES': ['AES Corp'],
+    'AFL': ['Aflac'],
+    'A': ['Agilent'],
+    'APD': ['Air Products'],
+    'ABNB': ['Airbnb'],
+    'AKAM': ['Akamai'],
+    'ALB': ['Albemarle'],
+    'ARE': ['Alexandria Real Estate'],
+    'ALGN': ['Align Technology'],
+    'ALLE': ['Allegion'],
+    'LNT': ['Alliant Energy'],
+    'ALL': ['Allstate'],
+    'GOOGL': ['Alphabet', 'Google'],
+    'GOOG': [],
+    'MO': ['Altria'],
+    'AMZN': ['Amazon'],
+    'AMCR': ['Amcor'],
+    'AEE': ['Ameren'],
+    'AEP': ['American Electric Power'],
+    'AXP': ['American Express'],
+    'AIG': ['American International Group'],
+    'AMT': ['American Tower'],
+    'AWK': ['American Water Works'],
+    'AMP': ['Ameriprise'],
+    'AME': ['Ametek'],
+    'AMGN': ['Amgen'],
+    'APH': ['Amphenol'],
+    'ADI': ['Analog Devices'],
+    'ANSS': ['Ansys'],
+    'AON': ['Aon'],
+    'APA': ['APA Corp', 'Apache Corp'],
+    'APO': ['Apollo Global'],
+    'AAPL': ['Apple'],
+    'AMAT': ['Applied Materials'],
+    'APTV': ['Aptiv'],
+    'ACGL': ['Arch Capital'],
+    'ADM': ['Archer-Daniels-Midland', 'Archer Daniels Midland'],
+    'ANET': ['Arista Networks'],
+    'AJG': ['Arthur J. Gallagher'],
+    'AIZ': ['Assurant'],
+    'T': ['AT&T'],
+    'ATO': ['Atmos Energy'],
+    'ADSK': ['Autodesk'],
+    'ADP': ['Automatic Data Processing'],
+    'AZO': ['AutoZone'],
+    'AVB': ['AvalonBay'],
+    'AVY': ['Avery Dennison'],
+    'AXON': ['Axon Enterprise'],
+    'BKR': ['Baker Hughes'],
+    'BALL': ['Ball Corp'],
+    'BAC': ['Bank of America', 'BofA'],
+    'BAX': ['Baxter International'],
+    'BDX': ['Becton Dickinson'],
+    'BRK.B': ['Berkshire Hathaway', 'Berkshire'],
+    'BBY': ['Best Buy'],
+    'TECH': ['Bio-Techne'],
+    'BIIB': ['Biogen'],
+    'BLK': ['BlackRock'],
+    'BX': ['Blackstone'],
+    'BK': ['BNY Mellon', 'Bank of New York Mellon'],
+    'BA': ['Boeing'],
+    'BKNG': ['Booking Holdings'],
+    'BWA': ['BorgWarner'],
+    'BSX': ['Boston Scientific'],
+    'BMY': ['Bristol-Myers Squibb', 'Bristol Myers Squibb'],
+    'AVGO': ['Broadcom'],
+    'BR': ['Broadridge'],
+    'BRO': ['Brown & Brown'],
+    'BF.B': ['Brown-Forman'],
+    'BLDR': ['Builders FirstSource'],
+    'BG': ['Bunge'],
+    'BXP': ['BXP Inc', 'Boston Properties'],
+    'CHRW': ['C.H. Robinson'],
+    'CDNS': ['Cadence Design Systems'],
+    'CZR': ['Caesars Entertainment'],
+    'CPT': ['Camden Property'],
+    'CPB': ['Campbell Soup', "Campbell's"],
+    'COF': ['Capital One'],
+    'CAH': ['Cardinal Health'],
+    'KMX': ['CarMax'],
+    'CCL': ['Carnival Corp', 'Carnival Cruise'],
+    'CARR': ['Carrier Global'],
+    'CAT': ['Caterpillar'],
+    'CBOE': ['Cboe Global Markets'],
+    'CBRE': ['CBRE Group'],
+    'CDW': ['CDW Corp'],
+    'CE': ['Celanese'],
+    'COR': ['Cencora', 'AmerisourceBergen'],
+    'CNC': ['Centene'],
+    'CNP': ['CenterPoint Energy'],
+    'CF': ['CF Industries'],
+    'CRL': ['Charles River Laboratories'],
+    'SCHW': ['Charles Schwab'],
+    'CHTR': ['Charter Communications'],
+    'CVX': ['Chevron'],
+    'CMG': ['Chipotle'],
+    'CB': ['Chubb'],
+    'CHD': ['Church & Dwight'],
+    'CI': ['Cigna'],
+    'CINF': ['Cincinnati Financial'],
+    'CTAS': ['Cintas'],
+    'CSCO': ['Cisco'],
+    'C': ['Citigroup', 'Citibank', 'Citi'],
+    'CFG': ['Citizens Financial'],
+    'CLX': ['Clorox'],
+    'CME': ['CME Group'],
+    'CMS': ['CMS Energy'],
+    'KO': ['Coca-Cola', 'Coca Cola'],
+    'CTSH': ['Cognizant'],
+    'CL': ['Colgate-Palmolive', 'Colgate'],
+    'CMCSA': ['Comcast'],
+    'CAG': ['Conagra'],
+    'COP': ['ConocoPhillips'],
+    'ED': ['Consolidated Edison', 'Con Edison'],
+    'STZ': ['Constellation Brands'],
+    'CEG': ['Constellation Energy'],
+    'COO': ['Cooper Companies'],
+    'CPRT': ['Copart'],
+    'GLW': ['Corning Inc'],
+    'CPAY': ['Corpay'],
+    'CTVA': ['Corteva'],
+    'CSGP': ['CoStar'],
+    'COST': ['Costco'],
+    'CTRA': ['Coterra'],
+    'CRWD': ['CrowdStrike'],
+    'CCI': ['Crown Castle'],
+    'CSX': ['CSX'],
+    'CMI': ['Cummins'],
+    'CVS': ['CVS Health', 'CVS'],
+    'DHR': ['Danaher'],
+    'DRI': ['Darden Restaurants'],
+    'DVA': ['DaVita'],
+    'DAY': ['Dayforce'],
+    'DECK': ['Deckers Outdoor'],
+    'DE': ['Deere', 'John Deere'],
+    'DELL': ['Dell Technologies'],
+    'DAL': ['Delta Air Lines', 'Delta Airlines'],
+    'DVN': ['Devon Energy'],
+    'DXCM': ['Dexcom'],
+    'FANG': ['Diamondback Energy'],
+    'DLR': ['Digital Realty'],
+    'DFS': ['Discover Financial'],
+    'DG': ['Dollar General'],
+    'DLTR': ['Dollar Tree'],
+    'D': ['Dominion Energy'],
+    'DPZ': ["Domino's"],
+    'DOV': ['Dover Corp'],
+    'DOW': ['Dow Inc', 'Dow Chemical'],
+    'DHI': ['D.R. Horton', 'DR Horton'],
+    'DTE': ['DTE Energy'],
+    'DUK': ['Duke Energy'],
+    'DD': ['DuPont'],
+    'EMN': ['Eastman Chemical'],
+    'ETN': ['Eaton'],
+    'EBAY': ['eBay'],
+    'ECL': ['Ecolab'],
+    'EIX': ['Edison International'],
+    'EW': ['Edwards Lifesciences'],
+    'EA': ['Electronic Arts'],
+    'ELV': ['Elevance Health'],
+    'EMR': ['Emerson Electric'],
+    'ENPH': ['Enphase'],
+    'ETR': ['Entergy'],
+    'EOG': ['EOG Resources'],
+    'EPAM': ['EPAM Systems'],
+    'EQT': ['EQT Corp'],
+    'EFX': ['Equifax'],
+    'EQIX': ['Equinix'],
+    'EQR': ['Equity Residential'],
+    'ERIE': ['Erie Indemnity'],
+    'ESS': ['Essex Property'],
+    'EL': ['Estee Lauder', 'Estée Lauder'],
+    'EG': ['Everest Group'],
+    'EVRG': ['Evergy'],
+    'ES': ['Eversource'],
+    'EXC': ['Exelon'],
+    'EXPE': ['Expedia'],
+    'EXPD': ['Expeditors International'],
+    'EXR': ['Extra Space Storage'],
+    'XOM': ['Exxon Mobil', 'ExxonMobil', 'Exxon'],
+    'FFIV': ['F5 Inc', 'F5 Networks'],
+    'FDS': ['FactSet'],
+    'FICO': ['Fair Isaac'],
+    'FAST': ['Fastenal'],
+    'FRT': ['Federal Realty'],
+    'FDX': ['FedEx'],
+    'FIS': ['Fidelity National Information Services'],
+    'FITB': ['Fifth Third'],
+    'FSLR': ['First Solar'],
+    'FE': ['FirstEnergy'],
+    'FI': ['Fiserv'],
+    'FMC': ['FMC Corp'],
+    'F': ['Ford Motor', 'Ford'],
+    'FTNT': ['Fortinet'],
+    'FTV': ['Fortive'],
+    'FOXA': ['Fox Corp'],
+    'FOX': [],
+    'BEN': ['Franklin Resources', 'Franklin Templeton'],
+    'FCX': ['Freeport-McMoRan', 'Freeport McMoRan'],
+    'GRMN': ['Garmin'],
+    'IT': ['Gartner'],
+    'GE': ['General Electric', 'GE Aerospace'],
+    'GEHC': ['GE HealthCare'],
+    'GEV': ['GE Vernova'],
+    'GEN': ['Gen Digital'],
+    'GNRC': ['Generac'],
+    'GD': ['General Dynamics'],
+    'GIS': ['General Mills'],
+    'GM': ['General Motors'],
+    'GPC': ['Genuine Parts'],
+    'GILD': ['Gilead'],
+    'GPN': ['Global Payments'],
+    'GL': ['Globe Life'],
+    'GDDY': ['GoDaddy'],
+    'GS': ['Goldman Sachs', 'Goldman'],
+    'HAL': ['Halliburton'],
+    'HIG': ['Hartford Financial'],
+    'HAS': ['Hasbro'],
+    'HCA': ['HCA Healthcare'],
+    'DOC': ['Healthpeak'],
+    'HSIC': ['Henry Schein'],
+    'HSY': ['Hershey'],
+    'HES': ['Hess Corp'],
+    'HPE': ['Hewlett Packard Enterprise'],
+    'HLT': ['Hilton'],
+    'HOLX': ['Hologic'],
+    'HD': ['Home Depot'],
+    'HON': ['Honeywell'],
+    'HRL': ['Hormel'],
+    'HST': ['Host Hotels'],
+    'HWM': ['Howmet'],
+    'HPQ': ['HP Inc'],
+    'HUBB': ['Hubbell'],
+    'HUM': ['Humana'],
+    'HBAN': ['Huntington Bancshares'],
+    'HII': ['Huntington Ingalls'],
+    'IBM': ['IBM', 'International Business Machines'],
+    'IEX': ['IDEX Corp'],
+    'IDXX': ['Idexx Laboratories'],
+    'ITW': ['Illinois Tool Works'],
+    'INCY': ['Incyte'],
+    'IR': ['Ingersoll Rand'],
+    'PODD': ['Insulet'],
+    'INTC': ['Intel'],
+    'ICE': ['Intercontinental Exchange'],
+    'IFF': ['International Flavors & Fragrances'],
+    'IP': ['International Paper'],
+    'IPG': ['Interpublic Group'],
+    'INTU': ['Intuit'],
+    'ISRG': ['Intuitive Surgical'],
+    'IVZ': ['Invesco'],
+    'INVH': ['Invitation Homes'],
+    'IQV': ['IQVIA'],
+    'IRM': ['Iron Mountain'],
+    'JBHT': ['J.B. Hunt', 'JB Hunt'],
+    'JBL': ['Jabil'],
+    'JKHY': ['Jack Henry'],
+    'J': ['Jacobs Solutions', 'Jacobs Engineering'],
+    'JNJ': ['Johnson & Johnson'],
+    'JCI': ['Johnson Controls'],
+    'JPM': ['JPMorgan Chase', 'JPMorgan', 'JP Morgan'],
+    'JNPR': ['Juniper Networks'],
+    'K': ['Kellanova', 'Kellogg'],
+    'KVUE': ['Kenvue'],
+    'KDP': ['Keurig Dr Pepper'],
+    'KEY': ['KeyCorp'],
+    'KEYS': ['Keysight'],
+    'KMB': ['Kimberly-Clark', 'Kimberly Clark'],
+    'KIM': ['Kimco Realty'],
+    'KMI': ['Kinder Morgan'],
+    'KKR': ['KKR'],
+    'KLAC': ['KLA Corp'],
+    'KHC': ['Kraft Heinz'],
+    'KR': ['Kroger'],
+    'LHX': ['L3Harris'],
+    'LH': ['Labcorp'],
+    'LRCX': ['Lam Research'],
+    'LW': ['Lamb Weston'],
+    'LVS': ['Las Vegas Sands'],
+    'LDOS': ['Leidos'],
+    'LEN': ['Lennar'],
+    'LII': ['Lennox'],
+    'LLY': ['Eli Lilly'],
+    'LIN': ['Linde'],
+    'LYV': ['Live Nation'],
+    'LKQ': ['LKQ Corp'],
+    'LMT': ['Lockheed Martin'],
+    'L': ['Loews Corp'],
+    'LOW': ["Lowe's"],
+    'LULU': ['Lululemon'],
+    'LYB': ['LyondellBasell'],
+    'MTB': ['M&T Bank'],
+    'MPC': ['Marathon Petroleum'],
+    'MKTX': ['MarketAxess'],
+    'MAR': ['Marriott'],
+    'MMC': ['Marsh McLennan', 'Marsh & McLennan'],
+    'MLM': ['Martin Marietta'],
+    'MAS': ['Masco'],
+    'MA': ['Mastercard'],
+    'MTCH': ['Match Group'],
+    'MKC': ['McCormick'],
+    'MCD': ["McDonald's"],
+    'MCK': ['McKesson'],
+    'MDT': ['Medtronic'],
+    'MRK': ['Merck'],
+    'META': ['Meta Platforms', 'Facebook', 'Meta'],
+    'MET': ['MetLife'],
+    'MTD': ['Mettler-Toledo'],
+    'MGM': ['MGM Resorts'],
+    'MCHP': ['Microchip Technology'],
+    'MU': ['Micron'],
+    'MSFT': ['Microsoft'],
+    'MAA': ['Mid-America Apartment'],
+    'MRNA': ['Moderna'],
+    'MHK': ['Mohawk Industries'],
+    'MOH': ['Molina Healthcare'],
+    'TAP': ['Molson Coors'],
+    'MDLZ': ['Mondelez'],
+    'MPWR': ['Monolithic Power'],
+    'MNST': ['Monster Beverage'],
+    'MCO': ["Moody's"],
+    'MS': ['Morgan Stanley'],
+    'MOS': ['Mosaic Co'],
+    'MSI': ['Motorola Solutions'],
+    'MSCI': ['MSCI Inc'],
+    'NDAQ': ['Nasdaq Inc'],
+    'NTAP': ['NetApp'],
+    'NFLX': ['Netflix'],
+    'NEM': ['Newmont'],
+    'NWSA': ['News Corp'],
+    'NWS': [],
+    'NEE': ['NextEra Energy'],
+    'NKE': ['Nike'],
+    'NI': ['NiSource'],
+    'NDSN': ['Nordson'],
+    'NSC': ['Norfolk Southern'],
+    'NTRS': ['Northern Trust'],
+    'NOC': ['Northrop Grumman'],
+    'NCLH': ['Norwegian Cruise Line'],
+    'NRG': ['NRG Energy'],
+    'NUE': ['Nucor'],
+    'NVDA': ['Nvidia'],
+    'NVR': ['NVR Inc'],
+    'NXPI': ['NXP Semiconductors'],
+    'ORLY': ["O'Reilly Automotive"],
+    'OXY': ['Occidental Petroleum'],
+    'ODFL': ['Old Dominion Freight Line'],
+    'OMC': ['Omnicom'],
+    'ON': ['ON Semiconductor', 'onsemi'],
+    'OKE': ['Oneok'],
+    'ORCL': ['Oracle'],
+    'OTIS': ['Otis Worldwide', 'Otis Elevator'],
+    'PCAR': ['Paccar'],
+    'PKG': ['Packaging Corporation of America'],
+    'PLTR': ['Palantir'],
+    'PANW': ['Palo Alto Networks'],
+    'PARA': ['Paramount Global'],
+    'PH': ['Parker Hannifin', 'Parker-Hannifin'],
+    'PAYX': ['Paychex'],
+    'PAYC': ['Paycom'],
+    'PYPL': ['PayPal'],
+    'PNR': ['Pentair'],
+    'PEP': ['PepsiCo', 'Pepsi'],
+    'PFE': ['Pfizer'],
+    'PCG': ['PG&E'],
+    'PM': ['Philip Morris'],
+    'PSX': ['Phillips 66'],
+    'PNW': ['Pinnacle West'],
+    'PNC': ['PNC Financial'],
+    'POOL': ['Pool Corp'],
+    'PPG': ['PPG Industries'],
+    'PPL': ['PPL Corp'],
+    'PFG': ['Principal Financial'],
+    'PG': ['Procter & Gamble'],
+    'PGR': ['Progressive Corp'],
+    'PLD': ['Prologis'],
+    'PRU': ['Prudential Financial'],
+    'PEG': ['Public Service Enterprise Group'],
+    'PTC': ['PTC Inc'],
+    'PSA': ['Public Storage'],
+    'PHM': ['PulteGroup'],
+    'QRVO': ['Qorvo'],
+    'PWR': ['Quanta Services'],
+    'QCOM': ['Qualcomm'],
+    'DGX': ['Quest Diagnostics'],
+    'RL': ['Ralph Lauren'],
+    'RJF': ['Raymond James'],
+    'RTX': ['RTX Corp', 'Raytheon'],
+    'O': ['Realty Income'],
+    'REG': ['Regency Centers'],
+    'REGN': ['Regeneron'],
+    'RF': ['Regions Financial'],
+    'RSG': ['Republic Services'],
+    'RMD': ['ResMed'],
+    'RVTY': ['Revvity'],
+    'ROK': ['Rockwell Automation'],
+    'ROL': ['Rollins Inc'],
+    'ROP': ['Roper Technologies'],
+    'ROST': ['Ross Stores'],
+    'RCL': ['Royal Caribbean'],
+    'SPGI': ['S&P Global'],
+    'CRM': ['Salesforce'],
+    'SBAC': ['SBA Communications'],
+    'SLB': ['Schlumberger', 'SLB'],
+    'STX': ['Seagate'],
+    'SRE': ['Sempra'],
+    'NOW': ['ServiceNow'],
+    'SHW': ['Sherwin-Williams', 'Sherwin Williams'],
+    'SPG': ['Simon Property'],
+    'SWKS': ['Skyworks'],
+    'SJM': ['J.M. Smucker', 'Smucker'],
+    'SW': ['Smurfit Westrock'],
+    'SNA': ['Snap-on'],
+    'SOLV': ['Solventum'],
+    'SO': ['Southern Company'],
+    'LUV': ['Southwest Airlines'],
+    'SWK': ['Stanley Black & Decker'],
+    'SBUX': ['Starbucks'],
+    'STT': ['State Street'],
+    'STLD': ['Steel Dynamics'],
+    'STE': ['Steris'],
+    'SYK': ['Stryker'],
+    'SMCI': ['Super Micro Computer', 'Supermicro'],
+    'SYF': ['Synchrony'],
+    'SNPS': ['Synopsys'],
+    'SYY': ['Sysco'],
+    'TMUS': ['T-Mobile'],
+    'TROW': ['T. Rowe Price'],
+    'TTWO': ['Take-Two Interactive'],
+    'TPR': ['Tapestry'],
+    'TRGP': ['Targa Resources'],
+    'TGT': ['Target Corp'],
+    'TEL': ['TE Connectivity'],
+    'TDY': ['Teledyne'],
+    'TFX': ['Teleflex'],
+    'TER': ['Teradyne'],
+    'TSLA': ['Tesla'],
+    'TXN': ['Texas Instruments'],
+    'TPL': ['Texas Pacific Land'],
+    'TXT': ['Textron'],
+    'TMO': ['Thermo Fisher'],
+    'TJX': ['TJX Companies'],
+    'TSCO': ['Tractor Supply'],
+    'TT': ['Trane Technologies'],
+    'TDG': ['TransDigm'],
+    'TRV': ['Travelers Companies'],
+    'TRMB': ['Trimble'],
+    'TFC': ['Truist'],
+    'TYL': ['Tyler Technologies'],
+    'TSN': ['Tyson Foods'],
+    'USB': ['U.S. Bancorp', 'US Bancorp'],
+    'UBER': ['Uber'],
+    'UDR': ['UDR Inc'],
+    'ULTA': ['Ulta Beauty'],
+    'UNP': ['Union Pacific'],
+    'UAL': ['United Airlines'],
+    'UPS': ['United Parcel Service'],
+    'URI': ['United Rentals'],
+    'UNH': ['UnitedHealth'],
+    'UHS': ['Universal Health Services'],
+    'VLO': ['Valero'],
+    'VTR': ['Ventas'],
+    'VLTO': ['Veralto'],
+    'VRSN': ['VeriSign'],
+    'VRSK': ['Verisk'],
+    'VZ': ['Verizon'],
+    'VRTX': ['Vertex Pharmaceuticals'],
+    'VTRS': ['Viatris'],
+    'VICI': ['VICI Properties'],
+    'V': ['Visa Inc'],
+    'VST': ['Vistra'],
+    'VMC': ['Vulcan Materials'],
+    'WRB': ['W. R. Berkley'],
+    'GWW': ['W. W. Grainger', 'Grainger'],
+    'WAB': ['Wabtec'],
+    'WBA': ['Walgreens'],
+    'WMT': ['Walmart'],
+    'DIS': ['Walt Disney', 'Disney'],
+    'WBD': ['Warner Bros. Discovery', 'Warner Bros Discovery'],
+    'WM': ['Waste Management'],
+    'WAT': ['Waters Corp'],
+    'WEC': ['WEC Energy'],
+    'WFC': ['Wells Fargo'],
+    'WELL': ['Welltower'],
+    'WST': ['West Pharmaceutical'],
+    'WDC': ['Western Digital'],
+    'WY': ['Weyerhaeuser'],
+    'WMB': ['Williams Companies'],
+    'WTW': ['Willis Towers Watson'],
+    'WYNN': ['Wynn Resorts'],
+    'XEL': ['Xcel Energy'],
+    'XYL': ['Xylem'],
+    'YUM': ['Yum! Brands', 'Yum Brands'],
+    'ZBRA': ['Zebra Technologies'],
+    'ZBH': ['Zimmer Biomet'],
+    'ZTS': ['Zoetis']
+}
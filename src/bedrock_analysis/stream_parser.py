@@ -0,0 +1,94 @@
+import json
+from typing import Any, List, Tuple
+
+WHITESPACE = ' \t\r\n'
+LITERAL_END = WHITESPACE + ',]}'
+
+
+class IncrementalJsonParser:
+    """Push parser that reports each JSON value as soon as it is complete.
+
+    Model output arrives a few characters at a time. feed() returns a
+    (path, value) pair for every value that closed within the chunk, e.g.
+    (('sentiment_overall',), 'bullish') or (('affected_tickers', 0), {...}),
+    so callers can act on fields long before the whole document has been
+    generated. Anything before the first '{' (prose, a ```json fence) and
+    after the top-level object is ignored.
+    """
+
+    def __init__(self):
+        # Open containers: [path, container, pending object key]
+        self.stack: List[list] = []
+        self.started = False
+        self.finished = False
+        self.token = ''
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, chunk: str) -> List[Tuple[Tuple, Any]]:
+        """Consume a chunk of text and return the values it completed"""
+        completed = []
+        for char in chunk:
+            if self.finished:
+                break
+            if not self.started:
+                if char != '{':
+                    continue
+                self.started = True
+
+            if self.in_string:
+                self.token += char
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                    self._complete(json.loads(self.token), completed)
+                    self.token = ''
+                continue
+
+            if self.token and char in LITERAL_END:
+                # Numbers, true/false/null end at the next delimiter
+                self._complete(json.loads(self.token), completed)
+                self.token = ''
+
+            if char == '"':
+                self.in_string = True
+                self.token = char
+            elif char in '{[':
+                self.stack.append([self._child_path(), {} if char == '{' else [], None])
+            elif char in '}]':
+                self._complete(self.stack.pop()[1], completed)
+            elif char not in WHITESPACE + ',:':
+                self.token += char
+        return completed
+
+    def _child_path(self) -> Tuple:
+        """Path of the value about to start inside the innermost container"""
+        if not self.stack:
+            return ()
+        path, container, key = self.stack[-1]
+        return path + ((key,) if isinstance(container, dict) else (len(container),))
+
+    def _complete(self, value: Any, completed: List) -> None:
+        """Attach a finished value to its parent and record it"""
+        if not self.stack:
+            self.finished = True
+            completed.append(((), value))
+            return
+
+        frame = self.stack[-1]
+        parent = frame[1]
+        if isinstance(parent, dict):
+            if frame[2] is None:
+                # A string directly inside an object with no pending key is the key
+                frame[2] = value
+                return
+            path = frame[0] + (frame[2],)
+            parent[frame[2]] = value
+            frame[2] = None
+        else:
+            path = frame[0] + (len(parent),)
+            parent.append(value)
+        completed.append((path, value))
@@ -0,0 +1,126 @@
+import os
+import re
+from typing import Dict, List, Optional
+
+from sp500 import SP500_COMPANIES
+
+# Prompt sizing and cost accounting for model calls. Article text is trimmed
+# to ARTICLE_TOKEN_CAP before it goes into a prompt (keeping the lead and the
+# sentences that name a candidate company), max_tokens is sized to the
+# tickers the model may return, and the token usage each response reports is
+# priced per call so it can be tracked per batch and per article.
+ARTICLE_TOKEN_CAP = int(os.environ.get('ARTICLE_TOKEN_CAP', '500'))
+# Output allowance: the JSON envelope of one article plus one entry per ticker
+OUTPUT_TOKENS_PER_ARTICLE = 100
+OUTPUT_TOKENS_PER_TICKER = 80
+# Tickers allowed for when the pre-filter supplied no candidates
+UNSCREENED_TICKERS = 5
+
+# On-demand USD per 1,000 input / output tokens; BEDROCK_INPUT_PRICE and
+# BEDROCK_OUTPUT_PRICE override them (e.g. for other regions or models)
+MODEL_PRICES = {
+    'anthropic.claude-3-sonnet-20240229-v1:0': (0.003, 0.015),
+    'anthropic.claude-3-5-sonnet-20240620-v1:0': (0.003, 0.015),
+    'anthropic.claude-3-haiku-20240307-v1:0': (0.00025, 0.00125),
+    'anthropic.claude-3-5-haiku-20241022-v1:0': (0.0008, 0.004)
+}
+INPUT_PRICE_OVERRIDE = os.environ.get('BEDROCK_INPUT_PRICE', '')
+OUTPUT_PRICE_OVERRIDE = os.environ.get('BEDROCK_OUTPUT_PRICE', '')
+
+# NewsAPI ends truncated bodies with "... [+1234 chars]"
+TRUNCATION_MARKER_RE = re.compile(r'\s*\[\+\d+ chars\]\s*$')
+SENTENCE_END_RE = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9"\'(])')
+WHITESPACE_RE = re.compile(r'\s+')
+TRIMMED_SUFFIX = ' [...]'
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token for English text)"""
+    return len(text) // 4 + 1
+
+
+def mentions(sentence: str, candidates: List[str]) -> bool:
+    """Whether a sentence names one of the candidate tickers or its company"""
+    lowered = sentence.lower()
+    for ticker in candidates:
+        if re.search(rf'\b{re.escape(ticker)}\b', sentence):
+            return True
+        if any(name.lower() in lowered for name in SP500_COMPANIES.get(ticker, [])):
+            return True
+    return False
+
+
+def trim_text(text: str, token_cap: int, candidates: Optional[List[str]] = None) -> str:
+    """Fit article text to a token cap, keeping the lead and sentences about the candidates"""
+    text = WHITESPACE_RE.sub(' ', TRUNCATION_MARKER_RE.sub('', text or '')).strip()
+    if token_cap <= 0 or estimate_tokens(text) <= token_cap:
+        return text
+
+    char_budget = token_cap * 4 - len(TRIMMED_SUFFIX)
+    sentences = SENTENCE_END_RE.split(text)
+    # The lead sentence first, then those naming a candidate, then the rest in order
+    order = sorted(
+        range(len(sentences)),
+        key=lambda index: (index > 0, not (candidates and mentions(sentences[index], candidates)), index)
+    )
+    kept = set()
+    used = 0
+    for index in order:
+        length = len(sentences[index]) + 1
+        if used + length > char_budget:
+            continue
+        kept.add(index)
+        used += length
+
+    if not kept:
+        # A single sentence longer than the cap: cut it at a word boundary
+        return text[:char_budget].rsplit(' ', 1)[0] + TRIMMED_SUFFIX
+    return ' '.join(sentences[index] for index in sorted(kept)) + TRIMMED_SUFFIX
+
+
+def output_token_budget(articles: List[Dict], maximum: int) -> int:
+    """max_tokens for a call: a per-article envelope plus room for each candidate ticker"""
+    tokens = 0
+    for article in articles:
+        tickers = len(article.get('candidateTickers') or []) or UNSCREENED_TICKERS
+        tokens += OUTPUT_TOKENS_PER_ARTICLE + OUTPUT_TOKENS_PER_TICKER * tickers
+    return min(tokens, maximum)
+
+
+def model_cost(model_id: str, input_tokens: int, output_tokens: int) -> float:
+    """USD cost of one call's token usage"""
+    input_price, output_price = MODEL_PRICES.get(model_id, (0.0, 0.0))
+    if INPUT_PRICE_OVERRIDE:
+        input_price = float(INPUT_PRICE_OVERRIDE)
+    if OUTPUT_PRICE_OVERRIDE:
+        output_price = float(OUTPUT_PRICE_OVERRIDE)
+    return round((input_tokens * input_price + output_tokens * output_price) / 1000, 6)
+
+
+def add_usage(first: Dict, second: Optional[Dict]) -> Dict:
+    """Usage of an article that took a second call (e.g. a parse retry)"""
+    if not second:
+        return first
+    return dict(
+        second,
+        inputTokens=first['inputTokens'] + second['inputTokens'],
+        outputTokens=first['outputTokens'] + second['outputTokens'],
+        costUsd=round(first['costUsd'] + second['costUsd'], 6)
+    )
+
+
+def split_usage(usage: Dict, articles: List[Dict], weights: List[int]) -> Dict[str, Dict]:
+    """Attribute a call's usage to its articles: input by share of the prompt, output evenly"""
+    total = sum(weights)
+    shares = {}
+    for article, weight in zip(articles, weights):
+        input_tokens = round(usage['inputTokens'] * (weight / total if total else 1 / len(articles)))
+        output_tokens = round(usage['outputTokens'] / len(articles))
+        shares[article['articleId']] = {
+            'model': usage['model'],
+            'inputTokens': input_tokens,
+            'outputTokens': output_tokens,
+            'costUsd': model_cost(usage['model'], input_tokens, output_tokens),
+            'batchSize': len(articles)
+        }
+    return shares
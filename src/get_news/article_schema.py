@@ -0,0 +1,71 @@
+import json
+from decimal import Decimal
+from botocore.exceptions import ClientError
+from typing import Dict, List
+
+# Article items carry a schemaVersion:
+# - 1 (or missing): analysis and tradingStrategies stored as JSON strings
+# - 2: analysis and tradingStrategies stored as native maps, so reads skip
+#   json.loads and projections/filters can reach inside them
+# Readers accept both. Version 1 items are rewritten as maps the first time
+# they are read in full (migrate_item).
+SCHEMA_VERSION = 2
+MAP_ATTRIBUTES = ['analysis', 'tradingStrategies']
+
+# Attributes of an article in a listing: no content and no full analysis
+LIST_ATTRIBUTES = [
+    'articleId', 'title', 'description', 'url', 'source', 'publishedAt',
+    'sentiment', 'tradingStrategies', 'timestamp'
+]
+
+
+def json_default(value):
+    """Serialize DynamoDB Decimals in JSON responses"""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def projection(attributes: List[str]) -> Dict:
+    """ProjectionExpression kwargs for a read, with every name aliased"""
+    names = {f"#p{i}": name for i, name in enumerate(dict.fromkeys(attributes))}
+    return {
+        'ProjectionExpression': ', '.join(names),
+        'ExpressionAttributeNames': names
+    }
+
+
+def map_attribute(value) -> Dict:
+    """A map attribute as stored by either schema version"""
+    if value and isinstance(value, str):
+        try:
+            return json.loads(value, parse_float=Decimal)
+        except json.JSONDecodeError:
+            return {}
+    return value or {}
+
+
+def migrate_item(table, item: Dict) -> None:
+    """Rewrite a fully read version 1 item with native maps (best effort)"""
+    if int(item.get('schemaVersion', 1)) >= SCHEMA_VERSION:
+        return
+    if not any(isinstance(item.get(name), str) for name in MAP_ATTRIBUTES):
+        return
+
+    try:
+        table.update_item(
+            Key={'articleId': item['articleId']},
+            UpdateExpression='SET analysis = :analysis, tradingStrategies = :strategies, schemaVersion = :version',
+            # Skip if the article was re-analyzed since it was read
+            ConditionExpression='attribute_not_exists(schemaVersion) OR schemaVersion < :version',
+            ExpressionAttributeValues={
+                ':analysis': map_attribute(item.get('analysis')),
+                ':strategies': map_attribute(item.get('tradingStrategies')),
+                ':version': SCHEMA_VERSION
+            }
+        )
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+            print(f"Error migrating article {item['articleId']}: {str(e)}")
+    except Exception as e:
+        print(f"Error migrating article {item['articleId']}: {str(e)}")
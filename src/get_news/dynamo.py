@@ -0,0 +1,62 @@
+import boto3
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from typing import Dict
+
+# This function talks to DynamoDB through the low-level client instead of
+# the boto3 resource layer: building a resource loads a second model on top
+# of the client's and nearly doubles the setup cost paid by the first request
+# after a cold start. The client is created on first use, and Table mirrors
+# the few resource Table methods used here, converting keys, values and
+# items to and from DynamoDB's attribute-value format.
+_client = None
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+
+def get_client():
+    """The low-level DynamoDB client, created once per warm Lambda"""
+    global _client
+    if _client is None:
+        _client = boto3.client('dynamodb')
+    return _client
+
+
+def serialize(values: Dict) -> Dict:
+    """Python values to DynamoDB attribute values"""
+    return {name: _serializer.serialize(value) for name, value in values.items()}
+
+
+def deserialize(item: Dict) -> Dict:
+    """DynamoDB attribute values to Python values"""
+    return {name: _deserializer.deserialize(value) for name, value in item.items()}
+
+
+class Table:
+    """Stand-in for a boto3 Table resource built on the low-level client"""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def _call(self, operation: str, **kwargs) -> Dict:
+        for key in ('Key', 'Item', 'ExclusiveStartKey', 'ExpressionAttributeValues'):
+            if key in kwargs:
+                kwargs[key] = serialize(kwargs[key])
+        response = getattr(get_client(), operation)(TableName=self.name, **kwargs)
+        for key in ('Item', 'Attributes', 'LastEvaluatedKey'):
+            if key in response:
+                response[key] = deserialize(response[key])
+        if 'Items' in response:
+            response['Items'] = [deserialize(item) for item in response['Items']]
+        return response
+
+    def get_item(self, **kwargs) -> Dict:
+        return self._call('get_item', **kwargs)
+
+    def put_item(self, **kwargs) -> Dict:
+        return self._call('put_item', **kwargs)
+
+    def update_item(self, **kwargs) -> Dict:
+        return self._call('update_item', **kwargs)
+
+    def query(self, **kwargs) -> Dict:
+        return self._call('query', **kwargs)
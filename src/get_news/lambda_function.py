@@ -1,32 +1,205 @@
+import base64
+import gzip
 import json
-import boto3
 import os
+import re
+import time
+from typing import Dict, List, Optional
 
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table(os.environ['TABLE_NAME'])
+from dynamo import Table, deserialize, get_client, serialize
+from article_schema import LIST_ATTRIBUTES, json_default, map_attribute, migrate_item, projection
+from latest_view import read_latest_view
+from metrics import timed
+from news_index import InvalidCursorError, cursor_after, read_page
+from wire_format import COMPRESSION_THRESHOLD_BYTES, WIRE_FORMATS, compact_listing, strategy_dictionary
 
+# Low-level client tables, created on first use (see dynamo.py)
+table = Table(os.environ['TABLE_NAME'])
+TICKER_SIGNALS_TABLE_NAME = os.environ.get('TICKER_SIGNALS_TABLE_NAME', '')
+# Without the ticker-signal table, ticker queries answer 404
+signals_table = Table(TICKER_SIGNALS_TABLE_NAME) if TICKER_SIGNALS_TABLE_NAME else None
 
-def handler(event, context):
-    """Handle REST API requests for news"""
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+TICKER_RE = re.compile(r'^[A-Z]{1,5}(?:\.[A-Z])?$')
+SENTIMENTS = {'bullish', 'bearish', 'neutral'}
+# BatchGetItem accepts at most 100 keys per request
+BATCH_GET_CHUNK_SIZE = 100
+# gzip large responses in the function (HTTP APIs don't compress; REST APIs
+# do it themselves with MinimumCompressionSize)
+COMPRESS_RESPONSES = os.environ.get('COMPRESS_RESPONSES', 'false').lower() == 'true'
+
+
+def json_response(status_code: int, body: Dict, headers: Optional[Dict] = None) -> Dict:
+    """API Gateway proxy response with JSON body and CORS header"""
+    return {
+        'statusCode': status_code,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*',
+            **(headers or {})
+        },
+        'body': json.dumps(body, default=json_default)
+    }
+
+
+def get_header(event, name: str) -> str:
+    """Request header value, matching the name case-insensitively"""
+    for key, value in (event.get('headers') or {}).items():
+        if key.lower() == name.lower():
+            return value or ''
+    return ''
+
+
+def compress_response(event, response: Dict) -> Dict:
+    """gzip a large response body when enabled and the client accepts it"""
+    body = response.get('body') or ''
+    if (not COMPRESS_RESPONSES or len(body) <= COMPRESSION_THRESHOLD_BYTES
+            or 'gzip' not in get_header(event, 'Accept-Encoding').lower()):
+        return response
+    
+    return {
+        **response,
+        'headers': {**response.get('headers', {}), 'Content-Encoding': 'gzip', 'Vary': 'Accept-Encoding'},
+        'body': base64.b64encode(gzip.compress(body.encode('utf-8'))).decode('ascii'),
+        'isBase64Encoded': True
+    }
+
+
+def listing_body(query: Dict, articles: List[Dict], next_cursor: Optional[str]) -> Dict:
+    """Response body of a listing page in the requested wire format"""
+    if query['format'] == 'compact':
+        return {
+            'format': 'compact',
+            'dictionary': strategy_dictionary(),
+            **compact_listing(articles),
+            'count': len(articles),
+            'nextCursor': next_cursor
+        }
+    return {
+        'articles': articles,
+        'count': len(articles),
+        # Pass back as ?cursor= for the next page; null when there are no more
+        'nextCursor': next_cursor
+    }
+
+
+def get_latest_page(event, query: Dict) -> Optional[Dict]:
+    """Serve the first page of the default listing from the latest view, or None to query"""
+    view = read_latest_view()
+    if not view or len(view[1]) < query['limit']:
+        return None
+    
+    view_etag, entries = view
+    # One view serves several page sizes and formats; each gets its own ETag
+    etag = f'{view_etag[:-1]}-{query["limit"]}-{query["format"]}"'
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    if etag in [tag.strip().replace('W/', '', 1) for tag in get_header(event, 'If-None-Match').split(',')]:
+        return {'statusCode': 304, 'headers': {'Access-Control-Allow-Origin': '*', **headers}, 'body': ''}
+    
+    articles = entries[:query['limit']]
+    return json_response(200, listing_body(query, articles, cursor_after(query, articles[-1])), headers)
+
+
+def get_articles_by_id(article_ids: List[str], attributes: List[str]) -> List[Dict]:
+    """Fetch the given attributes of articles by ID with BatchGetItem, keeping the given order"""
+    found = {}
+    for start in range(0, len(article_ids), BATCH_GET_CHUNK_SIZE):
+        request_items = {table.name: {
+            'Keys': [serialize({'articleId': article_id}) for article_id in article_ids[start:start + BATCH_GET_CHUNK_SIZE]],
+            **projection(attributes)
+        }}
+        while request_items:
+            response = get_client().batch_get_item(RequestItems=request_items)
+            for item in response.get('Responses', {}).get(table.name, []):
+                item = deserialize(item)
+                found[item['articleId']] = item
+            request_items = response.get('UnprocessedKeys') or {}
+    return [found[article_id] for article_id in article_ids if article_id in found]
+
+
+def parse_list_query(query_params: Dict) -> Dict:
+    """Validate list query parameters into a listing query"""
+    limit = min(max(int(query_params.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+    status = query_params.get('status', 'analyzed')
+    ticker = (query_params.get('ticker') or '').strip().upper() or None
+    sentiment = (query_params.get('sentiment') or '').strip().lower() or None
+    wire_format = (query_params.get('format') or 'json').strip().lower()
+    
+    if ticker and not TICKER_RE.match(ticker):
+        raise ValueError(f"Invalid ticker: {ticker}")
+    if sentiment and sentiment not in SENTIMENTS:
+        raise ValueError(f"Invalid sentiment: {sentiment}")
+    if wire_format not in WIRE_FORMATS:
+        raise ValueError(f"Invalid format: {wire_format}")
+    
+    return {
+        'limit': limit,
+        'statuses': ['analyzed', 'pending_analysis'] if status == 'all' else [status],
+        'ticker': ticker,
+        'sentiment': sentiment,
+        # Unix timestamps (seconds) of ingestion time, inclusive
+        'since': int(query_params['since']) if query_params.get('since') else None,
+        'until': int(query_params['until']) if query_params.get('until') else None,
+        'now': int(time.time()),
+        'attributes': LIST_ATTRIBUTES,
+        'format': wire_format
+    }
+
+
+def get_ticker_signals(ticker: str, query_params: Dict) -> Dict:
+    """Newest-first signals for one ticker, read from the ticker-signal table alone"""
+    try:
+        query = parse_list_query(dict(query_params, ticker=ticker))
+    except ValueError as e:
+        return json_response(400, {'error': str(e)})
+    
+    if not signals_table:
+        return json_response(404, {'error': 'Ticker signals are not configured'})
+    
+    try:
+        items, next_cursor = read_page({'signals': signals_table}, query, query['limit'], query_params.get('cursor'))
+    except InvalidCursorError as e:
+        return json_response(400, {'error': str(e)})
+    
+    signals = []
+    for item in items:
+        signals.append({
+            'articleId': item.get('articleId'),
+            'sentiment': item.get('sentiment', 'neutral'),
+            'reasoning': item.get('reasoning', ''),
+            'title': item.get('title', ''),
+            'url': item.get('url', ''),
+            'publishedAt': item.get('publishedAt', ''),
+            'timestamp': int(item.get('timestamp', 0))
+        })
+    
+    return json_response(200, {
+        'ticker': query['ticker'],
+        'signals': signals,
+        'count': len(signals),
+        'nextCursor': next_cursor
+    })
+
+
+def route_request(event) -> Dict:
+    """Dispatch a REST API request for news or ticker signals"""
     path_parameters = event.get('pathParameters') or {}
     article_id = path_parameters.get('articleId')
     
     try:
+        if path_parameters.get('ticker'):
+            return get_ticker_signals(path_parameters['ticker'], event.get('queryStringParameters') or {})
+        
         if article_id:
             # Get single article
             response = table.get_item(Key={'articleId': article_id})
             
             if 'Item' not in response:
-                return {
-                    'statusCode': 404,
-                    'headers': {
-                        'Content-Type': 'application/json',
-                        'Access-Control-Allow-Origin': '*'
-                    },
-                    'body': json.dumps({'error': 'Article not found'})
-                }
+                return json_response(404, {'error': 'Article not found'})
             
             item = response['Item']
+            migrate_item(table, item)
             article = {
                 'articleId': item.get('articleId'),
                 'title': item.get('title'),
@@ -36,36 +209,42 @@ def handler(event, context):
                 'source': item.get('source', ''),
                 'publishedAt': item.get('publishedAt', ''),
                 'sentiment': item.get('sentiment', 'neutral'),
-                'affectedTickers': json.loads(item.get('tradingStrategies', '{}')) if item.get('tradingStrategies') and isinstance(item.get('tradingStrategies'), str) else (item.get('tradingStrategies') or {}),
-                'analysis': json.loads(item.get('analysis', '{}')) if item.get('analysis') and isinstance(item.get('analysis'), str) else (item.get('analysis') or {})
+                'affectedTickers': map_attribute(item.get('tradingStrategies')),
+                'analysis': map_attribute(item.get('analysis'))
             }
             
-            return {
-                'statusCode': 200,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps(article)
-            }
+            return json_response(200, article)
         else:
-            # Get all articles (latest first)
+            # Get articles newest first, one page at a time
             query_params = event.get('queryStringParameters') or {}
-            limit = int(query_params.get('limit', 50))
-            status = query_params.get('status', 'analyzed')
+            try:
+                query = parse_list_query(query_params)
+            except ValueError as e:
+                return json_response(400, {'error': str(e)})
+            
+            if query['ticker'] and not signals_table:
+                return json_response(404, {'error': 'Ticker signals are not configured'})
             
-            if status == 'all':
-                response = table.scan(Limit=limit)
-            else:
-                response = table.scan(
-                    FilterExpression='#status = :status',
-                    ExpressionAttributeNames={'#status': 'status'},
-                    ExpressionAttributeValues={':status': status},
-                    Limit=limit
+            # The newest analyzed articles come from the latest view in one read
+            if (query['statuses'] == ['analyzed'] and not query['ticker'] and not query['sentiment']
+                    and not query['since'] and not query['until'] and not query_params.get('cursor')):
+                page = get_latest_page(event, query)
+                if page:
+                    return page
+            
+            try:
+                items, next_cursor = read_page(
+                    {'news': table, 'signals': signals_table}, query, query['limit'], query_params.get('cursor')
                 )
+            except InvalidCursorError as e:
+                return json_response(400, {'error': str(e)})
+            
+            # Ticker listings page through signal rows; load their articles
+            if query['ticker']:
+                items = get_articles_by_id([item['articleId'] for item in items], LIST_ATTRIBUTES)
             
             articles = []
-            for item in response.get('Items', []):
+            for item in items:
                 articles.append({
                     'articleId': item.get('articleId'),
                     'title': item.get('title'),
@@ -74,33 +253,20 @@ def handler(event, context):
                     'source': item.get('source', ''),
                     'publishedAt': item.get('publishedAt', ''),
                     'sentiment': item.get('sentiment', 'neutral'),
-                    'affectedTickers': json.loads(item.get('tradingStrategies', '{}')) if item.get('tradingStrategies') and isinstance(item.get('tradingStrategies'), str) else (item.get('tradingStrategies') or {}),
-                    'timestamp': item.get('timestamp', 0)
-                })
-            
-            # Sort by timestamp descending
-            articles.sort(key=lambda x: x.get('timestamp', 0), reverse=True)
-            
-            return {
-                'statusCode': 200,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({
-                    'articles': articles,
-                    'count': len(articles)
+                    'affectedTickers': map_attribute(item.get('tradingStrategies')),
+                    'timestamp': int(item.get('timestamp', 0))
                 })
-            }
             
+            return json_response(200, listing_body(query, articles, next_cursor))
+    
     except Exception as e:
         print(f"Error: {str(e)}")
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({'error': str(e)})
-        }
+        return json_response(500, {'error': str(e)})
 
+
+def handler(event, context):
+    """Handle REST API requests for news and ticker signals"""
+    with timed('request', resource=event.get('resource')) as stage:
+        response = compress_response(event, route_request(event))
+        stage['status'] = response.get('statusCode')
+        return response
@@ -0,0 +1,34 @@
+import gzip
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+from dynamo import Table
+
+# Reader side of the latest-news view that bedrock_analysis maintains: one
+# item holding the newest analyzed articles (listing format, newest first)
+# as gzipped JSON plus an ETag of that content.
+LATEST_NEWS_TABLE_NAME = os.environ.get('LATEST_NEWS_TABLE_NAME', '')
+LATEST_VIEW_ID = 'latest'
+
+latest_table = Table(LATEST_NEWS_TABLE_NAME) if LATEST_NEWS_TABLE_NAME else None
+
+# Last decoded view, reused across invocations while its ETag is unchanged
+_decoded = {'etag': None, 'articles': []}
+
+
+def read_latest_view() -> Optional[Tuple[str, List[Dict]]]:
+    """ETag and entries of the latest view, or None if it is unavailable"""
+    if not latest_table:
+        return None
+    try:
+        item = latest_table.get_item(Key={'viewId': LATEST_VIEW_ID}).get('Item')
+    except Exception as e:
+        print(f"Error reading latest view: {str(e)}")
+        return None
+    if not item:
+        return None
+
+    if item['etag'] != _decoded['etag']:
+        _decoded.update(etag=item['etag'], articles=json.loads(gzip.decompress(item['body'].value)))
+    return item['etag'], _decoded['articles']
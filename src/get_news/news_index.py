@@ -0,0 +1,230 @@
+import base64
+import hashlib
+import heapq
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from article_schema import json_default, projection
+
+# Articles are read through day-bucketed GSIs sorted by timestamp:
+# - StatusDayIndex:    statusDay    = "<status>#<YYYY-MM-DD>"
+# - SentimentDayIndex: sentimentDay = "<sentiment>#<YYYY-MM-DD>" (analyzed only)
+# Ticker queries go to the ticker-signal table (ticker + "<timestamp>#<articleId>"),
+# or its TickerSentimentIndex ("<ticker>#<sentiment>") when a sentiment is given.
+#
+# A listing is a sequence of rounds (one per UTC day walking back from
+# `until`, or a single round for a ticker), each made of one or more
+# partitions that are merged newest-first. The cursor records the round
+# and each partition's LastEvaluatedKey, so paging never skips or repeats
+# items and each page only reads what it returns. It also carries a
+# fingerprint of the listing's filters: a cursor only resumes the listing
+# that produced it, and its positions are checked against that listing's
+# partitions before any of them is used as an ExclusiveStartKey.
+STATUS_DAY_INDEX = 'StatusDayIndex'
+SENTIMENT_DAY_INDEX = 'SentimentDayIndex'
+TICKER_SENTIMENT_INDEX = 'TickerSentimentIndex'
+NEWS_LOOKBACK_DAYS = int(os.environ.get('NEWS_LOOKBACK_DAYS', '30'))
+# Upper bound on day buckets walked when an explicit `since` is given
+MAX_HISTORY_DAYS = 3650
+# Upper bound for `until` when none is given; timestamps are epoch seconds
+FAR_FUTURE = 10 ** 10
+
+
+class InvalidCursorError(ValueError):
+    """A pagination cursor that could not be decoded or doesn't belong to the listing"""
+
+
+def query_fingerprint(query: Dict) -> str:
+    """Short hash of the filters that select a listing's partitions"""
+    scope = [query.get('ticker'), query.get('sentiment'), query.get('statuses'), query.get('since'), query.get('until')]
+    return hashlib.sha256(json.dumps(scope).encode('utf-8')).hexdigest()[:16]
+
+
+def encode_cursor(query: Dict, round_no: int, positions: Dict) -> str:
+    """Opaque, URL-safe cursor for the next page of a listing"""
+    state = {'query': query_fingerprint(query), 'round': round_no, 'positions': positions}
+    raw = json.dumps(state, separators=(',', ':'), default=json_default).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(query: Dict, cursor: Optional[str]) -> Dict:
+    """Decode a cursor from encode_cursor (empty state for the first page)"""
+    if not cursor:
+        return {'round': 0, 'positions': {}}
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        fingerprint, round_no, positions = state['query'], int(state['round']), dict(state['positions'])
+    except Exception as e:
+        raise InvalidCursorError(f"Invalid cursor: {str(e)}")
+    if fingerprint != query_fingerprint(query):
+        raise InvalidCursorError('Invalid cursor: it belongs to a different listing')
+    if round_no < 0:
+        raise InvalidCursorError('Invalid cursor: bad round')
+    return {'round': round_no, 'positions': positions}
+
+
+def status_day(status: str, day) -> str:
+    """StatusDayIndex partition key for a status and a UTC date"""
+    return f"{status}#{day.isoformat()}"
+
+
+def cursor_after(query: Dict, item: Dict) -> str:
+    """Cursor resuming a single-status listing (no ticker/sentiment) right after an item"""
+    last_day = datetime.utcfromtimestamp(min(query.get('until') or FAR_FUTURE, query['now'])).date()
+    day = datetime.utcfromtimestamp(item['timestamp']).date()
+    bucket = status_day(query['statuses'][0], day)
+    position = {'articleId': item['articleId'], 'statusDay': bucket, 'timestamp': item['timestamp']}
+    return encode_cursor(query, (last_day - day).days, {bucket: position})
+
+
+def plan_round(query: Dict, round_no: int) -> Optional[List[Dict]]:
+    """Partitions to merge for one round of a listing, or None past the last round"""
+    since = query.get('since') or 0
+    until = query.get('until') or FAR_FUTURE
+
+    if query.get('ticker'):
+        if round_no > 0:
+            return None
+        ticker = query['ticker']
+        partition = {
+            'table': 'signals',
+            'range': 'signalKey',
+            'low': f"{since:010d}",
+            'high': f"{min(until, FAR_FUTURE - 1):010d}~"
+        }
+        if query.get('sentiment'):
+            partition.update(index=TICKER_SENTIMENT_INDEX, key='tickerSentiment', value=f"{ticker}#{query['sentiment']}")
+        else:
+            partition.update(index=None, key='ticker', value=ticker)
+        return [partition]
+
+    last_day = datetime.utcfromtimestamp(min(until, query['now'])).date()
+    if query.get('since'):
+        first_day = max(datetime.utcfromtimestamp(since).date(), last_day - timedelta(days=MAX_HISTORY_DAYS - 1))
+    else:
+        first_day = last_day - timedelta(days=NEWS_LOOKBACK_DAYS - 1)
+    day = last_day - timedelta(days=round_no)
+    if day < first_day:
+        return None
+
+    if query.get('sentiment'):
+        index, key, prefixes = SENTIMENT_DAY_INDEX, 'sentimentDay', [query['sentiment']]
+    else:
+        index, key, prefixes = STATUS_DAY_INDEX, 'statusDay', query['statuses']
+    return [
+        {'table': 'news', 'index': index, 'key': key, 'value': status_day(prefix, day),
+         'range': 'timestamp', 'low': since, 'high': until, 'attributes': query.get('attributes')}
+        for prefix in prefixes
+    ]
+
+
+def _key_attributes(partition: Dict) -> List[str]:
+    """Table and index key attributes of a partition's items"""
+    table_keys = ['ticker', 'signalKey'] if partition['table'] == 'signals' else ['articleId']
+    return list(dict.fromkeys(table_keys + [partition['key'], partition['range']]))
+
+
+def query_partition(table, partition: Dict, limit: int, start: Optional[Dict]) -> Tuple[List[Dict], bool]:
+    """Newest-first items of a partition after `start`; also whether it is exhausted"""
+    kwargs = {
+        'KeyConditionExpression': '#key = :key AND #range BETWEEN :low AND :high',
+        'ExpressionAttributeNames': {'#key': partition['key'], '#range': partition['range']},
+        'ExpressionAttributeValues': {':key': partition['value'], ':low': partition['low'], ':high': partition['high']},
+        'ScanIndexForward': False
+    }
+    if partition.get('index'):
+        kwargs['IndexName'] = partition['index']
+    if partition.get('attributes'):
+        # Keys are always read so the cursor can resume after any item
+        fields = projection(partition['attributes'] + _key_attributes(partition))
+        kwargs['ProjectionExpression'] = fields['ProjectionExpression']
+        kwargs['ExpressionAttributeNames'].update(fields['ExpressionAttributeNames'])
+    if start:
+        kwargs['ExclusiveStartKey'] = start
+
+    items = []
+    while len(items) < limit:
+        response = table.query(Limit=limit - len(items), **kwargs)
+        items.extend(response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            return items, True
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    return items, False
+
+
+def _position(partition: Dict, item: Dict) -> Dict:
+    """ExclusiveStartKey that resumes a partition right after an item"""
+    return {name: item[name] for name in _key_attributes(partition)}
+
+
+def check_positions(partitions: List[Dict], positions: Dict) -> None:
+    """Reject cursor positions that aren't valid start keys of the round's partitions"""
+    by_value = {partition['value']: partition for partition in partitions}
+    for value, position in positions.items():
+        partition = by_value.get(value)
+        if partition is None:
+            raise InvalidCursorError('Invalid cursor: unknown partition')
+        if position == 'done':
+            continue
+        try:
+            valid = (
+                isinstance(position, dict)
+                and set(position) == set(_key_attributes(partition))
+                and all(isinstance(position[name], str) for name in position if name != 'timestamp')
+                and all(isinstance(position[name], int) for name in position if name == 'timestamp')
+                and position[partition['key']] == value
+                and partition['low'] <= position[partition['range']] <= partition['high']
+            )
+        except TypeError:
+            valid = False
+        if not valid:
+            raise InvalidCursorError('Invalid cursor: bad position')
+
+
+def read_page(tables: Dict, query: Dict, limit: int, cursor: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+    """One newest-first page of a listing and the cursor for the next page (None at the end)"""
+    state = decode_cursor(query, cursor)
+    round_no, positions = state['round'], state['positions']
+    partitions = plan_round(query, round_no)
+    if partitions is not None:
+        check_positions(partitions, positions)
+    items = []
+
+    while len(items) < limit:
+        partitions = plan_round(query, round_no)
+        if partitions is None:
+            return items, None
+
+        need = limit - len(items)
+        fetched = {}
+        for partition in partitions:
+            position = positions.get(partition['value'])
+            if position == 'done':
+                continue
+            fetched[partition['value']] = query_partition(tables[partition['table']], partition, need, position)
+
+        # Merge by timestamp, keeping each partition's own order for ties
+        streams = [[(item, value) for item in result[0]] for value, result in fetched.items()]
+        merged = list(heapq.merge(*streams, key=lambda pair: pair[0]['timestamp'], reverse=True))[:need]
+
+        taken = {}
+        for item, value in merged:
+            taken[value] = taken.get(value, 0) + 1
+            items.append(item)
+
+        by_value = {partition['value']: partition for partition in partitions}
+        for value, (partition_items, exhausted) in fetched.items():
+            count = taken.get(value, 0)
+            if exhausted and count == len(partition_items):
+                positions[value] = 'done'
+            elif count:
+                positions[value] = _position(by_value[value], partition_items[count - 1])
+
+        if all(positions.get(partition['value']) == 'done' for partition in partitions):
+            round_no, positions = round_no + 1, {}
+
+    if plan_round(query, round_no) is None:
+        return items, None
+    return items, encode_cursor(query, round_no, positions)
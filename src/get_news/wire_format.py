@@ -0,0 +1,119 @@
+import base64
+import gzip
+import json
+import zlib
+from typing import Dict, List, Optional
+
+# Compact wire format, negotiated per WebSocket connection (set_format action)
+# or per REST request (?format=compact):
+# - Strategy names become indexes into STRATEGIES, which clients receive once
+#   as a dictionary; a ticker whose strategies are the default list for its
+#   sentiment carries no strategies at all.
+# - Article lists are sent column-wise ("fields" + "rows"), each row's
+#   timestamp encoded as the difference from the previous (newer) row.
+# - Payloads above COMPRESSION_THRESHOLD_BYTES are gzip/deflate compressed
+#   and base64-encoded in an {"type", "encoding", "data"} envelope for
+#   clients that accept it.
+WIRE_FORMATS = {'json', 'compact'}
+COMPRESSIONS = ['gzip', 'deflate']  # In order of preference
+COMPRESSION_THRESHOLD_BYTES = 8192
+# Bump when STRATEGIES changes so clients drop a cached dictionary
+DICTIONARY_VERSION = 1
+
+STRATEGIES_BY_SENTIMENT = {
+    'bullish': [
+        'long call',
+        'short put',
+        'short put credit spread',
+        'long call debit spread',
+        'bull call spread',
+        'covered call (if holding stock)'
+    ],
+    'bearish': [
+        'long put',
+        'short call',
+        'short call credit spread',
+        'long put debit spread',
+        'bear put spread',
+        'protective put (if holding stock)'
+    ],
+    'neutral': [
+        'iron condor',
+        'butterfly spread',
+        'calendar spread',
+        'straddle/strangle (if expecting volatility)'
+    ]
+}
+STRATEGIES = [name for names in STRATEGIES_BY_SENTIMENT.values() for name in names]
+STRATEGY_IDS = {name: index for index, name in enumerate(STRATEGIES)}
+
+LISTING_FIELDS = ['articleId', 'title', 'description', 'url', 'source', 'publishedAt', 'sentiment', 'affectedTickers', 'seq', 'timestamp']
+
+
+def strategy_dictionary() -> Dict:
+    """Strategy names and per-sentiment defaults, sent once per connection"""
+    return {
+        'version': DICTIONARY_VERSION,
+        'strategies': STRATEGIES,
+        'defaults': {
+            sentiment: [STRATEGY_IDS[name] for name in names]
+            for sentiment, names in STRATEGIES_BY_SENTIMENT.items()
+        }
+    }
+
+
+def compact_tickers(affected_tickers: Dict) -> Dict:
+    """affectedTickers with strategy names replaced by dictionary IDs (or omitted)"""
+    compact = {}
+    for ticker, info in (affected_tickers or {}).items():
+        entry = {key: value for key, value in info.items() if key != 'strategies'}
+        strategies = list(info.get('strategies') or [])
+        if strategies != STRATEGIES_BY_SENTIMENT.get(str(info.get('sentiment', '')).lower()):
+            entry['strategies'] = [STRATEGY_IDS.get(name, name) for name in strategies]
+        compact[ticker] = entry
+    return compact
+
+
+def compact_message(message: Dict) -> Dict:
+    """Compact form of a single-article message (news_update, analysis_partial)"""
+    if not message.get('affectedTickers'):
+        return message
+    return {**message, 'affectedTickers': compact_tickers(message['affectedTickers'])}
+
+
+def compact_listing(articles: List[Dict]) -> Dict:
+    """Column-wise form of a newest-first article list"""
+    rows = []
+    previous = None
+    for article in articles:
+        timestamp = int(article.get('timestamp') or 0)
+        values = {
+            **article,
+            'affectedTickers': compact_tickers(article.get('affectedTickers')),
+            'timestamp': timestamp if previous is None else previous - timestamp
+        }
+        rows.append([values.get(field) for field in LISTING_FIELDS])
+        previous = timestamp
+    return {'fields': LISTING_FIELDS, 'rows': rows}
+
+
+def negotiate_compression(accepted) -> Optional[str]:
+    """Preferred compression among those a client accepts (a name or a list)"""
+    if isinstance(accepted, str):
+        accepted = [accepted]
+    accepted = {str(name).strip().lower() for name in accepted or []}
+    return next((name for name in COMPRESSIONS if name in accepted), None)
+
+
+def encode(message: Dict, compression: Optional[str] = None, default=None) -> bytes:
+    """Serialize a message, compressing it into an envelope when large and accepted"""
+    data = json.dumps(message, separators=(',', ':'), default=default).encode('utf-8')
+    if compression not in COMPRESSIONS or len(data) <= COMPRESSION_THRESHOLD_BYTES:
+        return data
+
+    packed = gzip.compress(data, mtime=0) if compression == 'gzip' else zlib.compress(data)
+    return json.dumps({
+        'type': message.get('type'),
+        'encoding': compression,
+        'data': base64.b64encode(packed).decode('ascii')
+    }, separators=(',', ':')).encode('utf-8')
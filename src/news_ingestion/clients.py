@@ -0,0 +1,56 @@
+import threading
+import boto3
+from typing import Dict
+
+# AWS clients and DynamoDB table resources are built on first use instead of
+# at import time. Loading a service model costs tens of milliseconds per
+# client, and cold starts that never touch a service (for example stream
+# batches with no new articles) shouldn't pay for it. One DynamoDB resource
+# is shared by every table in the function. Creation is serialized because
+# the default boto3 session is not safe to use from several threads at once.
+_clients: Dict[str, object] = {}
+_dynamodb_resource = None
+_lock = threading.Lock()
+
+
+def get_client(service: str, **kwargs):
+    """Client for a service, created once per warm Lambda"""
+    if service not in _clients:
+        with _lock:
+            if service not in _clients:
+                _clients[service] = boto3.client(service, **kwargs)
+    return _clients[service]
+
+
+def get_dynamodb_resource():
+    """The DynamoDB service resource, created once per warm Lambda"""
+    global _dynamodb_resource
+    if _dynamodb_resource is None:
+        with _lock:
+            if _dynamodb_resource is None:
+                _dynamodb_resource = boto3.resource('dynamodb')
+    return _dynamodb_resource
+
+
+class LazyClient:
+    """Stand-in for a boto3 client that creates it on first use"""
+
+    def __init__(self, service: str, **kwargs):
+        self._service = service
+        self._kwargs = kwargs
+
+    def __getattr__(self, attr):
+        return getattr(get_client(self._service, **self._kwargs), attr)
+
+
+class LazyTable:
+    """Stand-in for a DynamoDB Table resource that creates it on first use"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._table = None
+
+    def __getattr__(self, attr):
+        if self._table is None:
+            self._table = get_dynamodb_resource().Table(self.name)
+        return getattr(self._table, attr)
@@ -0,0 +1,191 @@
+import hashlib
+import os
+import re
+import time
+import unicodedata
+from typing import Dict, List, Optional
+
+from clients import LazyTable
+
+# SimHash fingerprints are 64 bits; two articles whose fingerprints differ in
+# at most DEDUP_MAX_DISTANCE bits are treated as the same story. Splitting the
+# fingerprint into DEDUP_MAX_DISTANCE + 1 bands guarantees (pigeonhole) that
+# any such pair shares at least one band exactly, so candidates can be found
+# with key lookups instead of a scan.
+FINGERPRINT_BITS = 64
+DEDUP_MAX_DISTANCE = int(os.environ.get('DEDUP_MAX_DISTANCE', '5'))
+DEDUP_WINDOW_SECONDS = int(float(os.environ.get('DEDUP_WINDOW_HOURS', '48')) * 3600)
+DEDUP_TABLE_NAME = os.environ.get('DEDUP_TABLE_NAME', '')
+
+BAND_COUNT = DEDUP_MAX_DISTANCE + 1
+BAND_BITS = FINGERPRINT_BITS // BAND_COUNT
+
+# BatchGetItem accepts at most 100 keys per request
+BATCH_GET_CHUNK_SIZE = 100
+BATCH_MAX_ATTEMPTS = 5
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'have',
+    'in', 'is', 'it', 'its', 'of', 'on', 'or', 'that', 'the', 'to', 'was', 'were',
+    'will', 'with'
+}
+
+# NewsAPI appends the publisher to titles ("... - Reuters"), which would make
+# the same wire story look different across outlets
+SOURCE_SUFFIX_RE = re.compile(r'\s+[-|–—]\s+[^-|–—]{1,40}$')
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+dedup_table = LazyTable(DEDUP_TABLE_NAME) if DEDUP_TABLE_NAME else None
+
+
+def normalize_tokens(text: str) -> List[str]:
+    """Lowercase, strip accents/punctuation and drop stopwords"""
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode('ascii').lower()
+    return [token for token in TOKEN_RE.findall(text) if token not in STOPWORDS]
+
+
+def _feature_hash(feature: str) -> int:
+    """Stable 64-bit hash of a feature (Python's hash() is salted per process)"""
+    return int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def compute_fingerprint(article: Dict) -> int:
+    """Compute a 64-bit SimHash over the normalized title and body"""
+    title = SOURCE_SUFFIX_RE.sub('', (article.get('title') or '').strip())
+    title_tokens = normalize_tokens(title)
+    body_tokens = normalize_tokens(article.get('description') or article.get('content') or '')[:40]
+
+    # Title words and bigrams carry most of the identity of a headline
+    weights = {}
+    for token in title_tokens:
+        weights[token] = weights.get(token, 0) + 4
+    for first, second in zip(title_tokens, title_tokens[1:]):
+        bigram = f"{first} {second}"
+        weights[bigram] = weights.get(bigram, 0) + 3
+    for token in body_tokens:
+        weights[token] = weights.get(token, 0) + 1
+
+    vector = [0] * FINGERPRINT_BITS
+    for feature, weight in weights.items():
+        feature_hash = _feature_hash(feature)
+        for bit in range(FINGERPRINT_BITS):
+            if feature_hash >> bit & 1:
+                vector[bit] += weight
+            else:
+                vector[bit] -= weight
+
+    fingerprint = 0
+    for bit, score in enumerate(vector):
+        if score > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def band_keys(fingerprint: int) -> List[str]:
+    """Split a fingerprint into band bucket keys"""
+    mask = (1 << BAND_BITS) - 1
+    return [f"{band}:{(fingerprint >> (band * BAND_BITS)) & mask:x}" for band in range(BAND_COUNT)]
+
+
+def hamming_distance(first: int, second: int) -> int:
+    """Number of differing bits between two fingerprints"""
+    return bin(first ^ second).count('1')
+
+
+def load_buckets(keys: List[str]) -> Dict[str, Dict[str, int]]:
+    """Load band buckets (fingerprint -> expiry) from the dedup table"""
+    buckets = {}
+    if not dedup_table or not keys:
+        return buckets
+
+    now = int(time.time())
+    dynamodb = dedup_table.meta.client
+    for start in range(0, len(keys), BATCH_GET_CHUNK_SIZE):
+        request_items = {
+            dedup_table.name: {'Keys': [{'bucket': {'S': key}} for key in keys[start:start + BATCH_GET_CHUNK_SIZE]]}
+        }
+        for attempt in range(BATCH_MAX_ATTEMPTS):
+            response = dynamodb.batch_get_item(RequestItems=request_items)
+            for item in response.get('Responses', {}).get(dedup_table.name, []):
+                entries = item.get('entries', {}).get('M', {})
+                # TTL deletion is lazy, so expired entries are dropped on read
+                buckets[item['bucket']['S']] = {
+                    fingerprint: int(expiry['N'])
+                    for fingerprint, expiry in entries.items()
+                    if int(expiry['N']) > now
+                }
+            request_items = response.get('UnprocessedKeys') or {}
+            if not request_items:
+                break
+            # Back off before retrying throttled keys
+            time.sleep(min(0.05 * (2 ** attempt), 1.0))
+        else:
+            # Unread buckets count as empty, so a near-duplicate may slip through
+            print(f"Warning: {len(request_items[dedup_table.name]['Keys'])} dedup buckets unread after retries")
+
+    return buckets
+
+
+def filter_near_duplicates(articles: List[Dict]) -> List[Dict]:
+    """Drop articles that near-duplicate each other or anything seen in the recent window"""
+    for article in articles:
+        article['fingerprint'] = compute_fingerprint(article)
+
+    keys = sorted({key for article in articles for key in band_keys(article['fingerprint'])})
+    try:
+        buckets = load_buckets(keys)
+    except Exception as e:
+        # Fall back to in-run dedup only; the articleId check still applies
+        print(f"Warning: Could not load dedup index: {str(e)}")
+        buckets = {}
+
+    unique_articles = []
+    for article in articles:
+        if not (article.get('title') or '').strip():
+            continue
+
+        fingerprint = article['fingerprint']
+        keys = band_keys(fingerprint)
+        candidates = {int(candidate, 16) for key in keys for candidate in buckets.get(key, {})}
+        duplicate_of = next((c for c in candidates if hamming_distance(fingerprint, c) <= DEDUP_MAX_DISTANCE), None)
+        if duplicate_of is not None:
+            print(f"Dropping near-duplicate: {article.get('title', '')[:50]}")
+            continue
+
+        # Index it locally so later articles in this run are compared against it
+        for key in keys:
+            buckets.setdefault(key, {})[f"{fingerprint:x}"] = 0
+        unique_articles.append(article)
+
+    return unique_articles
+
+
+def record_fingerprints(articles: List[Dict]) -> None:
+    """Add fingerprints of saved articles to the persistent recent-window index"""
+    if not dedup_table or not articles:
+        return
+
+    now = int(time.time())
+    expiry = now + DEDUP_WINDOW_SECONDS
+    additions = {}
+    for article in articles:
+        fingerprint: Optional[int] = article.get('fingerprint')
+        if fingerprint is None:
+            continue
+        for key in band_keys(fingerprint):
+            additions.setdefault(key, {})[f"{fingerprint:x}"] = expiry
+
+    try:
+        # Merge with the current buckets so each bucket stays a single compact item
+        buckets = load_buckets(sorted(additions))
+        with dedup_table.batch_writer() as batch:
+            for key, entries in additions.items():
+                merged = buckets.get(key, {})
+                merged.update(entries)
+                batch.put_item(Item={
+                    'bucket': key,
+                    'entries': merged,
+                    'ttl': max(merged.values())
+                })
+    except Exception as e:
+        print(f"Warning: Could not update dedup index: {str(e)}")
@@ -1,220 +1,306 @@
 import json
-import boto3
 import uuid
 import time
 import os
-import requests
+from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from datetime import datetime
-from typing import List, Dict, Optional
+from functools import partial
+from typing import Callable, List, Dict, Optional, Set, Tuple
 
-dynamodb = boto3.resource('dynamodb')
-ssm = boto3.client('ssm')
-table = dynamodb.Table(os.environ['TABLE_NAME'])
+from clients import LazyClient, LazyTable, get_dynamodb_resource
+from dedup import filter_near_duplicates, record_fingerprints
+from metrics import emit_timing, now_ms, published_ms, timed
+from scheduler import is_due, plan_next_poll
+from source_state import load_source_cursors, save_source_cursors
+from sources import NEWS_SOURCES, fetch_source
+
+# Clients and tables are created on first use (see clients.py)
+ssm = LazyClient('ssm')
+table = LazyTable(os.environ['TABLE_NAME'])
+
+# API keys read from SSM are cached per warm Lambda, so scheduled runs only
+# call SSM once per TTL; a rotated key is picked up after at most the TTL
+SSM_CACHE_TTL_SECONDS = int(os.environ.get('SSM_CACHE_TTL_SECONDS', '300'))
+_parameter_cache: Dict[str, Tuple[float, str]] = {}
+
+# Fallback per-source deadline when a source doesn't define its own
+FETCH_DEADLINE_SECONDS = float(os.environ.get('FETCH_DEADLINE_SECONDS', '10'))
+
+# BatchGetItem accepts at most 100 keys per request
+BATCH_GET_CHUNK_SIZE = 100
+BATCH_MAX_ATTEMPTS = 5
+# New articles are written with conditional puts, this many at a time
+WRITE_CONCURRENCY = 8
+
+# Article item schema: analysis and tradingStrategies are native maps
+SCHEMA_VERSION = 2
 
 def get_api_key(param_name: str, env_var: str = None) -> str:
     """Get API key from SSM parameter or environment variable"""
     if env_var and os.environ.get(env_var):
         return os.environ[env_var]
     
+    cached = _parameter_cache.get(param_name)
+    if cached and cached[0] > time.time():
+        return cached[1]
+    
     try:
         response = ssm.get_parameter(Name=param_name, WithDecryption=True)
-        return response['Parameter']['Value']
+        value = response['Parameter']['Value']
     except ssm.exceptions.ParameterNotFound:
-        return ''
-
-# Free news API sources
-NEWS_SOURCES = {
-    'newsapi': {
-        'url': 'https://newsapi.org/v2/top-headlines',
-        'params': {
-            'category': 'business',
-            'language': 'en',
-            'pageSize': 20
-        },
-        'api_key_env': 'NEWS_API_KEY'
-    },
-    'alphavantage': {
-        'url': 'https://www.alphavantage.co/query',
-        'params': {
-            'function': 'NEWS_SENTIMENT',
-            'topics': 'financial_markets,earnings,ipo,mergers_and_acquisitions',
-            'limit': 20
-        },
-        'api_key_env': 'ALPHAVANTAGE_API_KEY'
-    }
-}
+        value = ''
+    _parameter_cache[param_name] = (time.time() + SSM_CACHE_TTL_SECONDS, value)
+    return value
 
 
-def fetch_newsapi_articles(api_key: str) -> List[Dict]:
-    """Fetch articles from NewsAPI.org"""
+def _timed_fetch(fetcher: Callable[[], List[Dict]]) -> Tuple[List[Dict], int, Optional[str]]:
+    """Run a fetcher and return its articles, elapsed milliseconds and error (if any)"""
+    started = time.monotonic()
     try:
-        url = NEWS_SOURCES['newsapi']['url']
-        params = NEWS_SOURCES['newsapi']['params'].copy()
-        params['apiKey'] = api_key
-        
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        articles = []
-        
-        for article in data.get('articles', []):
-            if article.get('title') and article.get('description'):
-                articles.append({
-                    'title': article.get('title', ''),
-                    'description': article.get('description', ''),
-                    'content': article.get('content', article.get('description', '')),
-                    'url': article.get('url', ''),
-                    'source': article.get('source', {}).get('name', 'NewsAPI'),
-                    'publishedAt': article.get('publishedAt', datetime.utcnow().isoformat())
-                })
-        
-        return articles
+        articles, error = fetcher(), None
     except Exception as e:
-        print(f"Error fetching from NewsAPI: {str(e)}")
-        return []
+        articles, error = [], str(e)
+    return articles, int((time.monotonic() - started) * 1000), error
 
 
-def fetch_alphavantage_articles(api_key: str) -> List[Dict]:
-    """Fetch articles from Alpha Vantage"""
+def fetch_all_sources(fetchers: Dict[str, Callable[[], List[Dict]]]) -> Tuple[Dict[str, List[Dict]], Dict[str, Dict]]:
+    """Run source fetchers concurrently, each bounded by its own deadline; articles are grouped by source"""
+    articles_by_source = {}
+    source_stats = {}
+    if not fetchers:
+        return articles_by_source, source_stats
+    
+    executor = ThreadPoolExecutor(max_workers=len(fetchers))
+    started = time.monotonic()
+    futures = {name: executor.submit(_timed_fetch, fetcher) for name, fetcher in fetchers.items()}
+    
     try:
-        url = NEWS_SOURCES['alphavantage']['url']
-        params = NEWS_SOURCES['alphavantage']['params'].copy()
-        params['apikey'] = api_key
-        
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        articles = []
-        
-        feed = data.get('feed', [])
-        for item in feed:
-            articles.append({
-                'title': item.get('title', ''),
-                'description': item.get('summary', ''),
-                'content': item.get('summary', ''),
-                'url': item.get('url', ''),
-                'source': item.get('source', 'AlphaVantage'),
-                'publishedAt': item.get('time_published', datetime.utcnow().isoformat()),
-                'tickers': item.get('ticker_sentiment', [])  # Already has ticker info
-            })
+        for name, future in futures.items():
+            deadline = started + NEWS_SOURCES.get(name, {}).get('deadline', FETCH_DEADLINE_SECONDS)
+            try:
+                articles, latency_ms, error = future.result(timeout=max(0.0, deadline - time.monotonic()))
+                status = 'error' if error else 'ok'
+                if error:
+                    print(f"Error fetching {name} articles: {error}")
+            except FuturesTimeoutError:
+                articles, latency_ms, status = [], int((time.monotonic() - started) * 1000), 'timeout'
+                print(f"Source {name} missed its deadline, skipping")
+            
+            articles_by_source[name] = articles
+            source_stats[name] = {
+                'status': status,
+                'articles': len(articles),
+                'latency_ms': latency_ms
+            }
+    finally:
+        # Don't let a stuck provider hold the invocation open past its deadline
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    return articles_by_source, source_stats
+
+
+def generate_article_id(article: Dict) -> str:
+    """Generate article ID from title hash or URL"""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, article.get('url', article.get('title', str(uuid.uuid4())))))
+
+
+def status_day(status: str, timestamp: int) -> str:
+    """StatusDayIndex partition key: status plus the UTC day of the timestamp"""
+    return f"{status}#{datetime.utcfromtimestamp(timestamp).strftime('%Y-%m-%d')}"
+
+
+def build_article_item(article: Dict) -> Dict:
+    """Build the DynamoDB item for a fetched article"""
+    now = int(time.time())
+    return {
+        'articleId': generate_article_id(article),
+        'title': article.get('title', 'No title'),
+        'description': article.get('description', ''),
+        'content': article.get('content', article.get('description', '')),
+        'url': article.get('url', ''),
+        'source': article.get('source', 'Unknown'),
+        'publishedAt': article.get('publishedAt', datetime.utcnow().isoformat()),
+        'timestamp': now,
+        'status': 'pending_analysis',
+        'statusDay': status_day('pending_analysis', now),
+        'tickers': article.get('tickers', []),  # Pre-populated if available
+        'sentiment': None,
+        'analysis': None,
+        'tradingStrategies': None,
+        'schemaVersion': SCHEMA_VERSION,
+        # Follows the article into the analysis and its news_update message
+        'traceId': uuid.uuid4().hex,
+        'ingestedAtMs': now_ms()
+    }
+
+
+def find_existing_ids(article_ids: List[str]) -> Set[str]:
+    """Return the subset of article IDs already stored, using BatchGetItem"""
+    existing = set()
+    
+    for start in range(0, len(article_ids), BATCH_GET_CHUNK_SIZE):
+        request_items = {
+            table.name: {
+                'Keys': [{'articleId': article_id} for article_id in article_ids[start:start + BATCH_GET_CHUNK_SIZE]],
+                'ProjectionExpression': 'articleId'
+            }
+        }
         
-        return articles
-    except Exception as e:
-        print(f"Error fetching from AlphaVantage: {str(e)}")
-        return []
+        for attempt in range(BATCH_MAX_ATTEMPTS):
+            response = get_dynamodb_resource().batch_get_item(RequestItems=request_items)
+            for item in response.get('Responses', {}).get(table.name, []):
+                existing.add(item['articleId'])
+            
+            request_items = response.get('UnprocessedKeys') or {}
+            if not request_items:
+                break
+            # Back off before retrying throttled keys
+            time.sleep(min(0.05 * (2 ** attempt), 1.0))
+        else:
+            print(f"Warning: {len(request_items[table.name]['Keys'])} keys unchecked after retries")
+    
+    return existing
 
 
-def fetch_finlight_articles() -> List[Dict]:
-    """Fetch articles from Finlight (free tier, no API key needed for basic)"""
+def put_new_article(item: Dict) -> bool:
+    """Write an article unless it is already stored; False if it was"""
     try:
-        # Using a free RSS feed or scraping approach
-        # For now, using a mock structure - user can configure actual endpoint
-        url = 'https://www.finlight.me/api/v1/news'
-        
-        response = requests.get(url, timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            return data.get('articles', [])
-        return []
+        # Conditional, so an overlapping run can't reset an analyzed article to pending_analysis
+        table.put_item(Item=item, ConditionExpression='attribute_not_exists(articleId)')
+        return True
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') == 'ConditionalCheckFailedException':
+            return False
+        raise
+
+
+def save_articles(articles: List[Dict]) -> Tuple[List[str], List[str]]:
+    """Save articles to DynamoDB, skipping ones that already exist; returns the IDs written and the IDs that failed"""
+    items = {}
+    for article in articles:
+        item = build_article_item(article)
+        items.setdefault(item['articleId'], item)
+    
+    if not items:
+        return [], []
+    
+    try:
+        existing = find_existing_ids(list(items))
     except Exception as e:
-        print(f"Error fetching from Finlight: {str(e)}")
-        return []
+        # If the existence check fails, log but continue (might be permissions issue)
+        print(f"Warning: Could not check existing articles: {str(e)}")
+        existing = set()
+    
+    new_items = [item for article_id, item in items.items() if article_id not in existing]
+    if existing:
+        print(f"Skipping {len(existing)} articles that already exist")
+    
+    # BatchWriteItem can't be conditional; the existence check above keeps the
+    # puts down to articles that are new, and those are written concurrently
+    saved_items = []
+    failed_ids = []
+    if new_items:
+        with ThreadPoolExecutor(max_workers=min(WRITE_CONCURRENCY, len(new_items))) as executor:
+            futures = [(item, executor.submit(put_new_article, item)) for item in new_items]
+            for item, future in futures:
+                try:
+                    if future.result():
+                        saved_items.append(item)
+                    else:
+                        print(f"Skipping article that already exists: {item['articleId']}")
+                except Exception as e:
+                    print(f"Error saving article {item['articleId']}: {str(e)}")
+                    failed_ids.append(item['articleId'])
+    new_items = saved_items
+    
+    for item in new_items:
+        print(f"Saved article: {item['articleId']} - {item['title'][:50]}")
+    
+    # Polling delay: provider publish time to the article being stored
+    lags = {}
+    for item in new_items:
+        published = published_ms(item['publishedAt'])
+        if published is not None:
+            lags[item['traceId']] = item['ingestedAtMs'] - published
+    if lags:
+        emit_timing('poll_lag', list(lags.values()), traceIds=list(lags))
+    
+    return [item['articleId'] for item in new_items], failed_ids
 
 
 def save_article(article: Dict) -> Optional[str]:
     """Save article to DynamoDB if it doesn't exist"""
-    try:
-        # Generate article ID from title hash or URL
-        article_id = str(uuid.uuid5(uuid.NAMESPACE_URL, article.get('url', article.get('title', str(uuid.uuid4())))))
-        timestamp = int(time.time())
-        
-        # Check if article already exists
-        try:
-            existing = table.get_item(Key={'articleId': article_id})
-            if 'Item' in existing:
-                print(f"Article already exists: {article_id}")
-                return None
-        except Exception as e:
-            # If get_item fails, log but continue (might be permissions issue)
-            print(f"Warning: Could not check existing article: {str(e)}")
-        
-        # Save new article
-        item = {
-            'articleId': article_id,
-            'title': article.get('title', 'No title'),
-            'description': article.get('description', ''),
-            'content': article.get('content', article.get('description', '')),
-            'url': article.get('url', ''),
-            'source': article.get('source', 'Unknown'),
-            'publishedAt': article.get('publishedAt', datetime.utcnow().isoformat()),
-            'timestamp': timestamp,
-            'status': 'pending_analysis',
-            'tickers': article.get('tickers', []),  # Pre-populated if available
-            'sentiment': None,
-            'analysis': None,
-            'tradingStrategies': None
-        }
-        
-        table.put_item(Item=item)
-        title_preview = article.get('title', 'No title')[:50]
-        print(f"Saved article: {article_id} - {title_preview}")
-        return article_id
-        
-    except Exception as e:
-        print(f"Error saving article: {str(e)}")
-        return None
+    saved, _ = save_articles([article])
+    return saved[0] if saved else None
 
 
 def handler(event, context):
     """Main Lambda handler"""
-    articles_fetched = 0
-    articles_saved = 0
+    started = time.monotonic()
+    now = int(time.time())
+    # A manual POST /ingest polls every source; scheduled ticks only poll due ones
+    force = 'httpMethod' in event if isinstance(event, dict) else False
+    
+    # Cursors are loaded once and each fetcher updates only its own
+    cursors = load_source_cursors(list(NEWS_SOURCES))
+    # Pre-fetch copies: a failed fetch keeps only its backoff schedule
+    previous_cursors = {name: dict(cursor) for name, cursor in cursors.items()}
     
-    # Fetch from multiple sources
-    news_api_key = get_api_key('/financial-news/news-api-key', 'NEWS_API_KEY')
-    alphavantage_key = get_api_key('/financial-news/alphavantage-api-key', 'ALPHAVANTAGE_API_KEY')
+    fetchers = {}
+    for name, source in NEWS_SOURCES.items():
+        if not force and not is_due(cursors[name], now):
+            continue
+        
+        api_key = ''
+        if source['api_key_query']:
+            api_key = get_api_key(source['api_key_param'], source['api_key_env'])
+            if not api_key:
+                continue
+        fetchers[name] = partial(fetch_source, name, api_key, cursors[name])
     
-    all_articles = []
+    # Fetch all sources concurrently; wall-clock is bounded by the slowest source
+    fetch_started = time.monotonic()
+    articles_by_source, source_stats = fetch_all_sources(fetchers)
+    all_articles = [article for articles in articles_by_source.values() for article in articles]
+    fetch_ms = int((time.monotonic() - fetch_started) * 1000)
+    articles_fetched = len(all_articles)
+    for name, stats in source_stats.items():
+        emit_timing('fetch', stats['latency_ms'], source=name, status=stats['status'], articles=stats['articles'])
+        stats['unchanged'] = cursors[name].get('unchanged', False)
+        stats['throttled'] = cursors[name].get('throttled', False)
+        if stats['status'] == 'ok':
+            stats['next_poll_in'] = plan_next_poll(NEWS_SOURCES[name], cursors[name], now)
+        else:
+            # A timed-out fetcher may still be writing to its cursor, so the copy is used
+            cursors[name] = previous_cursors[name]
+            stats['next_poll_in'] = plan_next_poll(NEWS_SOURCES[name], cursors[name], now, failed=True)
     
-    # Try NewsAPI
-    if news_api_key:
-        articles = fetch_newsapi_articles(news_api_key)
-        all_articles.extend(articles)
-        articles_fetched += len(articles)
+    # Remove near-duplicates within this run and against the recent-window index
+    with timed('dedupe', articles=articles_fetched) as stage:
+        unique_articles = filter_near_duplicates(all_articles)
+        stage['unique'] = len(unique_articles)
     
-    # Try Alpha Vantage
-    if alphavantage_key:
-        articles = fetch_alphavantage_articles(alphavantage_key)
-        all_articles.extend(articles)
-        articles_fetched += len(articles)
+    # Save articles in batches
+    with timed('write', articles=len(unique_articles)) as stage:
+        saved_ids, failed_ids = save_articles(unique_articles)
+        stage['saved'] = len(saved_ids)
+    articles_saved = len(saved_ids)
     
-    # Try Finlight (if configured)
-    try:
-        articles = fetch_finlight_articles()
-        all_articles.extend(articles)
-        articles_fetched += len(articles)
-    except Exception as e:
-        print(f"Error fetching Finlight articles: {str(e)}")
-        # Continue with other sources
-    
-    # Remove duplicates based on title similarity
-    seen_titles = set()
-    unique_articles = []
-    for article in all_articles:
-        title = article.get('title', '').strip()
-        if title:
-            title_lower = title.lower()
-            if title_lower not in seen_titles:
-                seen_titles.add(title_lower)
-                unique_articles.append(article)
-    
-    # Save articles
-    for article in unique_articles:
-        article_id = save_article(article)
-        if article_id:
-            articles_saved += 1
+    # Only index what was actually stored so a failed write can be retried next run
+    saved = set(saved_ids)
+    record_fingerprints([article for article in unique_articles if generate_article_id(article) in saved])
+    # A cursor moved past articles that failed to save would skip them for good
+    # (unchanged payload, or older than last_published), so it isn't persisted
+    failed = set(failed_ids)
+    for name, articles in articles_by_source.items():
+        stats = source_stats[name]
+        # Failed fetches saved nothing and only persist their backoff
+        stats['cursor_saved'] = stats['status'] != 'ok' or not any(generate_article_id(article) in failed for article in articles)
+        if not stats['cursor_saved']:
+            print(f"Not advancing the {name} cursor: some of its articles failed to save")
+    save_source_cursors({name: cursors[name] for name in fetchers if source_stats[name].get('cursor_saved')})
+    emit_timing('ingest', (time.monotonic() - started) * 1000, sources=len(fetchers), saved=articles_saved)
     
     return {
         'statusCode': 200,
@@ -222,7 +308,10 @@ def handler(event, context):
             'message': 'News ingestion completed',
             'articles_fetched': articles_fetched,
             'articles_saved': articles_saved,
-            'unique_articles': len(unique_articles)
+            'saved_ids': saved_ids,
+            'unique_articles': len(unique_articles),
+            'fetch_ms': fetch_ms,
+            'sources': source_stats
         })
     }
 
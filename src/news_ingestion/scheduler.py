@@ -0,0 +1,76 @@
+import os
+from decimal import Decimal
+from typing import Dict
+
+# The Lambda is triggered every POLL_TICK_SECONDS; each source is only polled
+# on ticks where it is due, so busy feeds can be polled every tick while quiet
+# or throttled ones are left alone for much longer.
+POLL_TICK_SECONDS = int(os.environ.get('POLL_TICK_SECONDS', '60'))
+
+SCHEDULE_DEFAULTS = {
+    'min_interval': 60,
+    'max_interval': 1800,
+    # Aim to pick up about this many new articles per poll
+    'target_new_per_poll': 3
+}
+
+# Weight of the latest observation in the publish-rate moving average
+RATE_SMOOTHING = 0.3
+
+
+def is_due(cursor: Dict, now: int) -> bool:
+    """Whether a source should be polled on this tick"""
+    # Allow half a tick of slack so a source isn't pushed back a whole tick
+    # just because the scheduler fired a few seconds early
+    return int(cursor.get('next_poll_at', 0)) - now <= POLL_TICK_SECONDS // 2
+
+
+def plan_next_poll(source: Dict, cursor: Dict, now: int, failed: bool = False) -> int:
+    """Set a source's next poll time from its publish rate and rate-limit signals
+
+    A failed poll (error or timeout) doubles the previous interval, up to
+    max_interval, so a broken or unreachable provider isn't hit every tick.
+    """
+    schedule = {**SCHEDULE_DEFAULTS, **source.get('schedule', {})}
+    min_interval = schedule['min_interval']
+    max_interval = schedule['max_interval']
+    previous_interval = int(cursor.get('poll_interval', min_interval))
+
+    # Never poll faster than the quota allows
+    floor = min_interval
+    if schedule.get('daily_quota'):
+        floor = max(floor, 86400 / schedule['daily_quota'])
+    if cursor.get('rate_limit_remaining') is not None and cursor.get('rate_limit_reset_in'):
+        floor = max(floor, cursor['rate_limit_reset_in'] / max(cursor['rate_limit_remaining'], 1))
+
+    # Exponentially weighted new-articles-per-second since the last poll
+    rate = float(cursor.get('publish_rate', 0))
+    last_polled_at = int(cursor.get('last_polled_at', 0))
+    if last_polled_at:
+        elapsed = max(now - last_polled_at, 1)
+        rate = RATE_SMOOTHING * (cursor.get('new_items', 0) / elapsed) + (1 - RATE_SMOOTHING) * rate
+
+    if failed:
+        # Nothing was learned about the publish rate; keep it and last_polled_at as they were
+        interval = int(max(min(previous_interval * 2, max_interval), floor))
+        cursor['poll_interval'] = interval
+        cursor['next_poll_at'] = now + interval
+        return interval
+
+    if cursor.get('throttled'):
+        # Back off: honour Retry-After, otherwise double the previous interval
+        interval = max(cursor.get('retry_after') or 0, min(previous_interval * 2, max_interval), floor)
+    elif not last_polled_at:
+        # No history yet; start at the fastest allowed cadence
+        interval = floor
+    elif rate > 0:
+        interval = min(max(schedule['target_new_per_poll'] / rate, floor), max_interval)
+    else:
+        interval = max_interval
+
+    interval = int(interval)
+    cursor['publish_rate'] = Decimal(str(round(rate, 6)))
+    cursor['poll_interval'] = interval
+    cursor['last_polled_at'] = now
+    cursor['next_poll_at'] = now + interval
+    return interval
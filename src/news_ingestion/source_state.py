@@ -0,0 +1,63 @@
+import os
+import time
+from typing import Dict, List
+
+from clients import LazyTable, get_dynamodb_resource
+
+# Per-source cursor state persisted between scheduled runs: the newest
+# publish time seen plus the validators (ETag / Last-Modified / body hash)
+# needed to skip unchanged payloads
+SOURCE_STATE_TABLE_NAME = os.environ.get('SOURCE_STATE_TABLE_NAME', '')
+
+# Fields that describe the current run only and must not be persisted
+TRANSIENT_FIELDS = (
+    'unchanged', 'throttled', 'retry_after', 'rate_limit_remaining', 'rate_limit_reset_in', 'new_items'
+)
+
+# Retries for keys BatchGetItem leaves unprocessed under throttling
+BATCH_MAX_ATTEMPTS = 5
+
+state_table = LazyTable(SOURCE_STATE_TABLE_NAME) if SOURCE_STATE_TABLE_NAME else None
+
+
+def load_source_cursors(sources: List[str]) -> Dict[str, Dict]:
+    """Load the stored cursor for each source (empty dict if none yet)"""
+    cursors = {source: {} for source in sources}
+    if not state_table or not sources:
+        return cursors
+
+    try:
+        request_items = {state_table.name: {'Keys': [{'source': source} for source in sources]}}
+        for attempt in range(BATCH_MAX_ATTEMPTS):
+            response = get_dynamodb_resource().batch_get_item(RequestItems=request_items)
+            for item in response.get('Responses', {}).get(state_table.name, []):
+                source = item.pop('source')
+                cursors[source] = item
+            request_items = response.get('UnprocessedKeys') or {}
+            if not request_items:
+                break
+            # Back off before retrying throttled keys
+            time.sleep(min(0.05 * (2 ** attempt), 1.0))
+        else:
+            print(f"Warning: {len(request_items[state_table.name]['Keys'])} source cursors unread after retries")
+    except Exception as e:
+        # Without cursors every source is simply fetched in full
+        print(f"Warning: Could not load source cursors: {str(e)}")
+
+    return cursors
+
+
+def save_source_cursors(cursors: Dict[str, Dict]) -> None:
+    """Persist cursors for the next run"""
+    if not state_table or not cursors:
+        return
+
+    try:
+        with state_table.batch_writer() as batch:
+            for source, cursor in cursors.items():
+                item = {key: value for key, value in cursor.items() if key not in TRANSIENT_FIELDS}
+                item['source'] = source
+                item['updatedAt'] = int(time.time())
+                batch.put_item(Item=item)
+    except Exception as e:
+        print(f"Warning: Could not save source cursors: {str(e)}")
@@ -0,0 +1,226 @@
+import hashlib
+import threading
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import requests
+
+# Shared keep-alive session, reused across warm invocations so each run
+# doesn't pay a fresh TLS handshake per provider. requests is imported when
+# the first source is fetched, so runs with nothing due skip loading it.
+_http_session = None
+_http_session_lock = threading.Lock()
+
+# Fields every source plugin must provide
+REQUIRED_SOURCE_FIELDS = ('url', 'items_field', 'normalize')
+
+
+def normalize_newsapi_article(article: Dict) -> Optional[Dict]:
+    """Normalize a NewsAPI.org article"""
+    if not (article.get('title') and article.get('description')):
+        return None
+    return {
+        'title': article.get('title', ''),
+        'description': article.get('description', ''),
+        'content': article.get('content', article.get('description', '')),
+        'url': article.get('url', ''),
+        'source': article.get('source', {}).get('name', 'NewsAPI'),
+        'publishedAt': article.get('publishedAt', datetime.utcnow().isoformat())
+    }
+
+
+def normalize_alphavantage_article(item: Dict) -> Optional[Dict]:
+    """Normalize an Alpha Vantage NEWS_SENTIMENT feed item"""
+    return {
+        'title': item.get('title', ''),
+        'description': item.get('summary', ''),
+        'content': item.get('summary', ''),
+        'url': item.get('url', ''),
+        'source': item.get('source', 'AlphaVantage'),
+        'publishedAt': item.get('time_published', datetime.utcnow().isoformat()),
+        'tickers': item.get('ticker_sentiment', [])  # Already has ticker info
+    }
+
+
+def normalize_finlight_article(article: Dict) -> Optional[Dict]:
+    """Normalize a Finlight article (already close to our shape)"""
+    return article
+
+
+# Registered news sources. Each entry is a plugin:
+# - fetch: url/params/items_field plus api_key_* describing the request
+# - normalize: maps one raw item to our article shape (or None to drop it)
+# - cursor: which field carries publish time and which query param filters on it
+# - schedule: bounds for the adaptive poll interval (seconds) and daily quota
+NEWS_SOURCES = {}
+
+
+def register_source(name: str, config: Dict) -> None:
+    """Register a news source plugin"""
+    missing = [field for field in REQUIRED_SOURCE_FIELDS if field not in config]
+    if missing:
+        raise ValueError(f"Source {name} missing {', '.join(missing)}")
+
+    config.setdefault('params', {})
+    config.setdefault('api_key_query', None)
+    config.setdefault('deadline', 10)
+    config.setdefault('cursor', {'published_field': 'publishedAt', 'time_param': None})
+    config.setdefault('schedule', {})
+    config.setdefault('throttle_fields', [])
+    NEWS_SOURCES[name] = config
+
+
+register_source('newsapi', {
+    'url': 'https://newsapi.org/v2/top-headlines',
+    'params': {
+        'category': 'business',
+        'language': 'en',
+        'pageSize': 20
+    },
+    'api_key_param': '/financial-news/news-api-key',
+    'api_key_env': 'NEWS_API_KEY',
+    'api_key_query': 'apiKey',
+    'items_field': 'articles',
+    'normalize': normalize_newsapi_article,
+    'deadline': 8,
+    # top-headlines has no time filter; rely on ETag/Last-Modified/body hash
+    'cursor': {'published_field': 'publishedAt', 'time_param': None},
+    # Developer plan allows 100 requests/day
+    'schedule': {'min_interval': 120, 'max_interval': 1800, 'daily_quota': 100}
+})
+
+register_source('alphavantage', {
+    'url': 'https://www.alphavantage.co/query',
+    'params': {
+        'function': 'NEWS_SENTIMENT',
+        'topics': 'financial_markets,earnings,ipo,mergers_and_acquisitions',
+        'limit': 20
+    },
+    'api_key_param': '/financial-news/alphavantage-api-key',
+    'api_key_env': 'ALPHAVANTAGE_API_KEY',
+    'api_key_query': 'apikey',
+    'items_field': 'feed',
+    'normalize': normalize_alphavantage_article,
+    'deadline': 10,
+    # time_from takes YYYYMMDDTHHMM, the minute prefix of time_published
+    'cursor': {'published_field': 'time_published', 'time_param': 'time_from', 'time_format_length': 13},
+    # Free tier allows 25 requests/day
+    'schedule': {'min_interval': 300, 'max_interval': 7200, 'daily_quota': 25},
+    # Rate limiting comes back as HTTP 200 with one of these keys instead of a feed
+    'throttle_fields': ['Note', 'Information']
+})
+
+register_source('finlight', {
+    'url': 'https://www.finlight.me/api/v1/news',
+    'items_field': 'articles',
+    'normalize': normalize_finlight_article,
+    'deadline': 5,
+    'schedule': {'min_interval': 60, 'max_interval': 1800}
+})
+
+
+def _header_seconds(value: Optional[str], now: float) -> Optional[int]:
+    """Parse a seconds-or-epoch rate-limit header value"""
+    try:
+        seconds = int(float(value))
+    except (TypeError, ValueError):
+        return None
+    # Some providers send an absolute epoch reset time rather than a delta
+    return max(0, seconds - int(now)) if seconds > 1_000_000_000 else seconds
+
+
+def get_http_session():
+    """The shared requests session, created on first use"""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            session.mount('https://', HTTPAdapter(pool_connections=8, pool_maxsize=8))
+            _http_session = session
+    return _http_session
+
+
+def conditional_get(source: str, cursor: Dict, params: Optional[Dict] = None) -> Optional['requests.Response']:
+    """GET a source's feed, returning None when the payload is unchanged or throttled"""
+    config = NEWS_SOURCES[source]
+    params = dict(params or {})
+    headers = {}
+
+    if cursor.get('etag'):
+        headers['If-None-Match'] = cursor['etag']
+    if cursor.get('last_modified'):
+        headers['If-Modified-Since'] = cursor['last_modified']
+
+    time_param = config['cursor'].get('time_param')
+    if time_param and cursor.get('last_published'):
+        params[time_param] = cursor['last_published'][:config['cursor']['time_format_length']]
+
+    response = get_http_session().get(config['url'], params=params, headers=headers, timeout=config['deadline'])
+
+    # Rate-limit signals feed the adaptive scheduler
+    now = time.time()
+    remaining = response.headers.get('X-RateLimit-Remaining')
+    if remaining is not None and remaining.isdigit():
+        cursor['rate_limit_remaining'] = int(remaining)
+        cursor['rate_limit_reset_in'] = _header_seconds(response.headers.get('X-RateLimit-Reset'), now)
+    if response.status_code == 429:
+        cursor['throttled'] = True
+        cursor['retry_after'] = _header_seconds(response.headers.get('Retry-After'), now)
+        return None
+
+    if response.status_code == 304:
+        cursor['unchanged'] = True
+        return None
+    response.raise_for_status()
+
+    cursor['etag'] = response.headers.get('ETag', '')
+    cursor['last_modified'] = response.headers.get('Last-Modified', '')
+
+    # Many providers send no validators, so also compare the raw body before parsing it
+    body_hash = hashlib.sha1(response.content).hexdigest()
+    if body_hash == cursor.get('body_hash'):
+        cursor['unchanged'] = True
+        return None
+    cursor['body_hash'] = body_hash
+
+    return response
+
+
+def advance_cursor(source: str, cursor: Dict, items: List[Dict]) -> None:
+    """Move the cursor to the newest publish time in a payload and count new items"""
+    field = NEWS_SOURCES[source]['cursor']['published_field']
+    previous = cursor.get('last_published', '')
+    published = [item.get(field) for item in items if item.get(field)]
+
+    cursor['new_items'] = sum(1 for value in published if value > previous)
+    if published:
+        cursor['last_published'] = max([previous] + published)
+
+
+def fetch_source(source: str, api_key: str, cursor: Dict) -> List[Dict]:
+    """Fetch and normalize articles from a registered source"""
+    config = NEWS_SOURCES[source]
+    params = config['params'].copy()
+    if config['api_key_query']:
+        params[config['api_key_query']] = api_key
+
+    response = conditional_get(source, cursor, params)
+    if response is None:
+        return []
+
+    data = response.json()
+    items = data.get(config['items_field'], [])
+    if not items and any(field in data for field in config['throttle_fields']):
+        print(f"Source {source} is rate limiting: {str(data)[:200]}")
+        cursor['throttled'] = True
+        # The throttle notice must not be mistaken for an unchanged feed next time
+        cursor.pop('body_hash', None)
+        return []
+
+    advance_cursor(source, cursor, items)
+    normalize: Callable[[Dict], Optional[Dict]] = config['normalize']
+    return [article for article in map(normalize, items) if article]
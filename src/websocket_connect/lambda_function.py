@@ -1,14 +1,24 @@
 import json
 import boto3
 import os
+import time
 
-dynamodb = boto3.resource('dynamodb')
+from metrics import timed
+
+# Low-level client: a one-call function doesn't need the resource layer's
+# extra model loading on every cold start
+dynamodb = boto3.client('dynamodb')
 connections_table_name = os.environ.get('CONNECTIONS_TABLE_NAME', 'WebSocketConnections')
-connections_table = dynamodb.Table(connections_table_name)
 
 
 def handler(event, context):
     """Handle WebSocket connection"""
+    with timed('connect'):
+        return handle_connect(event)
+
+
+def handle_connect(event):
+    """Handle WebSocket connection, returning the API Gateway response"""
     try:
         connection_id = event.get('requestContext', {}).get('connectionId')
         if not connection_id:
@@ -17,12 +27,17 @@ def handler(event, context):
                 'body': json.dumps({'message': 'Missing connection ID'})
             }
         
-        # Store connection ID
-        connections_table.put_item(
+        # Store connection ID. listKey/updatedAt feed the UpdatedAtIndex GSI the
+        # broadcaster reads to pick up new connections without a full scan.
+        now = int(time.time())
+        dynamodb.put_item(
+            TableName=connections_table_name,
             Item={
-                'connectionId': connection_id,
-                'connectedAt': context.request_id if hasattr(context, 'request_id') else '',
-                'ttl': int(context.aws_request_id[:10]) + 86400 if hasattr(context, 'aws_request_id') else 0  # 24 hour TTL
+                'connectionId': {'S': connection_id},
+                'listKey': {'S': 'all'},
+                'connectedAt': {'N': str(now)},
+                'updatedAt': {'N': str(now)},
+                'ttl': {'N': str(now + 86400)}  # 24 hour TTL
             }
         )
         
@@ -2,13 +2,22 @@ import json
 import boto3
 import os
 
-dynamodb = boto3.resource('dynamodb')
+from metrics import timed
+
+# Low-level client: a one-call function doesn't need the resource layer's
+# extra model loading on every cold start
+dynamodb = boto3.client('dynamodb')
 connections_table_name = os.environ.get('CONNECTIONS_TABLE_NAME', 'WebSocketConnections')
-connections_table = dynamodb.Table(connections_table_name)
 
 
 def handler(event, context):
     """Handle WebSocket disconnection"""
+    with timed('disconnect'):
+        return handle_disconnect(event)
+
+
+def handle_disconnect(event):
+    """Handle WebSocket disconnection, returning the API Gateway response"""
     try:
         connection_id = event.get('requestContext', {}).get('connectionId')
         if not connection_id:
@@ -18,8 +27,9 @@ def handler(event, context):
             }
         
         # Remove connection
-        connections_table.delete_item(
-            Key={'connectionId': connection_id}
+        dynamodb.delete_item(
+            TableName=connections_table_name,
+            Key={'connectionId': {'S': connection_id}}
         )
         
         return {
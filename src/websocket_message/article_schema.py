@@ -0,0 +1,44 @@
+import json
+from decimal import Decimal
+from typing import Dict, List
+
+# Article items carry a schemaVersion:
+# - 1 (or missing): analysis and tradingStrategies stored as JSON strings
+# - 2: analysis and tradingStrategies stored as native maps, so reads skip
+#   json.loads and projections/filters can reach inside them
+# Readers accept both; get_news rewrites version 1 items as maps when it
+# reads them in full.
+SCHEMA_VERSION = 2
+MAP_ATTRIBUTES = ['analysis', 'tradingStrategies']
+
+# Attributes of an article in a listing: no content and no full analysis
+LIST_ATTRIBUTES = [
+    'articleId', 'title', 'description', 'url', 'source', 'publishedAt',
+    'sentiment', 'tradingStrategies', 'timestamp'
+]
+
+
+def json_default(value):
+    """Serialize DynamoDB Decimals in JSON responses"""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def projection(attributes: List[str]) -> Dict:
+    """ProjectionExpression kwargs for a read, with every name aliased"""
+    names = {f"#p{i}": name for i, name in enumerate(dict.fromkeys(attributes))}
+    return {
+        'ProjectionExpression': ', '.join(names),
+        'ExpressionAttributeNames': names
+    }
+
+
+def map_attribute(value) -> Dict:
+    """A map attribute as stored by either schema version"""
+    if value and isinstance(value, str):
+        try:
+            return json.loads(value, parse_float=Decimal)
+        except json.JSONDecodeError:
+            return {}
+    return value or {}
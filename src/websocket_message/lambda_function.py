@@ -1,9 +1,29 @@
 import json
 import boto3
 import os
+import re
+import time
+from typing import Dict, Optional, Set, Tuple
 
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table(os.environ['TABLE_NAME'])
+from dynamo import Table
+from metrics import timed
+from article_schema import LIST_ATTRIBUTES, json_default, map_attribute
+from latest_view import read_latest_view
+from news_index import query_latest
+from wire_format import WIRE_FORMATS, compact_listing, encode, negotiate_compression, strategy_dictionary
+
+# Low-level client tables, created on first use (see dynamo.py)
+table = Table(os.environ['TABLE_NAME'])
+connections_table = Table(os.environ.get('CONNECTIONS_TABLE_NAME', 'WebSocketConnections'))
+# Management API clients by endpoint, reused across warm invocations
+_apigw_clients: Dict[str, object] = {}
+
+# Subscription filters stored on the connection item; the broadcaster only
+# sends an update to connections whose filters match it
+TICKER_RE = re.compile(r'^[A-Z]{1,5}(?:\.[A-Z])?$')
+SENTIMENTS = {'bullish', 'bearish', 'neutral'}
+MAX_FILTER_VALUES = 100
+LATEST_LIMIT = 50
 
 def get_apigw_client(event):
     """Get API Gateway Management API client from event"""
@@ -16,14 +36,94 @@ def get_apigw_client(event):
             raise ValueError("Missing domainName or stage in requestContext")
         
         endpoint_url = f"https://{domain}/{stage}"
-        return boto3.client('apigatewaymanagementapi', endpoint_url=endpoint_url)
+        if endpoint_url not in _apigw_clients:
+            _apigw_clients[endpoint_url] = boto3.client('apigatewaymanagementapi', endpoint_url=endpoint_url)
+        return _apigw_clients[endpoint_url]
     except Exception as e:
         print(f"Error creating API Gateway client: {str(e)}")
         raise
 
 
+def parse_filters(body: Dict) -> Tuple[Set[str], Set[str]]:
+    """Validate the tickers/sentiments lists of a subscribe or unsubscribe message"""
+    tickers = {str(ticker).strip().upper() for ticker in body.get('tickers') or []}
+    sentiments = {str(sentiment).strip().lower() for sentiment in body.get('sentiments') or []}
+    
+    invalid = sorted([ticker for ticker in tickers if not TICKER_RE.match(ticker)] +
+                     [sentiment for sentiment in sentiments if sentiment not in SENTIMENTS])
+    if invalid:
+        raise ValueError(f"Invalid filters: {', '.join(invalid)}")
+    if len(tickers) > MAX_FILTER_VALUES:
+        raise ValueError(f"At most {MAX_FILTER_VALUES} tickers per request")
+    return tickers, sentiments
+
+
+def update_subscription(connection_id: str, action: str, tickers: Set[str], sentiments: Set[str]) -> Dict:
+    """Add or remove filters on a connection and return its current filters"""
+    values = {':now': int(time.time())}
+    if action == 'subscribe' or tickers or sentiments:
+        operation = 'ADD' if action == 'subscribe' else 'DELETE'
+        clauses = []
+        if tickers:
+            clauses.append('tickers :tickers')
+            values[':tickers'] = tickers
+        if sentiments:
+            clauses.append('sentiments :sentiments')
+            values[':sentiments'] = sentiments
+        update = 'SET updatedAt = :now' + (f" {operation} {', '.join(clauses)}" if clauses else '')
+    else:
+        # A bare unsubscribe clears every filter, i.e. receive all updates again
+        update = 'SET updatedAt = :now REMOVE tickers, sentiments'
+    
+    # updatedAt moves the connection into the broadcaster's next incremental refresh
+    response = connections_table.update_item(
+        Key={'connectionId': connection_id},
+        UpdateExpression=update,
+        ConditionExpression='attribute_exists(connectionId)',
+        ExpressionAttributeValues=values,
+        ReturnValues='ALL_NEW'
+    )
+    attributes = response.get('Attributes', {})
+    return {
+        'tickers': sorted(attributes.get('tickers', [])),
+        'sentiments': sorted(attributes.get('sentiments', []))
+    }
+
+
+def parse_since(body: Dict) -> Optional[int]:
+    """Sequence number a get_latest request wants changes after, if any"""
+    try:
+        return int(body['since']) if body.get('since') is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def update_wire_format(connection_id: str, wire_format: str, compression: Optional[str]) -> None:
+    """Store the wire format and compression the broadcaster should use for a connection"""
+    values = {':format': wire_format, ':now': int(time.time())}
+    update = 'SET wireFormat = :format, updatedAt = :now'
+    if compression:
+        update += ', compression = :compression'
+        values[':compression'] = compression
+    else:
+        update += ' REMOVE compression'
+    
+    connections_table.update_item(
+        Key={'connectionId': connection_id},
+        UpdateExpression=update,
+        ConditionExpression='attribute_exists(connectionId)',
+        ExpressionAttributeValues=values
+    )
+
+
 def handler(event, context):
     """Handle WebSocket messages"""
+    with timed('message'):
+        return handle_message(event)
+
+
+def handle_message(event):
+    """Handle WebSocket messages, returning the API Gateway response"""
     try:
         connection_id = event.get('requestContext', {}).get('connectionId')
         if not connection_id:
@@ -38,47 +138,51 @@ def handler(event, context):
         action = body.get('action', '')
         
         if action == 'get_latest':
-            # Get latest news articles
+            # Get latest news articles, from the latest view when it is populated.
+            # A reconnecting client passes the last sequence number it saw as
+            # `since` and gets only the entries analyzed after it.
             try:
-                response = table.scan(
-                    FilterExpression='#status = :status',
-                    ExpressionAttributeNames={'#status': 'status'},
-                    ExpressionAttributeValues={':status': 'analyzed'},
-                    Limit=50
-                )
+                view = read_latest_view()
+                if view and len(view[1]) >= LATEST_LIMIT:
+                    etag, articles, sequence = view[0], view[1][:LATEST_LIMIT], view[2]
+                else:
+                    etag, articles = None, []
+                    for item in query_latest(table, ['analyzed'], LATEST_LIMIT, attributes=LIST_ATTRIBUTES):
+                        articles.append({
+                            'articleId': item.get('articleId'),
+                            'title': item.get('title', ''),
+                            'description': item.get('description', ''),
+                            'url': item.get('url', ''),
+                            'publishedAt': item.get('publishedAt', ''),
+                            'sentiment': item.get('sentiment', 'neutral'),
+                            'affectedTickers': map_attribute(item.get('tradingStrategies')),
+                            'timestamp': int(item.get('timestamp', 0))
+                        })
                 
-                articles = []
-                for item in response.get('Items', []):
-                    try:
-                        trading_strategies = item.get('tradingStrategies', '{}')
-                        if trading_strategies:
-                            trading_strategies = json.loads(trading_strategies) if isinstance(trading_strategies, str) else trading_strategies
-                        else:
-                            trading_strategies = {}
-                    except json.JSONDecodeError:
-                        trading_strategies = {}
-                    
-                    articles.append({
-                        'articleId': item.get('articleId'),
-                        'title': item.get('title', ''),
-                        'description': item.get('description', ''),
-                        'url': item.get('url', ''),
-                        'publishedAt': item.get('publishedAt', ''),
-                        'sentiment': item.get('sentiment', 'neutral'),
-                        'affectedTickers': trading_strategies,
-                        'timestamp': item.get('timestamp', 0)
-                    })
+                # Only view entries carry a sequence number; queried articles have none
+                reply = {'type': 'latest_news', 'etag': etag}
+                if etag:
+                    reply['sequence'] = sequence
                 
-                # Sort by timestamp descending
-                articles.sort(key=lambda x: x.get('timestamp', 0), reverse=True)
+                # A client that already holds this version only gets the ETag back
+                if etag and body.get('etag') == etag:
+                    reply['unchanged'] = True
+                else:
+                    since = parse_since(body)
+                    # Sequence numbers are assigned as entries enter the view, so it
+                    # holds every change after `since` if it reaches back to it
+                    if etag and since is not None and min(int(article.get('seq') or 0) for article in articles) <= since <= sequence:
+                        reply['delta'] = True
+                        articles = [article for article in articles if int(article.get('seq') or 0) > since]
+                    if body.get('format') == 'compact':
+                        reply.update(format='compact', **compact_listing(articles))
+                    else:
+                        reply['articles'] = articles
                 
-                # Send response
+                # Send response, compressed if large and the client accepts it
                 apigw.post_to_connection(
                     ConnectionId=connection_id,
-                    Data=json.dumps({
-                        'type': 'latest_news',
-                        'articles': articles
-                    }).encode('utf-8')
+                    Data=encode(reply, negotiate_compression(body.get('compression')), default=json_default)
                 )
             except Exception as e:
                 print(f"Error fetching articles: {str(e)}")
@@ -89,6 +193,41 @@ def handler(event, context):
                         'message': 'Failed to fetch articles'
                     }).encode('utf-8')
                 )
+        elif action == 'set_format':
+            # Negotiate the format of pushes; compact clients get the strategy dictionary once
+            wire_format = str(body.get('format', 'json')).lower()
+            compression = negotiate_compression(body.get('compression'))
+            if wire_format not in WIRE_FORMATS:
+                reply = {'type': 'error', 'message': f"Unknown format: {wire_format}"}
+            else:
+                try:
+                    update_wire_format(connection_id, wire_format, compression)
+                    reply = {'type': 'format', 'format': wire_format, 'compression': compression}
+                    if wire_format == 'compact':
+                        reply['dictionary'] = strategy_dictionary()
+                except Exception as e:
+                    print(f"Error updating wire format: {str(e)}")
+                    reply = {'type': 'error', 'message': 'Failed to update format'}
+            
+            apigw.post_to_connection(
+                ConnectionId=connection_id,
+                Data=json.dumps(reply).encode('utf-8')
+            )
+        elif action in ('subscribe', 'unsubscribe'):
+            try:
+                tickers, sentiments = parse_filters(body)
+                filters = update_subscription(connection_id, action, tickers, sentiments)
+                reply = {'type': 'subscriptions', **filters}
+            except ValueError as e:
+                reply = {'type': 'error', 'message': str(e)}
+            except Exception as e:
+                print(f"Error updating subscription: {str(e)}")
+                reply = {'type': 'error', 'message': 'Failed to update subscription'}
+            
+            apigw.post_to_connection(
+                ConnectionId=connection_id,
+                Data=json.dumps(reply).encode('utf-8')
+            )
         else:
             # Echo or handle other actions
             apigw.post_to_connection(
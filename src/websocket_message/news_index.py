@@ -0,0 +1,60 @@
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from article_schema import projection
+
+# Articles are read through the StatusDayIndex GSI: partition key
+# "<status>#<YYYY-MM-DD>" (UTC day of the ingestion timestamp), sort key
+# timestamp. Newest-first reads walk the day buckets backwards from today,
+# so each request touches only the items it returns no matter how large
+# the table grows.
+STATUS_DAY_INDEX = 'StatusDayIndex'
+NEWS_LOOKBACK_DAYS = int(os.environ.get('NEWS_LOOKBACK_DAYS', '30'))
+
+
+def status_day(status: str, day) -> str:
+    """StatusDayIndex partition key for a status and a UTC date"""
+    return f"{status}#{day.isoformat()}"
+
+
+def query_bucket(table, bucket: str, limit: int, attributes: Optional[List[str]] = None) -> List[Dict]:
+    """Newest-first items of one status/day bucket, up to limit"""
+    items = []
+    kwargs = projection(attributes) if attributes else {'ExpressionAttributeNames': {}}
+    kwargs['ExpressionAttributeNames']['#bucket'] = 'statusDay'
+    while len(items) < limit:
+        response = table.query(
+            IndexName=STATUS_DAY_INDEX,
+            KeyConditionExpression='#bucket = :bucket',
+            ExpressionAttributeValues={':bucket': bucket},
+            ScanIndexForward=False,
+            Limit=limit - len(items),
+            **kwargs
+        )
+        items.extend(response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            break
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    return items
+
+
+def query_latest(table, statuses: List[str], limit: int, now: Optional[float] = None,
+                 attributes: Optional[List[str]] = None) -> List[Dict]:
+    """Newest-first items with any of the given statuses, up to limit"""
+    items = []
+    day = datetime.utcfromtimestamp(now or time.time()).date()
+
+    for _ in range(NEWS_LOOKBACK_DAYS):
+        day_items = []
+        for status in statuses:
+            day_items.extend(query_bucket(table, status_day(status, day), limit - len(items), attributes))
+        # Each bucket is already sorted; merge statuses within the day
+        day_items.sort(key=lambda item: item.get('timestamp', 0), reverse=True)
+        items.extend(day_items[:limit - len(items)])
+        if len(items) >= limit:
+            break
+        day -= timedelta(days=1)
+
+    return items
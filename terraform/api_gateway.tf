@@ -107,6 +107,12 @@ resource "aws_apigatewayv2_route" "get_news_by_id" {
   target    = "integrations/${aws_apigatewayv2_integration.get_news.id}"
 }
 
+resource "aws_apigatewayv2_route" "get_ticker_signals" {
+  api_id    = aws_apigatewayv2_api.rest.id
+  route_key = "GET /tickers/{ticker}/signals"
+  target    = "integrations/${aws_apigatewayv2_integration.get_news.id}"
+}
+
 resource "aws_apigatewayv2_integration" "get_news" {
   api_id           = aws_apigatewayv2_api.rest.id
   integration_type = "AWS_PROXY"
@@ -14,11 +14,37 @@ resource "aws_dynamodb_table" "news_articles" {
     type = "N"
   }
 
+  attribute {
+    name = "statusDay"
+    type = "S"
+  }
+
+  attribute {
+    name = "sentimentDay"
+    type = "S"
+  }
+
   global_secondary_index {
     name     = "TimestampIndex"
     hash_key = "timestamp"
   }
 
+  # "<status>#<YYYY-MM-DD>" buckets sorted by timestamp, read newest-first
+  global_secondary_index {
+    name            = "StatusDayIndex"
+    hash_key        = "statusDay"
+    range_key       = "timestamp"
+    projection_type = "ALL"
+  }
+
+  # "<sentiment>#<YYYY-MM-DD>" buckets of analyzed articles, for sentiment filters
+  global_secondary_index {
+    name            = "SentimentDayIndex"
+    hash_key        = "sentimentDay"
+    range_key       = "timestamp"
+    projection_type = "ALL"
+  }
+
   stream_enabled   = true
   stream_view_type = "NEW_AND_OLD_IMAGES"
 
@@ -27,6 +53,77 @@ resource "aws_dynamodb_table" "news_articles" {
   }
 }
 
+# DynamoDB Table for the content-addressed Bedrock analysis cache
+resource "aws_dynamodb_table" "analysis_cache" {
+  name         = "${var.project_name}-analysis-cache"
+  billing_mode = var.dynamodb_billing_mode
+  hash_key     = "contentHash"
+
+  attribute {
+    name = "contentHash"
+    type = "S"
+  }
+
+  ttl {
+    attribute_name = "ttl"
+    enabled        = true
+  }
+
+  tags = {
+    Name = "${var.project_name}-analysis-cache"
+  }
+}
+
+# DynamoDB Table for per-ticker signals, newest-first by "<timestamp>#<articleId>"
+resource "aws_dynamodb_table" "ticker_signals" {
+  name         = "${var.project_name}-ticker-signals"
+  billing_mode = var.dynamodb_billing_mode
+  hash_key     = "ticker"
+  range_key    = "signalKey"
+
+  attribute {
+    name = "ticker"
+    type = "S"
+  }
+
+  attribute {
+    name = "signalKey"
+    type = "S"
+  }
+
+  attribute {
+    name = "tickerSentiment"
+    type = "S"
+  }
+
+  global_secondary_index {
+    name            = "TickerSentimentIndex"
+    hash_key        = "tickerSentiment"
+    range_key       = "signalKey"
+    projection_type = "ALL"
+  }
+
+  tags = {
+    Name = "${var.project_name}-ticker-signals"
+  }
+}
+
+# Materialized latest-news view: one item with the newest analyzed articles
+resource "aws_dynamodb_table" "latest_news" {
+  name         = "${var.project_name}-latest-news"
+  billing_mode = var.dynamodb_billing_mode
+  hash_key     = "viewId"
+
+  attribute {
+    name = "viewId"
+    type = "S"
+  }
+
+  tags = {
+    Name = "${var.project_name}-latest-news"
+  }
+}
+
 # DynamoDB Table for WebSocket connections
 resource "aws_dynamodb_table" "websocket_connections" {
   name         = "${var.project_name}-connections"
@@ -38,8 +135,63 @@ resource "aws_dynamodb_table" "websocket_connections" {
     type = "S"
   }
 
+  attribute {
+    name = "listKey"
+    type = "S"
+  }
+
+  attribute {
+    name = "updatedAt"
+    type = "N"
+  }
+
+  # Lets the broadcaster read only connections added/changed since its last refresh
+  global_secondary_index {
+    name            = "UpdatedAtIndex"
+    hash_key        = "listKey"
+    range_key       = "updatedAt"
+    projection_type = "ALL"
+  }
+
   tags = {
     Name = "${var.project_name}-websocket-connections"
   }
 }
 
+
+# DynamoDB Table for the near-duplicate index (SimHash band buckets)
+resource "aws_dynamodb_table" "dedup_index" {
+  name         = "${var.project_name}-dedup-index"
+  billing_mode = var.dynamodb_billing_mode
+  hash_key     = "bucket"
+
+  attribute {
+    name = "bucket"
+    type = "S"
+  }
+
+  ttl {
+    attribute_name = "ttl"
+    enabled        = true
+  }
+
+  tags = {
+    Name = "${var.project_name}-dedup-index"
+  }
+}
+
+# DynamoDB Table for per-source polling cursors
+resource "aws_dynamodb_table" "source_state" {
+  name         = "${var.project_name}-source-state"
+  billing_mode = var.dynamodb_billing_mode
+  hash_key     = "source"
+
+  attribute {
+    name = "source"
+    type = "S"
+  }
+
+  tags = {
+    Name = "${var.project_name}-source-state"
+  }
+}
@@ -36,9 +36,15 @@ resource "aws_iam_role_policy" "news_ingestion" {
         Effect = "Allow"
         Action = [
           "dynamodb:PutItem",
-          "dynamodb:UpdateItem"
+          "dynamodb:UpdateItem",
+          "dynamodb:BatchGetItem",
+          "dynamodb:BatchWriteItem"
+        ]
+        Resource = [
+          aws_dynamodb_table.news_articles.arn,
+          aws_dynamodb_table.dedup_index.arn,
+          aws_dynamodb_table.source_state.arn
         ]
-        Resource = aws_dynamodb_table.news_articles.arn
       },
       {
         Effect = "Allow"
@@ -106,7 +112,47 @@ resource "aws_iam_role_policy" "bedrock_analysis" {
       {
         Effect = "Allow"
         Action = [
-          "bedrock:InvokeModel"
+          "dynamodb:Scan",
+          "dynamodb:Query",
+          "dynamodb:BatchWriteItem",
+          "dynamodb:DeleteItem"
+        ]
+        Resource = [
+          aws_dynamodb_table.websocket_connections.arn,
+          "${aws_dynamodb_table.websocket_connections.arn}/index/*"
+        ]
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "dynamodb:BatchGetItem",
+          "dynamodb:BatchWriteItem",
+          "dynamodb:PutItem"
+        ]
+        Resource = aws_dynamodb_table.analysis_cache.arn
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "dynamodb:BatchWriteItem",
+          "dynamodb:PutItem"
+        ]
+        Resource = aws_dynamodb_table.ticker_signals.arn
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "dynamodb:GetItem",
+          "dynamodb:PutItem",
+          "dynamodb:UpdateItem"
+        ]
+        Resource = aws_dynamodb_table.latest_news.arn
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "bedrock:InvokeModel",
+          "bedrock:InvokeModelWithResponseStream"
         ]
         Resource = "*"
       },
@@ -253,7 +299,24 @@ resource "aws_iam_role_policy" "websocket_message" {
           "dynamodb:Scan",
           "dynamodb:Query"
         ]
-        Resource = aws_dynamodb_table.news_articles.arn
+        Resource = [
+          aws_dynamodb_table.news_articles.arn,
+          "${aws_dynamodb_table.news_articles.arn}/index/*"
+        ]
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "dynamodb:UpdateItem"
+        ]
+        Resource = aws_dynamodb_table.websocket_connections.arn
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "dynamodb:GetItem"
+        ]
+        Resource = aws_dynamodb_table.latest_news.arn
       },
       {
         Effect = "Allow"
@@ -304,10 +367,30 @@ resource "aws_iam_role_policy" "get_news" {
         Effect = "Allow"
         Action = [
           "dynamodb:GetItem",
+          "dynamodb:BatchGetItem",
           "dynamodb:Scan",
           "dynamodb:Query"
         ]
+        Resource = [
+          aws_dynamodb_table.news_articles.arn,
+          "${aws_dynamodb_table.news_articles.arn}/index/*",
+          aws_dynamodb_table.ticker_signals.arn,
+          "${aws_dynamodb_table.ticker_signals.arn}/index/*"
+        ]
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "dynamodb:UpdateItem"
+        ]
         Resource = aws_dynamodb_table.news_articles.arn
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "dynamodb:GetItem"
+        ]
+        Resource = aws_dynamodb_table.latest_news.arn
       }
     ]
   })
@@ -12,7 +12,10 @@ resource "aws_lambda_function" "news_ingestion" {
 
   environment {
     variables = {
-      TABLE_NAME = aws_dynamodb_table.news_articles.name
+      TABLE_NAME              = aws_dynamodb_table.news_articles.name
+      DEDUP_TABLE_NAME        = aws_dynamodb_table.dedup_index.name
+      SOURCE_STATE_TABLE_NAME = aws_dynamodb_table.source_state.name
+      POLL_TICK_SECONDS       = tostring(var.news_ingestion_tick_seconds)
     }
   }
 
@@ -24,7 +27,7 @@ resource "aws_lambda_function" "news_ingestion" {
 # CloudWatch Event Rule for scheduled news ingestion
 resource "aws_cloudwatch_event_rule" "news_ingestion_schedule" {
   name                = "${var.project_name}-ingestion-schedule"
-  description         = "Trigger news ingestion every 5 minutes"
+  description         = "Scheduler tick for adaptive per-source news polling"
   schedule_expression = var.news_ingestion_schedule
 }
 
@@ -56,11 +59,14 @@ resource "aws_lambda_function" "bedrock_analysis" {
 
   environment {
     variables = {
-      TABLE_NAME             = aws_dynamodb_table.news_articles.name
-      CONNECTIONS_TABLE_NAME = aws_dynamodb_table.websocket_connections.name
-      WS_API_ENDPOINT        = "wss://${aws_apigatewayv2_api.websocket.id}.execute-api.${data.aws_region.current.name}.amazonaws.com/${aws_apigatewayv2_stage.websocket.name}"
-      WS_API_ID              = aws_apigatewayv2_api.websocket.id
-      BEDROCK_REGION         = var.aws_region
+      TABLE_NAME                = aws_dynamodb_table.news_articles.name
+      CONNECTIONS_TABLE_NAME    = aws_dynamodb_table.websocket_connections.name
+      WS_API_ENDPOINT           = "wss://${aws_apigatewayv2_api.websocket.id}.execute-api.${data.aws_region.current.name}.amazonaws.com/${aws_apigatewayv2_stage.websocket.name}"
+      WS_API_ID                 = aws_apigatewayv2_api.websocket.id
+      BEDROCK_REGION            = var.aws_region
+      ANALYSIS_CACHE_TABLE_NAME = aws_dynamodb_table.analysis_cache.name
+      TICKER_SIGNALS_TABLE_NAME = aws_dynamodb_table.ticker_signals.name
+      LATEST_NEWS_TABLE_NAME    = aws_dynamodb_table.latest_news.name
     }
   }
 
@@ -74,8 +80,12 @@ resource "aws_lambda_event_source_mapping" "bedrock_analysis_stream" {
   event_source_arn  = aws_dynamodb_table.news_articles.stream_arn
   function_name     = aws_lambda_function.bedrock_analysis.arn
   starting_position = "LATEST"
-  batch_size        = 5
+  batch_size        = 20
   maximum_batching_window_in_seconds = 10
+
+  # Failed articles are returned in batchItemFailures and retried on their own
+  function_response_types = ["ReportBatchItemFailures"]
+  maximum_retry_attempts  = 5
 }
 
 # Lambda: WebSocket Connect
@@ -138,7 +148,9 @@ resource "aws_lambda_function" "websocket_message" {
 
   environment {
     variables = {
-      TABLE_NAME = aws_dynamodb_table.news_articles.name
+      TABLE_NAME             = aws_dynamodb_table.news_articles.name
+      CONNECTIONS_TABLE_NAME = aws_dynamodb_table.websocket_connections.name
+      LATEST_NEWS_TABLE_NAME = aws_dynamodb_table.latest_news.name
     }
   }
 
@@ -161,7 +173,11 @@ resource "aws_lambda_function" "get_news" {
 
   environment {
     variables = {
-      TABLE_NAME = aws_dynamodb_table.news_articles.name
+      TABLE_NAME                = aws_dynamodb_table.news_articles.name
+      TICKER_SIGNALS_TABLE_NAME = aws_dynamodb_table.ticker_signals.name
+      LATEST_NEWS_TABLE_NAME    = aws_dynamodb_table.latest_news.name
+      # HTTP APIs don't compress responses; the function gzips large ones
+      COMPRESS_RESPONSES        = "true"
     }
   }
 
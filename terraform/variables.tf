@@ -17,9 +17,15 @@ variable "project_name" {
 }
 
 variable "news_ingestion_schedule" {
-  description = "CloudWatch Events schedule expression for news ingestion"
+  description = "CloudWatch Events schedule expression for the news ingestion scheduler tick (sources are polled on their own adaptive intervals)"
   type        = string
-  default     = "rate(5 minutes)"
+  default     = "rate(1 minute)"
+}
+
+variable "news_ingestion_tick_seconds" {
+  description = "Seconds between news ingestion scheduler ticks; must match news_ingestion_schedule"
+  type        = number
+  default     = 60
 }
 
 variable "bedrock_model_id" {